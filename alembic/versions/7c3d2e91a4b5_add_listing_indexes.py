@@ -0,0 +1,33 @@
+"""Add documents.created_at and chunks (doc_id, chunk_index) indexes
+
+Revision ID: 7c3d2e91a4b5
+Revises: 49f989b10b56
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c3d2e91a4b5"
+down_revision: Union[str, Sequence[str], None] = "49f989b10b56"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_documents_created_at"), "documents", ["created_at"], unique=False
+    )
+    op.create_index(
+        "ix_chunks_doc_id_chunk_index", "chunks", ["doc_id", "chunk_index"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_chunks_doc_id_chunk_index", table_name="chunks")
+    op.drop_index(op.f("ix_documents_created_at"), table_name="documents")
@@ -0,0 +1,33 @@
+"""Add documents.fingerprint for duplicate-upload detection
+
+Revision ID: d5e83b7f1c20
+Revises: a41f6c08d2e7
+Create Date: 2026-10-18 16:41:09.583214
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5e83b7f1c20"
+down_revision: Union[str, Sequence[str], None] = "a41f6c08d2e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("documents", sa.Column("fingerprint", sa.String(length=64), nullable=True))
+    op.create_index(
+        op.f("ix_documents_fingerprint"), "documents", ["fingerprint"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_documents_fingerprint"), table_name="documents")
+    op.drop_column("documents", "fingerprint")
@@ -1,17 +1,35 @@
 # main
 import streamlit as st
 from pathlib import Path
+import logging
 import tempfile
-import uuid
+import time
 from datetime import datetime
+from typing import Iterator
 
+from src.pyxon.metrics import REGISTRY
 from src.pyxon.parsers import parse_document
+from src.pyxon.parsers.cache import fingerprint_bytes
+from src.pyxon.rag.cache import AnswerCache, get_answer_cache as get_shared_answer_cache
+from src.pyxon.retrieval.bm25 import get_bm25_index
 from src.pyxon.storage.vs import VectorStore
 from src.pyxon.storage.database.repository import SQLStore
 from src.pyxon.storage.database.schemas import DocumentCreate, ChunkCreate
 from src.pyxon.rag.graph import app as rag_app
 from src.pyxon.rag.state import AgentState
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessageChunk, HumanMessage
+
+logger = logging.getLogger(__name__)
+
+STAGE_LABELS = {
+    "retrieving": "Retrieving relevant passages...",
+    "reranking": "Reranking results...",
+    "reflecting": "Checking if the context is sufficient...",
+    "rewriting": "Rewriting the query...",
+    "generating": "Generating answer...",
+}
+
+DOCUMENTS_PAGE_SIZE = 20
 
 
 st.set_page_config(
@@ -153,47 +171,66 @@ if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 if "all_documents" not in st.session_state:
     st.session_state.all_documents = []
+if "documents_cursor" not in st.session_state:
+    st.session_state.documents_cursor = None
+if "documents_exhausted" not in st.session_state:
+    st.session_state.documents_exhausted = False
 
 
-def get_all_documents():
-    """Retrieve all documents from the database."""
-    from src.pyxon.storage.database.database import SessionLocal
-    from src.pyxon.storage.database.models import Document
-    
-    session = SessionLocal()
-    try:
-        docs = session.query(Document).order_by(Document.created_at.desc()).all()
-        return [{
-            "id": doc.id,
-            "filename": doc.filename,
-            "doc_type": doc.doc_type,
-            "total_chunks": doc.total_chunks,
-            "created_at": doc.created_at
-        } for doc in docs]
-    finally:
-        session.close()
+@st.cache_resource
+def get_answer_cache() -> AnswerCache:
+    """Process-wide answer cache shared by all sessions."""
+    return get_shared_answer_cache(VectorStore().embedding_func.embed_query)
+
+
+def reset_documents():
+    """Forget the loaded pages, so the list restarts from the newest document."""
+    st.session_state.all_documents = []
+    st.session_state.documents_cursor = None
+    st.session_state.documents_exhausted = False
+
+
+def load_more_documents():
+    """Append the next page of document summaries, without loading chunks."""
+    page = SQLStore().list_documents(limit=DOCUMENTS_PAGE_SIZE, after=st.session_state.documents_cursor)
+
+    st.session_state.all_documents.extend({
+        "id": doc.id,
+        "filename": doc.filename,
+        "doc_type": doc.doc_type,
+        "total_chunks": doc.total_chunks,
+        "created_at": doc.created_at
+    } for doc in page)
+    if page:
+        st.session_state.documents_cursor = page[-1]
+    st.session_state.documents_exhausted = len(page) < DOCUMENTS_PAGE_SIZE
 
 
 def process_uploaded_file(uploaded_file) -> str:
     """Save uploaded file, parse it, chunk it, store in both databases."""
-    
+    sql_store = SQLStore()
+    fingerprint = fingerprint_bytes(uploaded_file.getbuffer())
+
+    existing = sql_store.find_document_by_fingerprint(fingerprint)
+    if existing is not None:
+        st.info(f"{uploaded_file.name} was already uploaded as {existing.filename}, reusing it.")
+        return existing.id
+
     with tempfile.NamedTemporaryFile(delete=False, suffix=Path(uploaded_file.name).suffix) as tmp:
         tmp.write(uploaded_file.getbuffer())
         tmp_path = tmp.name
     
     with st.spinner("Parsing document..."):
-        doc = parse_document(tmp_path, advanced=True)
+        doc = parse_document(tmp_path, advanced=True, fingerprint=fingerprint)
     
     vs = VectorStore()
-    sql_store = SQLStore()
-    
-    doc_id = str(uuid.uuid4())
     
     with st.spinner("Saving to database..."):
         doc_schema = DocumentCreate(
             filename=uploaded_file.name,
             source_path=tmp_path,
-            doc_type=Path(uploaded_file.name).suffix.lstrip(".")
+            doc_type=Path(uploaded_file.name).suffix.lstrip("."),
+            fingerprint=fingerprint,
         )
         sql_doc_id = sql_store.save_document(doc_schema)
     
@@ -202,6 +239,7 @@ def process_uploaded_file(uploaded_file) -> str:
     
     with st.spinner("Creating embeddings..."):
         vs.add_documents(chunks, sql_doc_id)
+        get_bm25_index().add_document(sql_doc_id, chunks)
     
     with st.spinner("Finalizing storage..."):
         chunk_schemas = [
@@ -218,8 +256,14 @@ def process_uploaded_file(uploaded_file) -> str:
     return sql_doc_id
 
 
-def run_rag_query(question: str, document_id: str) -> str:
-    """Execute the RAG pipeline on the provided question."""
+def run_rag_query(question: str, document_id: str) -> Iterator[str]:
+    """Execute the RAG pipeline on the provided question, yielding answer tokens as they stream."""
+    answer_cache = get_answer_cache()
+
+    cached = answer_cache.get(document_id, question)
+    if cached is not None:
+        yield cached
+        return
     
     initial_state: AgentState = {
         "messages": [HumanMessage(content=question)],
@@ -231,13 +275,49 @@ def run_rag_query(question: str, document_id: str) -> str:
         "reranked_docs": [],
         "top_k": 5,
         "metadata_filter": {"document_id": document_id},
+        "retrieval_timings": {},
+        "reflection_skipped": False,
+        "generation_failed": False,
         "answer": ""
     }
     
-    with st.spinner("Processing query..."):
-        final_state = rag_app.invoke(initial_state)
-    
-    return final_state["answer"]
+    start = time.perf_counter()
+    streamed = False
+    final_state = initial_state
+
+    # Not used as a context manager: while this generator is suspended the
+    # streamed tokens must render in the chat message, not inside the status box.
+    status = st.status("Processing query...")
+
+    for mode, payload in rag_app.stream(initial_state, stream_mode=["custom", "messages", "values"]):
+        if mode == "custom":
+            status.update(label=STAGE_LABELS.get(payload["stage"], payload["stage"]))
+        elif mode == "messages":
+            message, metadata = payload
+            if (
+                isinstance(message, AIMessageChunk)
+                and metadata.get("langgraph_node") == "generate_node"
+                and message.content
+            ):
+                if not streamed:
+                    ttft = time.perf_counter() - start
+                    logger.info(f"[Chat] Time to first token: {ttft:.2f}s")
+                    REGISTRY.observe("pyxon_time_to_first_token_seconds", ttft)
+                    status.update(label=f"First token after {ttft:.2f}s", state="complete")
+                    streamed = True
+                yield message.content
+        else:
+            final_state = payload
+
+    status.update(state="complete")
+
+    if not streamed:
+        # Nothing was streamed (e.g. generation failed), fall back to the final answer.
+        yield final_state["answer"]
+
+    # Only successful answers are reused; a failed generation returns an apology.
+    if final_state["reranked_docs"] and not final_state.get("generation_failed"):
+        answer_cache.put(document_id, question, final_state["answer"])
 
 
 st.markdown('<div class="main-header">Pyxon AI | Document Intelligence Platform</div>', unsafe_allow_html=True)
@@ -251,6 +331,8 @@ with st.sidebar:
     st.divider()
     
     if tab == "Upload New":
+        # The document list is re-read from the first page when its tab opens again.
+        reset_documents()
         st.markdown("**Upload Document**")
         uploaded_file = st.file_uploader(
             "Select file",
@@ -268,17 +350,19 @@ with st.sidebar:
                     st.session_state.document_id = doc_id
                     st.session_state.filename = uploaded_file.name
                     st.session_state.chat_history = []
-                    st.session_state.all_documents = get_all_documents()
+                    reset_documents()
                     st.success("Document processed successfully")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Processing error: {str(e)}")
     
     else:
-        st.session_state.all_documents = get_all_documents()
+        if not st.session_state.all_documents and not st.session_state.documents_exhausted:
+            load_more_documents()
         
         if st.session_state.all_documents:
-            st.markdown(f'<div class="section-header">Available Documents ({len(st.session_state.all_documents)})</div>', unsafe_allow_html=True)
+            loaded = f"{len(st.session_state.all_documents)}{'' if st.session_state.documents_exhausted else '+'}"
+            st.markdown(f'<div class="section-header">Available Documents ({loaded})</div>', unsafe_allow_html=True)
             
             for doc in st.session_state.all_documents:
                 with st.container():
@@ -291,6 +375,9 @@ with st.sidebar:
                         st.session_state.chat_history = []
                         st.rerun()
                     st.divider()
+            
+            if not st.session_state.documents_exhausted:
+                st.button("Load More", on_click=load_more_documents, use_container_width=True)
         else:
             st.info("No documents available")
     
@@ -301,6 +388,8 @@ with st.sidebar:
     if st.session_state.document_id:
         st.markdown('<div class="status-badge status-active">● Active</div>', unsafe_allow_html=True)
         st.markdown(f"**{st.session_state.filename}**")
+        cache_stats = get_answer_cache().stats()
+        st.caption(f"Answer cache hit rate: {cache_stats['hit_rate']:.0%} ({cache_stats['entries']} cached)")
         if st.button("Clear Session", use_container_width=True):
             st.session_state.document_id = None
             st.session_state.filename = None
@@ -325,11 +414,10 @@ if st.session_state.document_id:
             st.markdown(prompt)
         
         try:
-            answer = run_rag_query(prompt, st.session_state.document_id)
+            with st.chat_message("assistant"):
+                answer = st.write_stream(run_rag_query(prompt, st.session_state.document_id))
             
             st.session_state.chat_history.append({"role": "assistant", "content": answer})
-            with st.chat_message("assistant"):
-                st.markdown(answer)
                 
         except Exception as e:
             error_msg = f"Error processing query: {str(e)}"
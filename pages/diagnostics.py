@@ -0,0 +1,61 @@
+# pages.diagnostics
+import streamlit as st
+
+from src.pyxon.embeddings.cache import get_embedding_cache
+from src.pyxon.metrics import REGISTRY
+
+st.set_page_config(page_title="Pyxon AI | Diagnostics", page_icon="📈", layout="wide")
+
+st.markdown("### Pipeline Diagnostics")
+st.caption("Latency and throughput recorded in this process since it started. Times are in seconds.")
+
+rows = REGISTRY.snapshot()
+if rows:
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+else:
+    st.info("No metrics recorded yet. Ask a question or upload a document first.")
+
+st.markdown("**Embedding cache**")
+st.json(get_embedding_cache().stats())
+
+# Hit rates of every cache that counts lookups as `<name>_cache_total{result=hit|miss}`.
+lookups = {}
+for row in rows:
+    if row["metric"].endswith("_cache_total") and "result=" in row["labels"]:
+        result = "hit" if 'result="hit"' in row["labels"] else "miss"
+        lookups.setdefault(row["metric"], {"hit": 0, "miss": 0})[result] += row["count"]
+
+if lookups:
+    st.markdown("**Cache hit rates**")
+    st.dataframe(
+        [
+            {
+                "cache": metric.removeprefix("pyxon_").removesuffix("_cache_total"),
+                "lookups": counts["hit"] + counts["miss"],
+                "hit_rate": counts["hit"] / (counts["hit"] + counts["miss"]) if counts["hit"] + counts["miss"] else 0.0,
+            }
+            for metric, counts in sorted(lookups.items())
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+
+st.caption(
+    "Reranker batching: `pyxon_rerank_queue_depth` is sampled each time the batcher wakes up, "
+    "`pyxon_cross_encoder_pairs` is the batch size and `pyxon_rerank_batch_requests` the sessions merged per batch."
+)
+
+col1, col2 = st.columns(2)
+with col1:
+    if st.button("Refresh", use_container_width=True):
+        st.rerun()
+with col2:
+    if st.button("Reset metrics", use_container_width=True):
+        REGISTRY.reset()
+        st.rerun()
+
+prometheus_text = REGISTRY.to_prometheus()
+st.download_button("Download Prometheus metrics", prometheus_text, file_name="pyxon_metrics.prom")
+
+with st.expander("Prometheus text format"):
+    st.code(prometheus_text, language="text")
@@ -20,28 +20,94 @@ class Settings:
     DATA: Path = Path(__file__).parent.parent / "data"
     TESTS = DATA / 'tests'
     TESTSET = TESTS / 'testset.csv'
+    RAGEVAL_CACHE_DIR: Path = DATA / "rageval_cache"
     
     PARAGRAPH_VARIATION_THRESH: float = 0.2
     INDEX: str = "pyxon"
 
+    VECTOR_STORE_BACKEND: str = "pinecone"  # pinecone | faiss
+    FAISS_INDEX_DIR: Path = DATA / "faiss"
+    FAISS_INDEX_TYPE: str = "flat"  # flat | ivf | hnsw | int8 | binary
+    FAISS_NLIST: int = 256
+    FAISS_NPROBE: int = 16
+    FAISS_HNSW_M: int = 32
+    FAISS_HNSW_EF_SEARCH: int = 64
+    FAISS_COARSE_DIMS: int = 256  # Matryoshka prefix searched by the int8/binary coarse pass
+    FAISS_RESCORE_CANDIDATES: int = 10  # coarse shortlist is k times this, rescored on full vectors
+
     EMBEDDING_MODEL_NAME: str = "text-embedding-3-large"
     CROSS_ENCODER_MODEL_NAME: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     LLM_MODEL_NAME: str = "llama-3.3-70b-versatile"
     TEST_MODEL: str = "gpt-4o-mini"
 
+    RERANKER_BACKEND: str = "torch"  # torch | onnx-int8
+    RERANKER_ONNX_DIR: Path = DATA / "models" / "ms-marco-MiniLM-L-6-v2-onnx"
+    RERANKER_QUANTIZATION: str = "avx2"  # arm64 | avx2 | avx512 | avx512_vnni
+    RERANK_CACHE_SIZE: int = 10_000
+    RERANK_BATCHING: bool = True
+    RERANK_MAX_BATCH_SIZE: int = 128
+    RERANK_MAX_WAIT_MS: float = 5.0
+
     DIMENSIONS: int = 1024
+    EMBEDDING_BACKEND: str = "openai"  # openai | local | hashing
+    LOCAL_EMBEDDING_MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
+    LOCAL_EMBEDDING_DEVICE: str = "cpu"
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 32
+    LOCAL_EMBEDDING_WORKERS: int = 2  # each batch also uses torch's intra-op threads
+    EMBEDDING_CACHE_PATH: Path = DATA / "embedding_cache.sqlite3"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 500_000
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_CHARS: int = 100_000
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_RATE_LIMIT: float = 0.0  # embedding requests per second, 0 disables
+    BULK_PARSE_WORKERS: int = 4
+    BULK_EMBED_GROUP_CHUNKS: int = 512
+    BULK_STREAM_MIN_BYTES: int = 64 * 1024 * 1024  # larger files are streamed, not parsed whole
+    BULK_LLAMA_BATCH_FILES: int = 32  # LlamaCloud files per parse_documents call
     CHUNK_OVERLAP: float = 0.2
+    CHUNKER_WARMUP_CHARS: int = 200_000  # prefix used to pick the chunker for streamed documents
+    CHUNK_STREAM_WINDOW_CHARS: int = 64_000
+    STRUCTURE_CHUNK_MAX_CHARS: int = 2_000  # longer sections fall back to semantic breakpoints
+    STRUCTURE_CHUNK_MIN_CHARS: int = 300
+    PDF_WORKERS: int = 4
+    PDF_PARALLEL_MIN_PAGES: int = 64  # smaller PDFs are not worth the process start-up
+    PDF_PAGE_TIMEOUT_S: float = 10.0  # 0 disables the per-page deadline
+    PARSE_CACHE_ENABLED: bool = True
+    PARSE_CACHE_DIR: Path = DATA / "parse_cache"
+    LLAMA_CONCURRENCY: int = 8  # files in flight per parse_documents batch
+    LLAMA_MAX_RETRIES: int = 3
+    LLAMA_RETRY_BASE_S: float = 2.0
     
     PINECONE_API_KEY: str = _get_secret("PINECONE_API_KEY")
     OPENAI_API_KEY: str = _get_secret("OPENAI_API_KEY")
-    DATABASE_URL: str = _get_secret("DATABASE_URL")
+    DATABASE_URL: str = _get_secret("DATABASE_URL", f"sqlite:///{DATA / 'pyxon.db'}")
     LLAMAINDEX_API_KEY: str = _get_secret("LLAMAINDEX_API_KEY")
     LANGSMITH_API_KEY: str = _get_secret("LANGSMITH_API_KEY")
     GROQ_API_KEY: str = _get_secret("GROQ_API_KEY")
 
     PERCENTILE_THRESH: float = 0.9
+    BM25_INDEX_DIR: Path = DATA / "bm25"
+    BM25_K1: float = 1.5
+    BM25_B: float = 0.75
     TOP_K: int = 5
+    RETRIEVAL_MODE: str = "dense"  # dense | hybrid
+    RETRIEVAL_CANDIDATES: int = 20
+    RETRIEVAL_WORKERS: int = 8
+    FUSION_METHOD: str = "weighted"  # weighted | rrf
+    FUSION_ALPHA: float = 0.6
     SIMILARITY_THRESHOLD: float = 0.8
     MAX_RAG_ITERATIONS: int = 6
 
-    TESTSET_SIZE: int = 10
\ No newline at end of file
+    # Skip the reflection LLM call when the cross-encoder is already confident.
+    CONFIDENCE_GATE_ENABLED: bool = True
+    CONFIDENCE_GATE_TOP_SCORE: float = 7.0
+    CONFIDENCE_GATE_DOC_SCORE: float = 3.0
+    CONFIDENCE_GATE_MIN_DOCS: int = 2
+
+    ANSWER_CACHE_SIMILARITY: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
+
+    TESTSET_SIZE: int = 10
+
+    METRICS_MAX_SAMPLES: int = 10_000
\ No newline at end of file
@@ -0,0 +1,161 @@
+# src.pyxon.embeddings.backends
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+from src.config import Settings
+from src.pyxon.retrieval.bm25 import tokenize
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    sentence-transformers model run in-process. Texts are sorted by length
+    before batching so each batch pads to similar lengths, and batches are
+    encoded on a thread pool (torch releases the GIL in the forward pass).
+    Vectors come back in input order, L2-normalized.
+    """
+
+    def __init__(self, model_name: str, batch_size: int, workers: int, device: str = "cpu"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device=device)
+        self.batch_size = batch_size
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pyxon-embed")
+
+    @property
+    def dimensions(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batches = [order[start : start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+
+        vectors: List[List[float]] = [None] * len(texts)
+        encoded = self._pool.map(self._encode, [[texts[i] for i in batch] for batch in batches])
+        for batch, matrix in zip(batches, encoded):
+            for i, vector in zip(batch, matrix):
+                vectors[i] = vector.tolist()
+
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Signed feature hashing of the BM25 tokens, L2-normalized. No model and
+    no network; the same text always gives the same vector, which is what
+    tests and benchmarks need. Similarity is lexical only.
+    """
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in tokenize(text):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+
+def _openai_backend() -> Embeddings:
+    return OpenAIEmbeddings(
+        model=Settings.EMBEDDING_MODEL_NAME,
+        api_key=Settings.OPENAI_API_KEY,
+        dimensions=Settings.DIMENSIONS,
+    )
+
+
+def _local_backend() -> Embeddings:
+    return LocalEmbeddings(
+        Settings.LOCAL_EMBEDDING_MODEL_NAME,
+        batch_size=Settings.LOCAL_EMBEDDING_BATCH_SIZE,
+        workers=Settings.LOCAL_EMBEDDING_WORKERS,
+        device=Settings.LOCAL_EMBEDDING_DEVICE,
+    )
+
+
+def _hashing_backend() -> Embeddings:
+    return HashingEmbeddings(Settings.DIMENSIONS)
+
+
+_BACKENDS = {
+    "openai": _openai_backend,
+    "local": _local_backend,
+    "hashing": _hashing_backend,
+}
+
+
+def _check_backend(backend: str) -> None:
+    if backend not in _BACKENDS:
+        raise ValueError(
+            f"Unsupported embedding backend: '{backend}'. Supported: {list(_BACKENDS.keys())}"
+        )
+
+
+def embedding_identity(backend: str = None) -> str:
+    """
+    Names the vector space a backend produces. Used as the embedding cache
+    namespace and recorded with every index, so vectors from different
+    backends (or models, or dimensions) are never mixed.
+    """
+    backend = backend or Settings.EMBEDDING_BACKEND
+    _check_backend(backend)
+
+    if backend == "openai":
+        # Same as the cache namespace used before backends were pluggable.
+        return f"{Settings.EMBEDDING_MODEL_NAME}:{Settings.DIMENSIONS}"
+    if backend == "local":
+        return f"local:{Settings.LOCAL_EMBEDDING_MODEL_NAME}"
+    return f"hashing:{Settings.DIMENSIONS}"
+
+
+def embedding_dimensions(backend: str = None) -> int:
+    """Length of the vectors a backend produces."""
+    backend = backend or Settings.EMBEDDING_BACKEND
+    _check_backend(backend)
+
+    if backend == "local":
+        return get_embeddings(backend).dimensions
+    return Settings.DIMENSIONS
+
+
+def get_embeddings(backend: str = None) -> Embeddings:
+    backend = backend or Settings.EMBEDDING_BACKEND
+    _check_backend(backend)
+    return _load(backend, embedding_identity(backend))
+
+
+@lru_cache(maxsize=None)
+def _load(backend: str, identity: str) -> Embeddings:
+    # One instance per embedding space, so a local model is loaded once per
+    # process however many `VectorStore`s are built.
+    return _BACKENDS[backend]()
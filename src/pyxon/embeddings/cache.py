@@ -0,0 +1,180 @@
+# src.pyxon.embeddings.cache
+
+import hashlib
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.config import Settings
+from src.pyxon.metrics import REGISTRY
+
+_SQLITE_MAX_VARS = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding store on local SQLite.
+
+    Rows are keyed by (namespace, sha256(text)) where the namespace pins the
+    model name and dimensions. Least recently used rows are evicted once the
+    table grows past `max_entries`.
+    """
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " namespace TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (namespace, text_hash))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, namespace: str, hashes: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            now = time.time()
+            for start in range(0, len(hashes), _SQLITE_MAX_VARS):
+                batch = hashes[start : start + _SQLITE_MAX_VARS]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings"
+                    f" WHERE namespace = ? AND text_hash IN ({marks})",
+                    [namespace, *batch],
+                ).fetchall()
+
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ?"
+                        f" WHERE namespace = ? AND text_hash IN ({marks})",
+                        [now, namespace, *batch],
+                    )
+
+            self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+
+        REGISTRY.inc("pyxon_embedding_cache_total", len(found), result="hit")
+        REGISTRY.inc("pyxon_embedding_cache_total", len(hashes) - len(found), result="miss")
+
+        return found
+
+    def put_many(self, namespace: str, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+
+        with self._lock:
+            now = time.time()
+            rows = [
+                (np.asarray(vector, dtype=np.float32).tobytes(), now, namespace, key)
+                for key, vector in items.items()
+            ]
+            # Only newly inserted rows grow the table; keys already cached
+            # (e.g. written by another process meanwhile) are overwritten.
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (vector, last_used, namespace, text_hash)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            ).rowcount
+            if inserted < len(rows):
+                self._conn.executemany(
+                    "UPDATE embeddings SET vector = ?, last_used = ? WHERE namespace = ? AND text_hash = ?",
+                    rows,
+                )
+            self._size += inserted
+
+            if self._size > self.max_entries:
+                self._evict()
+
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        overflow = self._size - self.max_entries
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN"
+            " (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (overflow,),
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._size,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps any `Embeddings` so repeated texts and queries are served from `EmbeddingCache`."""
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache, namespace: str):
+        self.underlying = underlying
+        self.cache = cache
+        self.namespace = namespace
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(t) for t in texts]
+        unique = dict(zip(hashes, texts))
+
+        vectors = self.cache.get_many(self.namespace, list(unique))
+        missing = [h for h in unique if h not in vectors]
+
+        if missing:
+            REGISTRY.observe("pyxon_embedding_batch_size", len(missing))
+            with REGISTRY.timer("pyxon_embedding_seconds", op="documents"):
+                computed = self.underlying.embed_documents([unique[h] for h in missing])
+            fresh = dict(zip(missing, computed))
+            self.cache.put_many(self.namespace, fresh)
+            vectors.update(fresh)
+
+        return [vectors[h] for h in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = text_hash(text)
+
+        cached = self.cache.get_many(self.namespace, [key])
+        if key in cached:
+            return cached[key]
+
+        with REGISTRY.timer("pyxon_embedding_seconds", op="query"):
+            vector = self.underlying.embed_query(text)
+        self.cache.put_many(self.namespace, {key: vector})
+        return vector
+
+
+@lru_cache(maxsize=None)
+def get_embedding_cache(path: Path = None) -> EmbeddingCache:
+    return EmbeddingCache(
+        path or Settings.EMBEDDING_CACHE_PATH, max_entries=Settings.EMBEDDING_CACHE_MAX_ENTRIES
+    )
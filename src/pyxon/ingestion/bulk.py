@@ -0,0 +1,393 @@
+# src.pyxon.ingestion.bulk
+#
+#   python -m src.pyxon.ingestion.bulk <directory-or-manifest> [--workers 8] [--basic]
+#
+# Files of BULK_STREAM_MIN_BYTES or more skip the process pool and are
+# streamed segment by segment in the parent, in bounded memory. Files sent
+# to LlamaCloud are network-bound, so they skip the pool too and are parsed
+# concurrently in the parent, BULK_LLAMA_BATCH_FILES at a time.
+
+import argparse
+import logging
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from langchain_core.documents import Document
+
+from src.config import Settings
+from src.pyxon.metrics import REGISTRY
+from src.pyxon.parsers import get_parser, parse_document, parse_documents, supported_extensions
+from src.pyxon.parsers.cache import file_fingerprint
+from src.pyxon.rag.cache import AnswerCache, get_answer_cache
+from src.pyxon.retrieval.bm25 import BM25Index, get_bm25_index
+from src.pyxon.storage.database import schemas
+from src.pyxon.storage.database.repository import SQLStore
+from src.pyxon.storage.vs import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BulkStats:
+    files: int = 0
+    skipped: int = 0
+    failed: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+def discover(source: Path, advanced: bool = True) -> List[Path]:
+    """Supported files under a directory, or listed in a manifest (one path per line, `#` comments)."""
+    source = Path(source)
+    extensions = set(supported_extensions(advanced))
+
+    if source.is_dir():
+        paths = [p for p in sorted(source.rglob("*")) if p.is_file()]
+    else:
+        with open(source, encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+        # Relative manifest entries are resolved against the manifest's directory.
+        paths = [source.parent / line for line in lines if line and not line.startswith("#")]
+
+    return [p.resolve() for p in paths if p.suffix.lower() in extensions and p.is_file()]
+
+
+def _parse(path: str, advanced: bool) -> Document:
+    # Runs in a worker process; the Document is pickled back to the parent.
+    return parse_document(path, advanced=advanced)
+
+
+class BulkIngestor:
+    """
+    Parses files on a process pool, chunks them as they arrive and embeds
+    the chunks of several files per `EmbeddingPipeline` run. Progress is
+    kept per file in the `ingestion_files` table: finished files are
+    skipped on the next run, and interrupted ones resume under the same
+    document id.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore = None,
+        sql_store: SQLStore = None,
+        bm25_index: BM25Index = None,
+        answer_cache: AnswerCache = None,
+        workers: int = Settings.BULK_PARSE_WORKERS,
+        group_chunks: int = Settings.BULK_EMBED_GROUP_CHUNKS,
+        advanced: bool = True,
+    ):
+        self.vector_store = vector_store or VectorStore()
+        self.sql_store = sql_store or SQLStore()
+        self.bm25_index = bm25_index or get_bm25_index()
+        self.answer_cache = answer_cache or get_answer_cache(self.vector_store.embedding_func.embed_query)
+        self.workers = workers
+        self.group_chunks = group_chunks
+        self.advanced = advanced
+        # Document ids carried over from an interrupted run, whose partial
+        # vectors must be dropped before the file is stored again.
+        self._resumed = set()
+
+    def run(self, paths: Iterable[Path]) -> BulkStats:
+        stats = BulkStats()
+        start = time.perf_counter()
+        todo = self._pending([Path(p) for p in paths], stats)
+        large = [p for p in todo if p.size >= Settings.BULK_STREAM_MIN_BYTES]
+        todo = [p for p in todo if p.size < Settings.BULK_STREAM_MIN_BYTES]
+        remote = [p for p in todo if self._remote(p)]
+        todo = [p for p in todo if not self._remote(p)]
+
+        logger.info(
+            f"[Bulk] {len(todo) + len(remote) + len(large)} files to ingest "
+            f"({len(remote)} via LlamaCloud, {len(large)} streamed), {stats.skipped} already done"
+        )
+
+        group: List[Tuple[schemas.IngestionFile, List[Document]]] = []
+        group_chunks = 0
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            parsed = chain(self._parsed(pool, todo, stats), self._parsed_remote(remote, stats))
+            for progress, doc in parsed:
+                chunks = self.vector_store.chunk_document(doc)
+                group.append((progress, chunks))
+                group_chunks += len(chunks)
+
+                if group_chunks >= self.group_chunks:
+                    self._store(group, stats, start)
+                    group, group_chunks = [], 0
+
+        if group:
+            self._store(group, stats, start)
+
+        for progress in large:
+            self._stream(progress, stats, start)
+
+        stats.seconds = time.perf_counter() - start
+        logger.info(
+            f"[Bulk] Ingested {stats.files} files ({stats.chunks} chunks) in {stats.seconds:.2f}s | "
+            f"{stats.files_per_sec:.2f} files/s, {stats.chunks_per_sec:.1f} chunks/s | "
+            f"skipped {stats.skipped}, failed {stats.failed}"
+        )
+        return stats
+
+    def _pending(self, paths: List[Path], stats: BulkStats) -> List[schemas.IngestionFile]:
+        known = self.sql_store.get_ingestion_files([str(p) for p in paths])
+        todo = []
+
+        for path in paths:
+            stat = path.stat()
+            previous = known.get(str(path))
+
+            if (
+                previous is not None
+                and previous.status == "done"
+                and previous.size == stat.st_size
+                and previous.mtime == stat.st_mtime
+            ):
+                stats.skipped += 1
+                continue
+
+            # Unchanged files that were interrupted keep their document id;
+            # whatever the last attempt stored under it is replaced.
+            resume = (
+                previous is not None
+                and previous.doc_id
+                and previous.size == stat.st_size
+                and previous.mtime == stat.st_mtime
+            )
+            doc_id = previous.doc_id if resume else str(uuid.uuid4())
+            if resume:
+                self._resumed.add(doc_id)
+            elif previous is not None and previous.doc_id:
+                # The file changed since it was ingested; its old content
+                # must not stay retrievable next to the new one.
+                self._discard(previous.doc_id)
+
+            todo.append(
+                schemas.IngestionFile(
+                    source_path=str(path),
+                    size=stat.st_size,
+                    mtime=stat.st_mtime,
+                    status="pending",
+                    doc_id=doc_id,
+                )
+            )
+
+        return todo
+
+    def _parsed(
+        self, pool: ProcessPoolExecutor, todo: List[schemas.IngestionFile], stats: BulkStats
+    ) -> Iterator[Tuple[schemas.IngestionFile, Document]]:
+        # Bounded window of parse jobs so parsed documents don't pile up in memory.
+        max_pending = self.workers * 2
+        queue = iter(todo)
+        pending: Dict = {}
+
+        while True:
+            for progress in queue:
+                pending[pool.submit(_parse, progress.source_path, self.advanced)] = progress
+                if len(pending) >= max_pending:
+                    break
+
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                progress = pending.pop(future)
+                try:
+                    doc = future.result()
+                except Exception as e:
+                    self._fail(progress, stats, f"parse {progress.source_path}", e)
+                    continue
+
+                yield progress, doc
+
+    def _parsed_remote(
+        self, todo: List[schemas.IngestionFile], stats: BulkStats
+    ) -> Iterator[Tuple[schemas.IngestionFile, Document]]:
+        batch_size = Settings.BULK_LLAMA_BATCH_FILES
+
+        for start in range(0, len(todo), batch_size):
+            batch = todo[start : start + batch_size]
+            docs = parse_documents([progress.source_path for progress in batch], advanced=True)
+
+            for progress, doc in zip(batch, docs):
+                if isinstance(doc, Exception):
+                    self._fail(progress, stats, f"parse {progress.source_path}", doc)
+                    continue
+
+                yield progress, doc
+
+    def _remote(self, progress: schemas.IngestionFile) -> bool:
+        return self.advanced and get_parser(progress.source_path, advanced=True).is_remote()
+
+    def _store(
+        self, group: List[Tuple[schemas.IngestionFile, List[Document]]], stats: BulkStats, start: float
+    ) -> None:
+        for progress, _ in group:
+            self.sql_store.save_ingestion_file(progress.model_copy(update={"status": "embedding"}))
+            if progress.doc_id in self._resumed:
+                self.vector_store.delete_document(progress.doc_id)
+
+        try:
+            self.vector_store.add_many({progress.doc_id: chunks for progress, chunks in group})
+            stored = group
+        except Exception as e:
+            logger.warning(f"[Bulk] Embedding a group of {len(group)} files failed ({e}), retrying file by file")
+            stored = []
+            for progress, chunks in group:
+                try:
+                    # The failed group may have upserted part of this file already.
+                    self.vector_store.delete_document(progress.doc_id)
+                    self.vector_store.add_many({progress.doc_id: chunks})
+                    stored.append((progress, chunks))
+                except Exception as e:
+                    self._replaced(progress.doc_id)
+                    self._fail(progress, stats, f"embed {progress.source_path}", e)
+
+        for progress, chunks in stored:
+            path = Path(progress.source_path)
+            self.bm25_index.add_document(progress.doc_id, chunks)
+            self.sql_store.complete_ingestion(
+                progress.doc_id,
+                schemas.DocumentCreate(
+                    filename=path.name,
+                    source_path=str(path),
+                    doc_type=path.suffix.lstrip("."),
+                    fingerprint=chunks[0].metadata.get("fingerprint") if chunks else None,
+                ),
+                [
+                    schemas.ChunkCreate(chunk_index=i, chunk_text=chunk.page_content)
+                    for i, chunk in enumerate(chunks)
+                ],
+                progress.model_copy(update={"status": "done", "chunks": len(chunks), "error": None}),
+            )
+            self._replaced(progress.doc_id)
+            REGISTRY.inc("pyxon_bulk_files_total", status="done")
+            stats.files += 1
+            stats.chunks += len(chunks)
+
+        self._log_progress(stats, start)
+
+    def _stream(self, progress: schemas.IngestionFile, stats: BulkStats, start: float) -> None:
+        path = Path(progress.source_path)
+        doc_id = progress.doc_id
+        # Local parsers read incrementally; LlamaCloud only returns whole documents.
+        advanced = self.advanced and path.suffix.lower() not in supported_extensions(advanced=False)
+
+        try:
+            parser = get_parser(path, advanced=advanced)
+        except Exception as e:
+            self._fail(progress, stats, f"open {path}", e)
+            return
+
+        self.sql_store.save_ingestion_file(progress.model_copy(update={"status": "embedding"}))
+        self.bm25_index.delete_document(doc_id)
+        if doc_id in self._resumed:
+            self.vector_store.delete_document(doc_id)
+        self.sql_store.start_streamed_document(
+            doc_id,
+            schemas.DocumentCreate(
+                filename=path.name,
+                source_path=str(path),
+                doc_type=path.suffix.lstrip("."),
+                fingerprint=file_fingerprint(path),
+            ),
+        )
+
+        def on_batch(batch: List[Document]):
+            self.bm25_index.append_chunks(doc_id, batch)
+            self.sql_store.append_chunks(
+                doc_id,
+                [
+                    schemas.ChunkCreate(chunk_index=chunk.metadata["chunk_index"], chunk_text=chunk.page_content)
+                    for chunk in batch
+                ],
+            )
+
+        try:
+            result = self.vector_store.add_stream(self.vector_store.chunk_stream(parser), doc_id, on_batch)
+        except Exception as e:
+            # Keep the document id, so a rerun clears the partial upload.
+            self._resumed.add(doc_id)
+            self.vector_store.delete_document(doc_id)
+            self.bm25_index.delete_document(doc_id)
+            self._replaced(doc_id)
+            self._fail(progress, stats, f"stream {path}", e)
+            return
+
+        self.sql_store.finish_streamed_document(
+            doc_id,
+            result.chunks,
+            progress.model_copy(update={"status": "done", "chunks": result.chunks, "error": None}),
+        )
+        self._replaced(doc_id)
+        REGISTRY.inc("pyxon_bulk_files_total", status="done")
+        stats.files += 1
+        stats.chunks += result.chunks
+        self._log_progress(stats, start)
+
+    def _discard(self, doc_id: str) -> None:
+        logger.info(f"[Bulk] Removing superseded document {doc_id}")
+        self.vector_store.delete_document(doc_id)
+        self.bm25_index.delete_document(doc_id)
+        self.sql_store.delete_document(doc_id)
+        self.answer_cache.invalidate(doc_id)
+
+    def _replaced(self, doc_id: str) -> None:
+        # Answers cached for a resumed document were built from its old chunks.
+        if doc_id in self._resumed:
+            self.answer_cache.invalidate(doc_id)
+
+    def _fail(self, progress: schemas.IngestionFile, stats: BulkStats, action: str, error: Exception) -> None:
+        logger.error(f"[Bulk] Failed to {action}: {error}")
+        REGISTRY.inc("pyxon_bulk_files_total", status="failed")
+        stats.failed += 1
+        self.sql_store.save_ingestion_file(
+            progress.model_copy(update={"status": "failed", "error": str(error)})
+        )
+
+    @staticmethod
+    def _log_progress(stats: BulkStats, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"[Bulk] {stats.files} files, {stats.chunks} chunks | "
+            f"{stats.files / elapsed:.2f} files/s, {stats.chunks / elapsed:.1f} chunks/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", type=Path, help="Directory to walk, or a manifest listing one path per line")
+    parser.add_argument("--workers", type=int, default=Settings.BULK_PARSE_WORKERS)
+    parser.add_argument("--group-chunks", type=int, default=Settings.BULK_EMBED_GROUP_CHUNKS)
+    parser.add_argument("--basic", action="store_true", help="Use the local parsers instead of LlamaCloud")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    advanced = not args.basic
+    paths = discover(args.source, advanced=advanced)
+    stats = BulkIngestor(workers=args.workers, group_chunks=args.group_chunks, advanced=advanced).run(paths)
+
+    print(
+        f"files {stats.files} | skipped {stats.skipped} | failed {stats.failed} | chunks {stats.chunks} | "
+        f"{stats.seconds:.2f}s | {stats.files_per_sec:.2f} files/s | {stats.chunks_per_sec:.1f} chunks/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
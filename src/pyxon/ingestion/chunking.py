@@ -0,0 +1,165 @@
+# src.pyxon.ingestion.chunking
+
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from src.config import Settings
+
+_PAGE_MARKER = re.compile(r"^Page number: (\d+)$")
+_PAGE_RULE = "-----"
+_HEADING = re.compile(r"^#{1,6}\s+(.+?)\s*#*$")
+_FENCE = re.compile(r"^(```|~~~)")
+_TABLE_SEPARATOR = re.compile(r"^\|?\s*:?-{3,}")
+
+
+@dataclass
+class _Section:
+    kind: str  # "text" | "table"
+    heading: Optional[str]
+    page: Optional[int]
+    lines: List[str] = field(default_factory=list)
+    caption: List[str] = field(default_factory=list)  # lead-in text kept with a table
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines).strip()
+
+
+class StructureChunker:
+    """
+    Splits parser output on page markers ("Page number: N"), markdown
+    headings and table boundaries, with no embedding calls. Only text
+    sections longer than `max_chars` go through `fallback` (the semantic
+    chunker); oversized tables are split by rows with the header repeated.
+    Each chunk records what produced it in `chunk_strategy`.
+    """
+
+    def __init__(
+        self,
+        fallback,
+        max_chars: int = Settings.STRUCTURE_CHUNK_MAX_CHARS,
+        min_chars: int = Settings.STRUCTURE_CHUNK_MIN_CHARS,
+    ):
+        self.fallback = fallback
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        chunks = []
+        for doc in documents:
+            for text, metadata in self.split_with_metadata(doc.page_content):
+                chunks.append(Document(page_content=text, metadata={**doc.metadata, **metadata}))
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk for chunk, _ in self.split_with_metadata(text)]
+
+    def split_with_metadata(self, text: str) -> List[Tuple[str, dict]]:
+        chunks = []
+        for section in self._pack(self._sections(text)):
+            metadata = {}
+            if section.heading:
+                metadata["section"] = section.heading
+            if section.page is not None:
+                metadata["page"] = section.page
+
+            for chunk, strategy in self._split_section(section):
+                chunks.append((chunk, {**metadata, "chunk_strategy": strategy}))
+
+        return chunks
+
+    def _sections(self, text: str) -> List[_Section]:
+        sections: List[_Section] = []
+        current: Optional[_Section] = None
+        heading, page = None, None
+        in_fence, after_marker = False, False
+
+        for line in text.split("\n"):
+            stripped = line.strip()
+
+            if not in_fence:
+                marker = _PAGE_MARKER.match(stripped)
+                if marker:
+                    page, current, after_marker = int(marker.group(1)), None, True
+                    continue
+                if after_marker and stripped == _PAGE_RULE:
+                    after_marker = False
+                    continue
+                after_marker = False
+
+                match = _HEADING.match(stripped)
+                is_table = stripped.startswith("|")
+                if match:
+                    heading = match.group(1)
+                    current = _Section("text", heading, page)
+                    sections.append(current)
+                elif current is None or (current.kind == "table") != is_table:
+                    current = _Section("table" if is_table else "text", heading, page)
+                    sections.append(current)
+
+            # Headings and table rows inside code blocks are plain text.
+            if _FENCE.match(stripped):
+                in_fence = not in_fence
+
+            current.lines.append(line)
+
+        return [section for section in sections if section.text]
+
+    def _pack(self, sections: List[_Section]) -> List[_Section]:
+        # A heading with a line or two under it is too little to retrieve on
+        # its own; fold it into the following section on the same page.
+        packed: List[_Section] = []
+        for section in sections:
+            prev = packed[-1] if packed else None
+            if (
+                prev is None
+                or prev.kind != "text"
+                or prev.page != section.page
+                or len(prev.text) >= self.min_chars
+            ):
+                packed.append(section)
+            elif section.kind == "table":
+                section.caption = prev.lines
+                packed[-1] = section
+            elif len(prev.text) + len(section.text) <= self.max_chars or len(section.text) > self.max_chars:
+                prev.lines.extend(section.lines)
+                prev.heading = prev.heading or section.heading
+            else:
+                packed.append(section)
+        return packed
+
+    def _split_section(self, section: _Section) -> List[Tuple[str, str]]:
+        text = section.text
+        if section.kind == "table":
+            chunks = self._split_table(section.lines)
+            caption = "\n".join(section.caption).strip()
+            if caption:
+                chunks[0] = f"{caption}\n{chunks[0]}"
+            return [(chunk, "table") for chunk in chunks]
+        if len(text) <= self.max_chars:
+            return [(text, "structure")]
+        return [(chunk, "semantic") for chunk in self.fallback.split_text(text)]
+
+    def _split_table(self, lines: List[str]) -> List[str]:
+        lines = [line for line in lines if line.strip()]
+        if len("\n".join(lines)) <= self.max_chars:
+            return ["\n".join(lines)]
+
+        has_header = len(lines) > 1 and _TABLE_SEPARATOR.match(lines[1].strip())
+        header, rows = (lines[:2], lines[2:]) if has_header else ([], lines)
+        header_size = sum(len(line) + 1 for line in header)
+
+        chunks, current, size = [], [], header_size
+        for row in rows:
+            if current and size + len(row) + 1 > self.max_chars:
+                chunks.append("\n".join(header + current))
+                current, size = [], header_size
+            current.append(row)
+            size += len(row) + 1
+        if current:
+            chunks.append("\n".join(header + current))
+
+        return chunks
@@ -0,0 +1,132 @@
+# src.pyxon.ingestion.pipeline
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.config import Settings
+from src.pyxon.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+UpsertFn = Callable[[List[Document], List[List[float]]], None]
+
+
+@dataclass
+class IngestionStats:
+    chunks: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+class RateLimiter:
+    """Spaces out calls so no more than `rate` happen per second. A rate of 0 disables limiting."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class EmbeddingPipeline:
+    """
+    Embeds chunks in size-bounded batches on a thread pool and hands each
+    finished batch to `upsert` while later batches are still embedding.
+    """
+
+    def __init__(
+        self,
+        embedding_func: Embeddings,
+        upsert: UpsertFn,
+        batch_size: int = Settings.EMBEDDING_BATCH_SIZE,
+        max_batch_chars: int = Settings.EMBEDDING_BATCH_MAX_CHARS,
+        concurrency: int = Settings.EMBEDDING_CONCURRENCY,
+        rate_limit: float = Settings.EMBEDDING_RATE_LIMIT,
+    ):
+        self.embedding_func = embedding_func
+        self.upsert = upsert
+        self.batch_size = batch_size
+        self.max_batch_chars = max_batch_chars
+        self.concurrency = concurrency
+        self.rate_limiter = RateLimiter(rate_limit)
+
+    def batches(self, chunks: Iterable[Document]) -> Iterator[List[Document]]:
+        batch: List[Document] = []
+        chars = 0
+
+        for chunk in chunks:
+            size = len(chunk.page_content)
+            if batch and (len(batch) >= self.batch_size or chars + size > self.max_batch_chars):
+                yield batch
+                batch, chars = [], 0
+
+            batch.append(chunk)
+            chars += size
+
+        if batch:
+            yield batch
+
+    def run(self, chunks: Iterable[Document]) -> IngestionStats:
+        stats = IngestionStats()
+        start = time.perf_counter()
+
+        # At most 2x concurrency batches are in flight, so memory stays bounded
+        # when `chunks` is a lazy stream.
+        max_pending = self.concurrency * 2
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pending = set()
+
+            for batch in self.batches(chunks):
+                pending.add(pool.submit(self._embed, batch))
+
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._drain(done, stats)
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                self._drain(done, stats)
+
+        stats.seconds = time.perf_counter() - start
+        REGISTRY.observe("pyxon_ingest_seconds", stats.seconds)
+        REGISTRY.inc("pyxon_ingest_chunks_total", stats.chunks)
+        logger.info(
+            f"[Ingest] Embedded and upserted {stats.chunks} chunks in {stats.batches} batches "
+            f"({stats.seconds:.2f}s, {stats.chunks_per_sec:.1f} chunks/s)"
+        )
+        return stats
+
+    def _embed(self, batch: List[Document]) -> Tuple[List[Document], List[List[float]]]:
+        self.rate_limiter.acquire()
+        vectors = self.embedding_func.embed_documents([chunk.page_content for chunk in batch])
+        return batch, vectors
+
+    def _drain(self, done, stats: IngestionStats) -> None:
+        for future in done:
+            batch, vectors = future.result()
+            self.upsert(batch, vectors)
+            stats.chunks += len(batch)
+            stats.batches += 1
@@ -0,0 +1,167 @@
+# src.pyxon.metrics
+
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from src.config import Settings
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Keeps the most recent `max_samples` observations plus running count and sum."""
+
+    def __init__(self, max_samples: int):
+        self.samples: deque = deque(maxlen=max_samples)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+        self.sum += value
+
+    def quantiles(self, qs=QUANTILES) -> Dict[float, float]:
+        if not self.samples:
+            return {q: float("nan") for q in qs}
+        values = np.percentile(np.fromiter(self.samples, dtype=np.float64), [q * 100 for q in qs])
+        return dict(zip(qs, values.tolist()))
+
+
+class MetricsRegistry:
+    """In-process registry of labelled histograms and counters."""
+
+    def __init__(self, max_samples: int = Settings.METRICS_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._histograms: Dict[str, Dict[LabelSet, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = _label_set(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.max_samples)
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = _label_set(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name: str, **labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> List[Dict[str, object]]:
+        """One row per series, suitable for a dataframe."""
+        rows = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                for labels, histogram in series.items():
+                    quantiles = histogram.quantiles()
+                    rows.append(
+                        {
+                            "metric": name,
+                            "labels": _format_labels(labels),
+                            "count": histogram.count,
+                            "mean": histogram.sum / histogram.count,
+                            "p50": quantiles[0.5],
+                            "p95": quantiles[0.95],
+                            "p99": quantiles[0.99],
+                        }
+                    )
+            for name, series in sorted(self._counters.items()):
+                for labels, value in series.items():
+                    rows.append({"metric": name, "labels": _format_labels(labels), "count": value})
+        return rows
+
+    def to_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} summary")
+                for labels, histogram in series.items():
+                    for q, value in histogram.quantiles().items():
+                        lines.append(f"{name}{_format_labels(labels + (('quantile', str(q)),))} {value}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _label_set(labels: Dict[str, str]) -> LabelSet:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def _record_node(name: str, state: dict, seconds: float) -> None:
+    REGISTRY.observe("pyxon_node_seconds", seconds, node=name)
+    REGISTRY.observe("pyxon_node_iteration", state.get("iteration", 0), node=name)
+    REGISTRY.observe("pyxon_node_candidates", len(state.get("retrieved_docs") or []), node=name, stage="retrieved")
+    REGISTRY.observe("pyxon_node_candidates", len(state.get("reranked_docs") or []), node=name, stage="reranked")
+
+
+def instrument_node(name: str) -> Callable[[Callable], Callable]:
+    """Record wall time, iteration and candidate counts for a (sync or async) graph node."""
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(state, **kwargs):
+                # `functools.wraps` exposes `fn`'s signature, so LangGraph
+                # injects the arguments it asks for (e.g. `writer`) here.
+                start = time.perf_counter()
+                result = await fn(state, **kwargs)
+                _record_node(name, result, time.perf_counter() - start)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(state, **kwargs):
+            start = time.perf_counter()
+            result = fn(state, **kwargs)
+            _record_node(name, result, time.perf_counter() - start)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,7 +1,11 @@
 from pathlib import Path
+from typing import List, Optional, Tuple, Union
 
 from langchain_core.documents import Document
 
+from src.config import Settings
+from src.pyxon.parsers.base import BaseParser
+from src.pyxon.parsers.cache import file_fingerprint, get_parse_cache
 from src.pyxon.parsers.docx import PyxonDocxParser
 from src.pyxon.parsers.llama import PyxonLlamaParser
 from src.pyxon.parsers.pdf import PyxonPDFParser
@@ -14,15 +18,17 @@ for parser_cls in [PyxonPDFParser, PyxonDocxParser, PyxonTxtParser]:
         _REGISTRY[ext] = parser_cls
 
 
-def parse_document(file_path: str | Path, advanced=True) -> Document:
+def supported_extensions(advanced=True) -> list[str]:
+    if advanced:
+        return list(PyxonLlamaParser.SUPPORTED_EXTENSIONS)
+    return list(_REGISTRY.keys())
+
+
+def get_parser(file_path: str | Path, advanced=True) -> BaseParser:
     path = Path(file_path)
 
     if advanced:
-        parser = PyxonLlamaParser(path)
-        doc = parser.parse()
-        parser.get_chunker_type()
-
-        return doc
+        return PyxonLlamaParser(path)
 
     ext = path.suffix.lower()
 
@@ -31,9 +37,69 @@ def parse_document(file_path: str | Path, advanced=True) -> Document:
             f"Unsupported file type: '{ext}'. Supported: {list(_REGISTRY.keys())}"
         )
 
-    parser = _REGISTRY[ext](file_path=path)
+    return _REGISTRY[ext](file_path=path)
 
-    doc = parser.parse()
-    parser.get_chunker_type()
 
+def parse_document(file_path: str | Path, advanced=True, fingerprint: str = None) -> Document:
+    parser = get_parser(file_path, advanced)
+
+    doc = _from_cache(parser, fingerprint)
+    if doc is None:
+        doc = _to_cache(parser, parser.parse())
+
+    return _finish(parser, doc)
+
+
+def parse_documents(file_paths: List[str | Path], advanced=True) -> List[Union[Document, Exception]]:
+    """
+    Parse many files, sending the LlamaCloud ones concurrently over one event
+    loop and client. Results are in input order, with the exception in place
+    of any file that failed.
+    """
+    results: List[Union[Document, Exception, None]] = [None] * len(file_paths)
+    remote: List[Tuple[int, PyxonLlamaParser]] = []
+
+    for i, file_path in enumerate(file_paths):
+        try:
+            parser = get_parser(file_path, advanced)
+            doc = _from_cache(parser)
+            if doc is not None:
+                results[i] = _finish(parser, doc)
+            elif isinstance(parser, PyxonLlamaParser) and parser.is_remote():
+                remote.append((i, parser))
+            else:
+                results[i] = _finish(parser, _to_cache(parser, parser.parse()))
+        except Exception as e:
+            results[i] = e
+
+    if remote:
+        docs = PyxonLlamaParser.parse_many([parser for _, parser in remote])
+        for (i, parser), doc in zip(remote, docs):
+            results[i] = doc if isinstance(doc, Exception) else _finish(parser, _to_cache(parser, doc))
+
+    return results
+
+
+def _from_cache(parser: BaseParser, fingerprint: str = None) -> Optional[Document]:
+    if not Settings.PARSE_CACHE_ENABLED:
+        return None
+
+    parser.fingerprint = fingerprint or file_fingerprint(parser._file_path)
+    doc = get_parse_cache().get(parser.fingerprint, parser.PARSER_NAME, parser.parser_options())
+    if doc is not None:
+        doc.metadata["source"] = str(parser._file_path)
+    return doc
+
+
+def _to_cache(parser: BaseParser, doc: Document) -> Document:
+    if parser.fingerprint is not None:
+        doc.metadata["fingerprint"] = parser.fingerprint
+        get_parse_cache().put(parser.fingerprint, parser.PARSER_NAME, parser.parser_options(), doc)
+    return doc
+
+
+def _finish(parser: BaseParser, doc: Document) -> Document:
+    # Re-decided on every call, so chunker settings are never stale in the cache.
+    parser._doc = doc
+    parser.get_chunker_type()
     return doc
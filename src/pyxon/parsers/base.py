@@ -1,16 +1,57 @@
 # src.pyxon.parsers.base
 
+import math
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Iterator
 
-import numpy as np
 from langchain_core.documents import Document
 
 from src.config import Settings
 
 
+class SegmentStats:
+    """Running mean/std of paragraph lengths (Welford), fed segment by segment."""
+
+    def __init__(self):
+        self.count = 0
+        self.chars = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, segment: str) -> None:
+        # Paragraphs are newline-separated, as in the joined page_content.
+        for paragraph in segment.split("\n"):
+            length = len(paragraph)
+            self.count += 1
+            self.chars += length
+            delta = length - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (length - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._m2 / self.count) if self.count else 0.0
+
+    def chunker_metadata(self) -> dict:
+        metadata = {
+            "chunk_size": int(self.mean),
+            "chunk_overlap": int(self.mean * Settings.CHUNK_OVERLAP),
+        }
+
+        if self.mean == 0 or self.count <= 1:
+            metadata["chunking_strategy"] = "FIXED"
+        elif self.std / self.mean < Settings.PARAGRAPH_VARIATION_THRESH:
+            metadata["chunking_strategy"] = "FIXED"
+        else:
+            metadata["chunking_strategy"] = "DYNAMIC"
+
+        return metadata
+
+
 class BaseParser(ABC):
     SUPPORTED_EXTENSIONS: list[str] = []
+    PARSER_NAME: str = ""
 
     def __init__(self, file_path: Path):
         if not file_path.exists():
@@ -24,6 +65,9 @@ class BaseParser(ABC):
 
         self._file_path = file_path
         self._doc = Document(page_content="")
+        self.stats = SegmentStats()
+        # SHA-256 of the file, set by `parse_document` when the parse cache is used.
+        self.fingerprint: str | None = None
 
         super().__init__()
 
@@ -31,26 +75,31 @@ class BaseParser(ABC):
     def parse(self) -> Document:
         pass
 
-    def get_chunker_type(self):
-        paragraphs = self._doc.page_content.split("\n")
-
-        paragraphs_len = np.array([len(p) for p in paragraphs])
+    def iter_segments(self) -> Iterator[str]:
+        """
+        Document text as a stream of segments (pages, paragraphs or lines)
+        that joined with "\\n" give `parse().page_content`. Parsers that
+        can read incrementally override this; the default parses whole.
+        """
+        yield from self.parse().page_content.split("\n")
 
-        std = paragraphs_len.std()
-        mean = paragraphs_len.mean()
+    def stream(self) -> Iterator[str]:
+        """`iter_segments`, updating `self.stats` as segments pass through."""
+        self.stats = SegmentStats()
+        for segment in self.iter_segments():
+            self.stats.update(segment)
+            yield segment
 
-        self._doc.metadata["chunk_size"] = int(mean)
-        self._doc.metadata["chunk_overlap"] = int(mean * Settings.CHUNK_OVERLAP)
+    def parser_options(self) -> dict:
+        """Options that change the parse output; part of the parse cache key."""
+        return {}
 
-        if mean == 0 or len(paragraphs) <= 1:
-            self._doc.metadata["chunking_strategy"] = "FIXED"
-            return "FIXED"
+    def base_metadata(self) -> dict:
+        return {"source": str(self._file_path), "parser": self.PARSER_NAME}
 
-        cv = std / mean
+    def get_chunker_type(self):
+        stats = SegmentStats()
+        stats.update(self._doc.page_content)
 
-        if cv < Settings.PARAGRAPH_VARIATION_THRESH:
-            self._doc.metadata["chunking_strategy"] = "FIXED"
-            return "FIXED"
-        else:
-            self._doc.metadata["chunking_strategy"] = "DYNAMIC"
-            return "DYNAMIC"
+        self._doc.metadata.update(stats.chunker_metadata())
+        return self._doc.metadata["chunking_strategy"]
@@ -0,0 +1,84 @@
+# src.pyxon.parsers.cache
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.documents import Document
+
+from src.config import Settings
+
+
+def fingerprint_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_fingerprint(path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of the file contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Parsed documents on disk, keyed by (content fingerprint, parser,
+    parser options), plus the LlamaCloud file id for each fingerprint so
+    a re-parse with new options does not upload the same bytes again.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def key(fingerprint: str, parser: str, options: dict) -> str:
+        raw = json.dumps([fingerprint, parser, options], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, fingerprint: str, parser: str, options: dict) -> Optional[Document]:
+        row = self._read(self._doc_path(self.key(fingerprint, parser, options)))
+        if row is None:
+            return None
+        return Document(page_content=row["page_content"], metadata=row["metadata"])
+
+    def put(self, fingerprint: str, parser: str, options: dict, doc: Document) -> None:
+        row = {"page_content": doc.page_content, "metadata": doc.metadata}
+        self._write(self._doc_path(self.key(fingerprint, parser, options)), row)
+
+    def get_file_id(self, fingerprint: str) -> Optional[str]:
+        row = self._read(self.cache_dir / "files" / f"{fingerprint}.json")
+        return row["file_id"] if row else None
+
+    def put_file_id(self, fingerprint: str, file_id: str) -> None:
+        self._write(self.cache_dir / "files" / f"{fingerprint}.json", {"file_id": file_id})
+
+    def _doc_path(self, key: str) -> Path:
+        return self.cache_dir / "docs" / key[:2] / f"{key}.json"
+
+    @staticmethod
+    def _read(path: Path) -> Optional[dict]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _write(path: Path, row: dict) -> None:
+        # Written to a temp file and renamed, so concurrent readers (e.g. bulk
+        # ingestion workers) never see a partial entry.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(row, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=None)
+def get_parse_cache(cache_dir: Path = None) -> ParseCache:
+    return ParseCache(cache_dir or Settings.PARSE_CACHE_DIR)
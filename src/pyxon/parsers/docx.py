@@ -1,5 +1,7 @@
 # src.pyxon.parsers.docx
 
+from typing import Iterator
+
 from docx import Document as DocxDocument
 from langchain_core.documents import Document
 
@@ -8,6 +10,7 @@ from src.pyxon.parsers.base import BaseParser
 
 class PyxonDocxParser(BaseParser):
     SUPPORTED_EXTENSIONS: list[str] = [".doc", ".docx"]
+    PARSER_NAME: str = "python-docx"
 
     def __init__(self, file_path):
         super().__init__(file_path)
@@ -20,7 +23,11 @@ class PyxonDocxParser(BaseParser):
 
         self._doc = Document(
             page_content=content,
-            metadata={"source": str(self._file_path), "parser": "python-docx"},
+            metadata=self.base_metadata(),
         )
 
         return self._doc
+
+    def iter_segments(self) -> Iterator[str]:
+        for paragraph in DocxDocument(self._file_path).paragraphs:
+            yield paragraph.text
@@ -1,59 +1,148 @@
 # src.pyxon.parsers.llama
 
 import asyncio
+import logging
+import random
 from pathlib import Path
+from typing import List, Union
 
 from langchain_core.documents import Document
 from llama_cloud import AsyncLlamaCloud
 
 from src.config import Settings
 from src.pyxon.parsers.base import BaseParser
+from src.pyxon.parsers.cache import get_parse_cache
 from src.pyxon.parsers.txt import PyxonTxtParser
 
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = {408, 409, 429}
+# Statuses for a file id the server no longer knows, e.g. an expired upload.
+_GONE_STATUSES = {404, 410}
+
+
+def _new_client() -> AsyncLlamaCloud:
+    return AsyncLlamaCloud(api_key=Settings.LLAMAINDEX_API_KEY)
+
+
+def _retryable(error: Exception) -> bool:
+    """Rate limits, server errors and dropped connections; not bad requests."""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in _RETRY_STATUSES or status >= 500
+    # llama_cloud's connection and timeout errors carry no status code.
+    return isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)) or any(
+        cls.__name__ == "APIConnectionError" for cls in type(error).__mro__
+    )
+
 
 class PyxonLlamaParser(BaseParser):
     SUPPORTED_EXTENSIONS = [".doc", ".docx", ".pdf", ".txt"]
+    PARSER_NAME = "llama_cloud"
+    PARSE_OPTIONS = {
+        "tier": "agentic",  # Agentic tier includes image descriptions in markdown automatically
+        "version": "latest",
+        "input_options": {},
+        "output_options": {
+            "markdown": {
+                "tables": {"output_tables_as_markdown": True},
+            },
+        },
+        "processing_options": {
+            "ignore": {"ignore_diagonal_text": True},
+        },
+        "expand": ["markdown", "text"],
+    }
 
-    def __init__(self, file_path: Path):
+    def __init__(self, file_path: Path, client: AsyncLlamaCloud = None):
         super().__init__(file_path)
 
-        self.client = AsyncLlamaCloud(api_key=Settings.LLAMAINDEX_API_KEY)
+        # Shared by `parse_many`; single-file `parse` makes its own per call.
+        self.client = client
 
-    def parse(self) -> Document:
-        suffix = self._file_path.suffix.lower()
+    def parser_options(self) -> dict:
+        return self.PARSE_OPTIONS
+
+    def is_remote(self) -> bool:
+        return self._file_path.suffix.lower() != ".txt"
 
-        if suffix == ".txt":
+    def parse(self) -> Document:
+        if not self.is_remote():
             parser = PyxonTxtParser(self._file_path)
             self._doc = parser.parse()
             return self._doc
 
         try:
-            self._doc = asyncio.run(self._parse_async())
+            self._doc = asyncio.run(self._parse_with_retry(self.client or _new_client()))
             self.get_chunker_type()
             return self._doc
         except Exception as e:
             raise RuntimeError(f"Failed to parse {self._file_path}: {e}")
 
-    async def _parse_async(self) -> Document:
-        file_obj = await self.client.files.create(
-            file=str(self._file_path), purpose="parse"
-        )
+    @classmethod
+    def parse_many(
+        cls, parsers: List["PyxonLlamaParser"], concurrency: int = None
+    ) -> List[Union[Document, Exception]]:
+        """
+        Parse several files on one event loop and one client, at most
+        `concurrency` at a time. Results are in input order; a file that
+        still fails after retries gets its exception in place of a Document.
+        """
+        return asyncio.run(cls._parse_many_async(parsers, concurrency or Settings.LLAMA_CONCURRENCY))
 
-        result = await self.client.parsing.parse(
-            file_id=file_obj.id,
-            tier="agentic",  # Agentic tier includes image descriptions in markdown automatically
-            version="latest",
-            input_options={},
-            output_options={
-                "markdown": {
-                    "tables": {"output_tables_as_markdown": True},
-                },
-            },
-            processing_options={
-                "ignore": {"ignore_diagonal_text": True},
-            },
-            expand=["markdown", "text"],
-        )
+    @staticmethod
+    async def _parse_many_async(
+        parsers: List["PyxonLlamaParser"], concurrency: int
+    ) -> List[Union[Document, Exception]]:
+        client = _new_client()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(parser: "PyxonLlamaParser") -> Union[Document, Exception]:
+            try:
+                if not parser.is_remote():
+                    return parser.parse()
+
+                async with semaphore:
+                    parser._doc = await parser._parse_with_retry(parser.client or client)
+                    return parser._doc
+            except Exception as e:
+                logger.error(f"[LlamaParser] Failed to parse {parser._file_path}: {e}")
+                return RuntimeError(f"Failed to parse {parser._file_path}: {e}")
+
+        return await asyncio.gather(*(run(parser) for parser in parsers))
+
+    async def _parse_with_retry(self, client: AsyncLlamaCloud) -> Document:
+        for attempt in range(Settings.LLAMA_MAX_RETRIES + 1):
+            try:
+                return await self._parse_async(client)
+            except Exception as e:
+                if attempt == Settings.LLAMA_MAX_RETRIES or not _retryable(e):
+                    raise
+                # Exponential backoff with jitter, so concurrent files do not retry in lockstep.
+                delay = Settings.LLAMA_RETRY_BASE_S * 2**attempt * random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"[LlamaParser] {self._file_path.name}: attempt {attempt + 1} failed ({e}), "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def _parse_async(self, client: AsyncLlamaCloud) -> Document:
+        file_id = self._cached_file_id()
+
+        if file_id is not None:
+            try:
+                result = await client.parsing.parse(file_id=file_id, **self.PARSE_OPTIONS)
+            except Exception as e:
+                # Uploaded files can expire server-side; upload once more.
+                # Anything else (rate limits, outages) goes to the retry loop.
+                if getattr(e, "status_code", None) not in _GONE_STATUSES:
+                    raise
+                logger.warning(f"[LlamaParser] Cached file {file_id} gone ({e}), re-uploading")
+                file_id = None
+
+        if file_id is None:
+            file_id = await self._upload(client)
+            result = await client.parsing.parse(file_id=file_id, **self.PARSE_OPTIONS)
 
         if result.markdown and result.markdown.pages:
             content = "\n\n".join(
@@ -69,3 +158,16 @@ class PyxonLlamaParser(BaseParser):
         }
 
         return Document(page_content=content, metadata=metadata)
+
+    def _cached_file_id(self):
+        if self.fingerprint is None:
+            return None
+        return get_parse_cache().get_file_id(self.fingerprint)
+
+    async def _upload(self, client: AsyncLlamaCloud) -> str:
+        file_obj = await client.files.create(
+            file=str(self._file_path), purpose="parse"
+        )
+        if self.fingerprint is not None:
+            get_parse_cache().put_file_id(self.fingerprint, file_obj.id)
+        return file_obj.id
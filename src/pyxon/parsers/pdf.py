@@ -1,25 +1,119 @@
 # src.pyxon.parsers.pdf
 
+import logging
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
 from langchain_core.documents import Document
 from pypdf import PdfReader
 
+from src.config import Settings
 from src.pyxon.parsers.base import BaseParser
 
+logger = logging.getLogger(__name__)
+
+
+class _PageTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _PageTimeout()
+
+
+def _extract_range(path: str, start: int, stop: int, timeout: float) -> Tuple[List[str], List[int]]:
+    """
+    Extract pages [start, stop) in a worker process with its own reader.
+    Returns (texts, timed-out page numbers); a page that exceeds `timeout`
+    seconds is returned as an empty string.
+    """
+    reader = PdfReader(path)
+    texts, timed_out = [], []
+    # SIGALRM only exists on Unix; elsewhere pages run without a deadline.
+    use_alarm = timeout > 0 and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+
+    try:
+        for page_no in range(start, stop):
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            try:
+                texts.append(reader.pages[page_no].extract_text())
+            except _PageTimeout:
+                texts.append("")
+                timed_out.append(page_no)
+            finally:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous)
+
+    return texts, timed_out
+
 
 class PyxonPDFParser(BaseParser):
     SUPPORTED_EXTENSIONS: list[str] = [".pdf"]
+    PARSER_NAME: str = "pypdf"
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, workers: Optional[int] = None):
         super().__init__(file_path)
+        self.workers = Settings.PDF_WORKERS if workers is None else workers
+        self.timed_out_pages: List[int] = []
 
     def parse(self) -> Document:
-        pdf_reader = PdfReader(self._file_path)
-
-        pages = [page.extract_text() for page in pdf_reader.pages]
+        pages = list(self._iter_pages())
 
         self._doc = Document(
             page_content="\n".join(pages),
-            metadata={"source": str(self._file_path), "parser": "pypdf"},
+            metadata=self.base_metadata(),
         )
+        if self.timed_out_pages:
+            self._doc.metadata["timed_out_pages"] = self.timed_out_pages
 
         return self._doc
+
+    def iter_segments(self) -> Iterator[str]:
+        yield from self._iter_pages()
+
+    def _iter_pages(self) -> Iterator[str]:
+        self.timed_out_pages = []
+        reader = PdfReader(self._file_path)
+        n_pages = len(reader.pages)
+
+        if self._parallel(n_pages):
+            yield from self._iter_pages_parallel(n_pages)
+        else:
+            for page in reader.pages:
+                yield page.extract_text()
+
+    def _parallel(self, n_pages: int) -> bool:
+        # No nested pools inside a worker process, e.g. when bulk ingestion
+        # already parses files in parallel.
+        return (
+            self.workers > 1
+            and n_pages >= Settings.PDF_PARALLEL_MIN_PAGES
+            and multiprocessing.parent_process() is None
+        )
+
+    def _iter_pages_parallel(self, n_pages: int) -> Iterator[str]:
+        # Several contiguous ranges per worker even out pages of uneven cost.
+        n_ranges = min(n_pages, self.workers * 4)
+        bounds = [n_pages * i // n_ranges for i in range(n_ranges + 1)]
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [
+                pool.submit(_extract_range, str(self._file_path), start, stop, Settings.PDF_PAGE_TIMEOUT_S)
+                for start, stop in zip(bounds, bounds[1:])
+            ]
+
+            # Collected in submission order, so pages come back in document order.
+            for future in futures:
+                texts, timed_out = future.result()
+                if timed_out:
+                    logger.warning(f"[PDF] {self._file_path.name}: pages {timed_out} timed out, left empty")
+                    self.timed_out_pages.extend(timed_out)
+                yield from texts
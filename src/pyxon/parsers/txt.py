@@ -1,5 +1,7 @@
 # src.pyxon.parsers.txt
 
+from typing import Iterator
+
 from langchain_core.documents import Document
 
 from src.pyxon.parsers.base import BaseParser
@@ -7,6 +9,7 @@ from src.pyxon.parsers.base import BaseParser
 
 class PyxonTxtParser(BaseParser):
     SUPPORTED_EXTENSIONS: list[str] = [".txt"]
+    PARSER_NAME: str = "txt"
 
     def __init__(self, file_path):
         super().__init__(file_path)
@@ -17,6 +20,16 @@ class PyxonTxtParser(BaseParser):
 
         self._doc = Document(
             page_content=content,
-            metadata={"source": str(self._file_path), "parser": "txt"},
+            metadata=self.base_metadata(),
         )
         return self._doc
+
+    def iter_segments(self) -> Iterator[str]:
+        # Line by line, so memory does not grow with the file.
+        line = ""
+        with open(self._file_path) as f:
+            for line in f:
+                yield line.rstrip("\n")
+
+        if line.endswith("\n") or not line:
+            yield ""
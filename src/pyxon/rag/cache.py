@@ -0,0 +1,166 @@
+# src.pyxon.rag.cache
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.config import Settings
+from src.pyxon.retrieval.bm25 import tokenize
+
+CacheKey = Tuple[str, str]
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(tokenize(question))
+
+
+@dataclass
+class _Entry:
+    answer: str
+    embedding: np.ndarray
+    created_at: float
+
+
+class AnswerCache:
+    """
+    Answers keyed by (document_id, normalized question).
+
+    Exact key matches are served directly; otherwise the question embedding
+    is compared against cached questions for the same document and the best
+    one is reused if its cosine similarity clears `similarity_threshold`.
+    Entries expire after `ttl_seconds` and the least recently used ones are
+    dropped past `max_entries`.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], List[float]],
+        similarity_threshold: float = Settings.ANSWER_CACHE_SIMILARITY,
+        ttl_seconds: float = Settings.ANSWER_CACHE_TTL_SECONDS,
+        max_entries: int = Settings.ANSWER_CACHE_MAX_ENTRIES,
+    ):
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._by_document: Dict[str, Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        # Earliest time any entry can expire; the full sweep is skipped until then.
+        self._next_expiry = float("inf")
+
+    def get(self, document_id: str, question: str) -> Optional[str]:
+        key = (document_id, normalize_question(question))
+
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.get(key)
+            if entry is not None and self._fresh(entry):
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry.answer
+
+            candidates = [k for k in self._by_document.get(document_id, ()) if self._fresh(self._entries[k])]
+
+        if candidates:
+            query = self._embed(question)
+
+            with self._lock:
+                candidates = [k for k in candidates if k in self._entries]
+                if candidates:
+                    matrix = np.stack([self._entries[k].embedding for k in candidates])
+                    sims = matrix @ query
+                    best = int(np.argmax(sims))
+
+                    if sims[best] >= self.similarity_threshold:
+                        self._entries.move_to_end(candidates[best])
+                        self.semantic_hits += 1
+                        return self._entries[candidates[best]].answer
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, document_id: str, question: str, answer: str) -> None:
+        key = (document_id, normalize_question(question))
+        entry = _Entry(answer=answer, embedding=self._embed(question), created_at=time.time())
+
+        with self._lock:
+            self._evict_expired()
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._by_document.setdefault(document_id, set()).add(key)
+            self._next_expiry = min(self._next_expiry, entry.created_at + self.ttl_seconds)
+
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._forget(old_key)
+
+    def invalidate(self, document_id: str) -> None:
+        with self._lock:
+            for key in self._by_document.pop(document_id, set()):
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def _fresh(self, entry: _Entry, now: Optional[float] = None) -> bool:
+        return (now or time.time()) - entry.created_at < self.ttl_seconds
+
+    def _evict_expired(self) -> None:
+        now = time.time()
+        if now < self._next_expiry:
+            return
+
+        for key in [k for k, entry in self._entries.items() if not self._fresh(entry, now)]:
+            del self._entries[key]
+            self._forget(key)
+
+        self._next_expiry = min(
+            (entry.created_at + self.ttl_seconds for entry in self._entries.values()), default=float("inf")
+        )
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embed_fn(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _forget(self, key: CacheKey) -> None:
+        keys = self._by_document.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_document[key[0]]
+
+
+_shared: Optional[AnswerCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_answer_cache(embed_fn: Callable[[str], List[float]]) -> AnswerCache:
+    """
+    Process-wide answer cache, so ingestion code can invalidate the entries
+    the UI serves. `embed_fn` is only used by the call that creates it.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = AnswerCache(embed_fn)
+        return _shared
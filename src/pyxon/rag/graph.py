@@ -3,11 +3,19 @@
 from langgraph.graph import END, START, StateGraph
 
 from src.config import Settings
-from src.pyxon.rag.nodes import (generate_node, reflect_node, rerank_node,
+from src.pyxon.metrics import instrument_node
+from src.pyxon.rag.nodes import (agenerate_node, areflect_node, arerank_node,
+                                 aretrieve_node, arewrite_query_node,
+                                 generate_node, reflect_node, rerank_node,
                                  retrieve_node, rewrite_query_node)
 from src.pyxon.rag.state import AgentState
 
-flow = StateGraph(AgentState)
+
+def route_after_rerank(state: AgentState) -> str:
+    if state.get("reflection_skipped"):
+        return "generate_node"
+    else:
+        return "reflect_node"
 
 
 def route_after_reflect(state: AgentState) -> str:
@@ -17,21 +25,38 @@ def route_after_reflect(state: AgentState) -> str:
         return "generate_node"
 
 
-flow.add_node("retrieve_node", retrieve_node)
-flow.add_node("rerank_node", rerank_node)
-flow.add_node("reflect_node", reflect_node)
-flow.add_node("rewrite_query_node", rewrite_query_node)
-flow.add_node("generate_node", generate_node)
+def build_flow(retrieve, rerank, reflect, rewrite_query, generate) -> StateGraph:
+    flow = StateGraph(AgentState)
 
-flow.add_edge(START, "retrieve_node")
-flow.add_edge("retrieve_node", "rerank_node")
-flow.add_edge("rerank_node", "reflect_node")
-flow.add_conditional_edges(
-    "reflect_node",
-    route_after_reflect,
-    {"rewrite_query_node": "rewrite_query_node", "generate_node": "generate_node"},
-)
-flow.add_edge("rewrite_query_node", "retrieve_node")
-flow.add_edge("generate_node", END)
+    flow.add_node("retrieve_node", instrument_node("retrieve_node")(retrieve))
+    flow.add_node("rerank_node", instrument_node("rerank_node")(rerank))
+    flow.add_node("reflect_node", instrument_node("reflect_node")(reflect))
+    flow.add_node("rewrite_query_node", instrument_node("rewrite_query_node")(rewrite_query))
+    flow.add_node("generate_node", instrument_node("generate_node")(generate))
+
+    flow.add_edge(START, "retrieve_node")
+    flow.add_edge("retrieve_node", "rerank_node")
+    flow.add_conditional_edges(
+        "rerank_node",
+        route_after_rerank,
+        {"reflect_node": "reflect_node", "generate_node": "generate_node"},
+    )
+    flow.add_conditional_edges(
+        "reflect_node",
+        route_after_reflect,
+        {"rewrite_query_node": "rewrite_query_node", "generate_node": "generate_node"},
+    )
+    flow.add_edge("rewrite_query_node", "retrieve_node")
+    flow.add_edge("generate_node", END)
 
+    return flow
+
+
+flow = build_flow(retrieve_node, rerank_node, reflect_node, rewrite_query_node, generate_node)
 app = flow.compile()
+
+# Same graph with async nodes, driven through `await async_app.ainvoke(...)`.
+async_flow = build_flow(
+    aretrieve_node, arerank_node, areflect_node, arewrite_query_node, agenerate_node
+)
+async_app = async_flow.compile()
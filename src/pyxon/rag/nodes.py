@@ -1,17 +1,24 @@
 # src.pyxon.rag.nodes
+import asyncio
 import json
 import logging
+import time
 from uuid import UUID
 
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_groq import ChatGroq
+from langgraph.config import get_stream_writer
+from langgraph.types import StreamWriter
 
 from src.pyxon.rag.schemas import ReflectionDecision
 from src.pyxon.rag.utils import format_docs_summary, format_previous_critiques, format_queries_history
+from src.pyxon.retrieval.bm25 import get_bm25_index
 from src.pyxon.retrieval.reranker import CrossEncoderReranker
+from src.pyxon.retrieval.retriever import HybridRetriever
 from src.pyxon.storage.vs import VectorStore
 
 from src.config import Settings
+from src.pyxon.metrics import REGISTRY
 from src.pyxon.rag.prompts import (
     GENERATION_PROMPT,
     QUERY_REWRITE_PROMPT,
@@ -23,12 +30,37 @@ logger = logging.getLogger(__name__)
 
 
 _vs = VectorStore()._vs
+_hybrid = HybridRetriever(
+    vector_store=_vs,
+    bm25_index=get_bm25_index(),
+    k=Settings.RETRIEVAL_CANDIDATES,
+    top_n=Settings.RETRIEVAL_CANDIDATES,
+    fusion_method=Settings.FUSION_METHOD,
+    alpha=Settings.FUSION_ALPHA,
+)
 _reranker = CrossEncoderReranker()
 _llm = ChatGroq(model=Settings.LLM_MODEL_NAME, api_key=Settings.GROQ_API_KEY)
 
-def retrieve_node(state: AgentState) -> AgentState:
+
+def _emit_progress(stage: str, state: AgentState, writer: StreamWriter = None) -> None:
+    """
+    Publish a progress event on the graph's `custom` stream mode. Async nodes
+    pass the `writer` LangGraph injects: `get_stream_writer` relies on
+    context propagation into async tasks, which Python 3.10 lacks.
+    """
+    if writer is None:
+        try:
+            writer = get_stream_writer()
+        except RuntimeError:
+            # Called outside a graph run, e.g. a node invoked directly.
+            return
+    writer({"stage": stage, "iteration": state["iteration"]})
+
+
+def _start_retrieval(state: AgentState, writer: StreamWriter = None):
     state['iteration'] += 1
     current_iteration = state['iteration']
+    _emit_progress("retrieving", state, writer)
     
     logger.info(f"[Retrieve] Starting iteration {current_iteration}")
     
@@ -43,23 +75,45 @@ def retrieve_node(state: AgentState) -> AgentState:
     
     logger.debug(f"[Retrieve] Query: '{query[:100]}...' | Threshold: {similarity_threshold} | Filter: {metadata_filter}")
 
-    search_kwargs = {"k": 20, "similarity_score_threshold": similarity_threshold}
+    search_kwargs = {"k": Settings.RETRIEVAL_CANDIDATES, "score_threshold": similarity_threshold}
     if metadata_filter:
         search_kwargs["filter"] = metadata_filter
         logger.info(f"[Retrieve] Applying metadata filter: {metadata_filter}")
 
+    return query, metadata_filter, search_kwargs
+
+
+def _finish_retrieval(state: AgentState, retrieved_docs, timings) -> AgentState:
+    state["retrieved_docs"] = retrieved_docs
+    state["retrieval_timings"] = timings
+    for leg, ms in timings.items():
+        REGISTRY.observe("pyxon_retrieval_leg_seconds", ms / 1000, leg=leg.removesuffix("_ms"))
+    logger.info(f"[Retrieve] Retrieved {len(retrieved_docs)} documents (Iteration {state['iteration']}) | Timings (ms): {timings}")
+    
+    if retrieved_docs:
+        top_score = getattr(retrieved_docs[0], 'metadata', {}).get('score', 'N/A')
+        logger.debug(f"[Retrieve] Top doc score: {top_score}")
+
+    return state
+
+
+def retrieve_node(state: AgentState) -> AgentState:
+    query, metadata_filter, search_kwargs = _start_retrieval(state)
+
     try:
-        retrieved_docs = _vs.search(
-            query=query, 
-            search_type="similarity_score_threshold",
-            search_kwargs=search_kwargs
-        )
-        state["retrieved_docs"] = retrieved_docs
-        logger.info(f"[Retrieve] Retrieved {len(retrieved_docs)} documents (Iteration {current_iteration})")
-        
-        if retrieved_docs:
-            top_score = getattr(retrieved_docs[0], 'metadata', {}).get('score', 'N/A')
-            logger.debug(f"[Retrieve] Top doc score: {top_score}")
+        if Settings.RETRIEVAL_MODE == "hybrid":
+            results, timings = _hybrid.retrieve(query, metadata_filter, search_kwargs["score_threshold"])
+            retrieved_docs = [doc for doc, _ in results]
+        else:
+            start = time.perf_counter()
+            retrieved_docs = _vs.search(
+                query=query, 
+                search_type="similarity_score_threshold",
+                **search_kwargs
+            )
+            timings = {"dense_ms": (time.perf_counter() - start) * 1000}
+
+        _finish_retrieval(state, retrieved_docs, timings)
             
     except Exception as e:
         logger.error(f"[Retrieve] Failed to retrieve documents: {str(e)}")
@@ -67,43 +121,116 @@ def retrieve_node(state: AgentState) -> AgentState:
     
     return state
 
-def rerank_node(state: AgentState) -> AgentState:
+async def aretrieve_node(state: AgentState, writer: StreamWriter = None) -> AgentState:
+    query, metadata_filter, search_kwargs = _start_retrieval(state, writer)
+
+    try:
+        if Settings.RETRIEVAL_MODE == "hybrid":
+            results, timings = await asyncio.to_thread(
+                _hybrid.retrieve, query, metadata_filter, search_kwargs["score_threshold"]
+            )
+            retrieved_docs = [doc for doc, _ in results]
+        else:
+            start = time.perf_counter()
+            retrieved_docs = await _vs.asearch(
+                query=query, 
+                search_type="similarity_score_threshold",
+                **search_kwargs
+            )
+            timings = {"dense_ms": (time.perf_counter() - start) * 1000}
+
+        _finish_retrieval(state, retrieved_docs, timings)
+            
+    except Exception as e:
+        logger.error(f"[Retrieve] Failed to retrieve documents: {str(e)}")
+        state["retrieved_docs"] = []
+    
+    return state
+
+def _start_rerank(state: AgentState, writer: StreamWriter = None):
     query = state["queries"][-1]
     top_k = state.get("top_k", Settings.TOP_K)
     docs_count = len(state.get("retrieved_docs", []))
+    _emit_progress("reranking", state, writer)
     
     logger.info(f"[Rerank] Reranking {docs_count} documents for query: '{query[:80]}...' | TopK: {top_k}")
 
+    return query, top_k
+
+
+def _clears_confidence_gate(reranked_docs) -> bool:
+    if not Settings.CONFIDENCE_GATE_ENABLED or not reranked_docs:
+        return False
+
+    scores = [doc.metadata.get("rerank_score", float("-inf")) for doc in reranked_docs]
+    confident = sum(score >= Settings.CONFIDENCE_GATE_DOC_SCORE for score in scores)
+
+    return (
+        max(scores) >= Settings.CONFIDENCE_GATE_TOP_SCORE
+        and confident >= min(Settings.CONFIDENCE_GATE_MIN_DOCS, len(scores))
+    )
+
+
+def _finish_rerank(state: AgentState, reranked_docs) -> AgentState:
+    state["reranked_docs"] = reranked_docs
+    state["reflection_skipped"] = _clears_confidence_gate(reranked_docs)
+    REGISTRY.inc("pyxon_reflection_gate_total", path="skipped" if state["reflection_skipped"] else "reflect")
+    logger.info(f"[Rerank] Reranked to top {len(reranked_docs)} documents | Skip reflection: {state['reflection_skipped']}")
+    
+    if reranked_docs:
+        scores = [getattr(doc, 'metadata', {}).get('rerank_score', 0) for doc in reranked_docs[:3]]
+        logger.debug(f"[Rerank] Top 3 scores: {scores}")
+
+    return state
+
+
+def rerank_node(state: AgentState) -> AgentState:
+    query, top_k = _start_rerank(state)
+
     try:
         reranked_docs = _reranker.rerank(
             query=query, 
             documents=state["retrieved_docs"], 
             top_k=top_k
         )
-        state["reranked_docs"] = reranked_docs
-        logger.info(f"[Rerank] Reranked to top {len(reranked_docs)} documents")
-        
-        if reranked_docs:
-            scores = [getattr(doc, 'metadata', {}).get('score', 0) for doc in reranked_docs[:3]]
-            logger.debug(f"[Rerank] Top 3 scores: {scores}")
+        _finish_rerank(state, reranked_docs)
             
     except Exception as e:
         logger.error(f"[Rerank] Reranking failed: {str(e)}")
         state["reranked_docs"] = state["retrieved_docs"][:top_k]  
+        state["reflection_skipped"] = False
 
     return state
 
-def reflect_node(state: AgentState) -> AgentState:
+async def arerank_node(state: AgentState, writer: StreamWriter = None) -> AgentState:
+    query, top_k = _start_rerank(state, writer)
+
+    try:
+        # CPU-bound cross-encoder work stays off the event loop.
+        reranked_docs = await asyncio.to_thread(
+            _reranker.rerank, query, state["retrieved_docs"], top_k
+        )
+        _finish_rerank(state, reranked_docs)
+            
+    except Exception as e:
+        logger.error(f"[Rerank] Reranking failed: {str(e)}")
+        state["reranked_docs"] = state["retrieved_docs"][:top_k]  
+        state["reflection_skipped"] = False
+
+    return state
+
+def _reflection_input(state: AgentState, writer: StreamWriter = None) -> dict:
     queries = state.get("queries", [])
     critiques = state.get("critiques", [])
     docs = state.get("reranked_docs", [])
     current_top_k = state.get("top_k", Settings.TOP_K)
     current_filter = state.get("metadata_filter", None)
     iteration = state['iteration']
+    _emit_progress("reflecting", state, writer)
     
     logger.info(f"[Reflect] Reflection iteration {iteration} | Queries so far: {len(queries)} | Docs to evaluate: {len(docs)}")
     
-    prompt_input = {
+    return {
         "original_q": state['messages'][-1].content,
         "queries_history": format_queries_history(queries),
         "previous_critiques": format_previous_critiques(critiques),
@@ -113,37 +240,68 @@ def reflect_node(state: AgentState) -> AgentState:
         "iteration_count": iteration
     }
 
-    try:
-        llm = _llm.with_structured_output(ReflectionDecision)
-        chain = REFLECTION_PROMPT | llm 
-        response: ReflectionDecision = chain.invoke(prompt_input)
+
+def _reflection_chain():
+    llm = _llm.with_structured_output(ReflectionDecision)
+    return REFLECTION_PROMPT | llm 
+
+
+def _apply_reflection(state: AgentState, response: ReflectionDecision) -> AgentState:
+    critiques = state.get("critiques", [])
+    current_filter = state.get("metadata_filter", None)
+    iteration = state['iteration']
+
+    logger.info(f"[Reflect] Decision: continue={response.should_continue} | New top_k: {response.top_k}")
+    logger.debug(f"[Reflect] Critique: {response.critique[:200]}...")
+
+    if response.should_continue:
+        state["critiques"] = critiques + [response.critique]
+        state["should_continue"] = True
+        state["top_k"] = response.top_k
+        
+        logger.info(f"[Reflect] Adding critique #{len(state['critiques'])}. Will continue to rewrite.")
         
-        logger.info(f"[Reflect] Decision: continue={response.should_continue} | New top_k: {response.top_k}")
-        logger.debug(f"[Reflect] Critique: {response.critique[:200]}...")
+        # Handle filter update
+        if response.filter and response.filter.get("document_id"):
+            try:
+                UUID(response.filter["document_id"])
+                state["metadata_filter"] = response.filter
+                logger.info(f"[Reflect] Updated metadata filter: {response.filter}")
+            except ValueError as e:
+                logger.warning(f"[Reflect] Invalid UUID in filter, keeping current filter. Error: {e}")
+                state["metadata_filter"] = current_filter
+        else:
+            state["metadata_filter"] = None
+            if response.filter:
+                logger.debug(f"[Reflect] Filter provided but no document_id, ignoring")
+    else:
+        state["should_continue"] = False
+        logger.info(f"[Reflect] Stopping loop. Final iteration: {iteration}")
 
-        if response.should_continue:
-            state["critiques"] = critiques + [response.critique]
-            state["should_continue"] = True
-            state["top_k"] = response.top_k
-            
-            logger.info(f"[Reflect] Adding critique #{len(state['critiques'])}. Will continue to rewrite.")
+    return state
+
+
+def reflect_node(state: AgentState) -> AgentState:
+    prompt_input = _reflection_input(state)
+
+    try:
+        with REGISTRY.timer("pyxon_llm_seconds", call="reflect"):
+            response: ReflectionDecision = _reflection_chain().invoke(prompt_input)
+        _apply_reflection(state, response)
             
-            # Handle filter update
-            if response.filter and response.filter.get("document_id"):
-                try:
-                    UUID(response.filter["document_id"])
-                    state["metadata_filter"] = response.filter
-                    logger.info(f"[Reflect] Updated metadata filter: {response.filter}")
-                except ValueError as e:
-                    logger.warning(f"[Reflect] Invalid UUID in filter, keeping current filter. Error: {e}")
-                    state["metadata_filter"] = current_filter
-            else:
-                state["metadata_filter"] = None
-                if response.filter:
-                    logger.debug(f"[Reflect] Filter provided but no document_id, ignoring")
-        else:
-            state["should_continue"] = False
-            logger.info(f"[Reflect] Stopping loop. Final iteration: {iteration}")
+    except Exception as e:
+        logger.error(f"[Reflect] Reflection failed: {str(e)}. Stopping to prevent infinite loop.")
+        state["should_continue"] = False
+    
+    return state
+
+async def areflect_node(state: AgentState, writer: StreamWriter = None) -> AgentState:
+    prompt_input = _reflection_input(state, writer)
+
+    try:
+        with REGISTRY.timer("pyxon_llm_seconds", call="reflect"):
+            response: ReflectionDecision = await _reflection_chain().ainvoke(prompt_input)
+        _apply_reflection(state, response)
             
     except Exception as e:
         logger.error(f"[Reflect] Reflection failed: {str(e)}. Stopping to prevent infinite loop.")
@@ -151,10 +309,11 @@ def reflect_node(state: AgentState) -> AgentState:
     
     return state
 
-def rewrite_query_node(state: AgentState) -> AgentState:
+def _rewrite_prompt(state: AgentState, writer: StreamWriter = None) -> str:
     original_question = state['messages'][-1].content
     latest_critique = state["critiques"][-1]
     iteration = state['iteration']
+    _emit_progress("rewriting", state, writer)
 
     logger.info(f"[Rewrite] Rewriting query (Iteration {iteration}) based on critique")
     logger.debug(f"[Rewrite] Original: '{original_question[:100]}...'")
@@ -163,27 +322,47 @@ def rewrite_query_node(state: AgentState) -> AgentState:
     previous_queries = format_queries_history(state["queries"])
     previous_critiques = format_previous_critiques(state["critiques"])
 
-    rewrite_prompt = QUERY_REWRITE_PROMPT.format(
+    return QUERY_REWRITE_PROMPT.format(
         original_question=original_question,
         latest_critique=latest_critique,
         previous_queries=previous_queries,
         previous_critiques=previous_critiques,
     )
 
+
+def rewrite_query_node(state: AgentState) -> AgentState:
+    rewrite_prompt = _rewrite_prompt(state)
+
     try:
-        new_query = _llm.invoke(rewrite_prompt).content.strip()
+        with REGISTRY.timer("pyxon_llm_seconds", call="rewrite"):
+            new_query = _llm.invoke(rewrite_prompt).content.strip()
         state["queries"].append(new_query)
         logger.info(f"[Rewrite] New query generated ({len(state['queries'])} total): '{new_query[:100]}...'")
     except Exception as e:
         logger.error(f"[Rewrite] Query rewrite failed: {str(e)}. Keeping original query.")
-        state["queries"].append(original_question)  # Fallback
+        state["queries"].append(state['messages'][-1].content)  # Fallback
 
     return state
 
-def generate_node(state: AgentState) -> AgentState:
+async def arewrite_query_node(state: AgentState, writer: StreamWriter = None) -> AgentState:
+    rewrite_prompt = _rewrite_prompt(state, writer)
+
+    try:
+        with REGISTRY.timer("pyxon_llm_seconds", call="rewrite"):
+            new_query = (await _llm.ainvoke(rewrite_prompt)).content.strip()
+        state["queries"].append(new_query)
+        logger.info(f"[Rewrite] New query generated ({len(state['queries'])} total): '{new_query[:100]}...'")
+    except Exception as e:
+        logger.error(f"[Rewrite] Query rewrite failed: {str(e)}. Keeping original query.")
+        state["queries"].append(state['messages'][-1].content)  # Fallback
+
+    return state
+
+def _generation_prompt(state: AgentState, writer: StreamWriter = None):
     question = state["messages"][-1].content if state["messages"] else ""
     iteration = state['iteration']
     docs_count = len(state.get("reranked_docs", []))
+    _emit_progress("generating", state, writer)
 
     logger.info(f"[Generate] Generating answer (Iteration {iteration}) using {docs_count} documents")
 
@@ -194,18 +373,47 @@ def generate_node(state: AgentState) -> AgentState:
         context = "No relevant documents found."
         logger.warning(f"[Generate] No documents available for generation!")
 
-    prompt = GENERATION_PROMPT.format(context=context, input=question)
+    return GENERATION_PROMPT.format(context=context, input=question)
+
+
+def _set_answer(state: AgentState, answer: str, failed: bool = False) -> AgentState:
+    state["messages"].append(AIMessage(content=answer))
+    state["answer"] = answer
+    state["generation_failed"] = failed
+    return state
+
+
+def _generation_failed(state: AgentState, e: Exception) -> AgentState:
+    logger.error(f"[Generate] Generation failed: {str(e)}")
+    error_msg = "Sorry, I encountered an error generating the response."
+    return _set_answer(state, error_msg, failed=True)
+
+
+def generate_node(state: AgentState) -> AgentState:
+    prompt = _generation_prompt(state)
+    
+    try:
+        # Streamed so that `messages` stream mode forwards tokens as they arrive.
+        with REGISTRY.timer("pyxon_llm_seconds", call="generate"):
+            answer = "".join(chunk.content for chunk in _llm.stream(prompt))
+        _set_answer(state, answer)
+        logger.info(f"[Generate] Answer generated ({len(answer)} chars)")
+        logger.debug(f"[Generate] Answer preview: '{answer[:200]}...'")
+    except Exception as e:
+        _generation_failed(state, e)
+
+    return state
+
+async def agenerate_node(state: AgentState, writer: StreamWriter = None) -> AgentState:
+    prompt = _generation_prompt(state, writer)
     
     try:
-        answer = _llm.invoke(prompt).content
-        state["messages"].append(AIMessage(content=answer))
-        state["answer"] = answer
+        with REGISTRY.timer("pyxon_llm_seconds", call="generate"):
+            answer = "".join([chunk.content async for chunk in _llm.astream(prompt)])
+        _set_answer(state, answer)
         logger.info(f"[Generate] Answer generated ({len(answer)} chars)")
         logger.debug(f"[Generate] Answer preview: '{answer[:200]}...'")
     except Exception as e:
-        logger.error(f"[Generate] Generation failed: {str(e)}")
-        error_msg = "Sorry, I encountered an error generating the response."
-        state["messages"].append(AIMessage(content=error_msg))
-        state["answer"] = error_msg
+        _generation_failed(state, e)
 
-    return state
\ No newline at end of file
+    return state
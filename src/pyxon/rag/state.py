@@ -16,4 +16,7 @@ class AgentState(TypedDict):
     reranked_docs: List[Document]
     top_k: int
     metadata_filter: Optional[Dict[str, Any]]
+    retrieval_timings: Dict[str, float]
+    reflection_skipped: bool
+    generation_failed: bool
     answer: str
\ No newline at end of file
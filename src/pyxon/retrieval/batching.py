@@ -0,0 +1,123 @@
+# src.pyxon.retrieval.batching
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Sequence
+
+from src.pyxon.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+PredictFn = Callable[[List[Sequence[str]]], Sequence[float]]
+
+
+class RerankBatcher:
+    """
+    Micro-batching front for a cross-encoder shared by concurrent sessions.
+
+    Callers `submit` their (query, text) pairs and get a Future. A single
+    worker thread drains the queue, merging requests until `max_batch_size`
+    pairs are collected or `max_wait_ms` has passed since the first one,
+    then runs one `predict_fn` call for the whole batch.
+    """
+
+    def __init__(self, predict_fn: PredictFn, max_batch_size: int, max_wait_ms: float):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self.batches = 0
+        self.batch_size_histogram: Counter = Counter()
+        self.requests_per_batch_histogram: Counter = Counter()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="rerank-batcher", daemon=True)
+        self._worker.start()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, pairs: List[Sequence[str]]) -> Future:
+        future: Future = Future()
+        if not pairs:
+            future.set_result([])
+        else:
+            self._queue.put((pairs, future))
+        return future
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self) -> Dict[str, object]:
+        with self._stats_lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "batches": self.batches,
+                "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+                "requests_per_batch_histogram": dict(sorted(self.requests_per_batch_histogram.items())),
+            }
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            # Requests still waiting behind the one just taken.
+            REGISTRY.observe("pyxon_rerank_queue_depth", self.queue_depth)
+            batch, stop = self._collect(first)
+            self._predict(batch)
+
+            if stop:
+                return
+
+    def _collect(self, first):
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+
+            batch.append(item)
+            size += len(item[0])
+
+        return batch, False
+
+    def _predict(self, batch) -> None:
+        pairs = [pair for request_pairs, _ in batch for pair in request_pairs]
+
+        try:
+            scores = self.predict_fn(pairs)
+        except Exception as e:
+            logger.error(f"[Rerank] Batched prediction failed: {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for request_pairs, future in batch:
+            future.set_result([float(s) for s in scores[offset : offset + len(request_pairs)]])
+            offset += len(request_pairs)
+
+        REGISTRY.observe("pyxon_rerank_batch_requests", len(batch))
+        with self._stats_lock:
+            self.batches += 1
+            # Power-of-two buckets keep the histogram small.
+            self.batch_size_histogram[1 << (len(pairs) - 1).bit_length()] += 1
+            self.requests_per_batch_histogram[len(batch)] += 1
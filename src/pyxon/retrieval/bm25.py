@@ -0,0 +1,430 @@
+# src.pyxon.retrieval.bm25
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.config import Settings
+
+# Arabic harakat, superscript alef and tatweel are dropped so that
+# vocalized and plain spellings share one term.
+_DIACRITICS = re.compile(r"[\u0640\u064B-\u065F\u0670]")
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(_DIACRITICS.sub("", text.lower()))
+
+
+class _Segment:
+    """Immutable postings for the chunks of one document, stored as CSR-style numpy arrays."""
+
+    ARRAYS = ("term_ids", "offsets", "docs", "tfs", "doc_lens")
+    CHUNKS_FILE = "chunks.jsonl"
+
+    def __init__(self, document_id: str, path: Optional[Path], chunks=None, **arrays):
+        self.document_id = document_id
+        self.path = path
+        self.term_ids: np.ndarray = arrays["term_ids"]
+        self.offsets: np.ndarray = arrays["offsets"]
+        self.docs: np.ndarray = arrays["docs"]
+        self.tfs: np.ndarray = arrays["tfs"]
+        self.doc_lens: np.ndarray = arrays["doc_lens"]
+        self._chunks: Optional[List[Document]] = chunks
+
+    @property
+    def chunks(self) -> List[Document]:
+        # Chunk texts are only read from disk once the segment produces a hit.
+        if self._chunks is None:
+            with open(self.path / self.CHUNKS_FILE, encoding="utf-8") as f:
+                self._chunks = [
+                    Document(page_content=row["text"], metadata=row["metadata"])
+                    for row in map(json.loads, f)
+                ]
+        return self._chunks
+
+    @property
+    def doc_freqs(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def postings(self, term_id: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        pos = np.searchsorted(self.term_ids, term_id)
+        if pos == len(self.term_ids) or self.term_ids[pos] != term_id:
+            return None
+        start, end = self.offsets[pos], self.offsets[pos + 1]
+        return self.docs[start:end], self.tfs[start:end]
+
+    def save(self, path: Path) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(path / f"{name}.npy", getattr(self, name))
+
+        with open(path / self.CHUNKS_FILE, "w", encoding="utf-8") as f:
+            for chunk in self.chunks:
+                row = {"text": chunk.page_content, "metadata": chunk.metadata}
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+        self.path = path
+
+    @classmethod
+    def load(cls, document_id: str, path: Path) -> "_Segment":
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in cls.ARRAYS}
+        return cls(document_id, path, **arrays)
+
+
+def _term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class _Vocabulary:
+    """
+    Term to id map. Terms are keyed by a 64-bit hash and get ids in order of
+    first sight. The hashes are appended to `path` in id order, and on load
+    that file is memory-mapped and sorted once for binary search, so opening
+    an index never parses the vocabulary.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._sorted = np.zeros(0, dtype=np.uint64)
+        self._sorted_ids = np.zeros(0, dtype=np.int64)
+        self._size = 0
+        # Hashes added since load, and those of them not written yet.
+        self._added: Dict[int, int] = {}
+        self._unsaved: List[int] = []
+        self._ids: Dict[str, int] = {}
+
+        if path is not None and path.exists() and path.stat().st_size:
+            hashes = np.memmap(path, dtype=np.uint64, mode="r")
+            self._sorted_ids = np.argsort(hashes, kind="stable")
+            self._sorted = np.asarray(hashes[self._sorted_ids])
+            self._size = len(hashes)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get(self, term: str) -> Optional[int]:
+        term_id = self._ids.get(term)
+        if term_id is not None:
+            return term_id
+
+        key = _term_hash(term)
+        term_id = self._added.get(key)
+        if term_id is None:
+            pos = np.searchsorted(self._sorted, np.uint64(key))
+            if pos < len(self._sorted) and self._sorted[pos] == np.uint64(key):
+                term_id = int(self._sorted_ids[pos])
+
+        if term_id is not None:
+            self._ids[term] = term_id
+        return term_id
+
+    def intern(self, term: str) -> int:
+        term_id = self.get(term)
+        if term_id is None:
+            term_id = self._size
+            key = _term_hash(term)
+            self._added[key] = term_id
+            self._unsaved.append(key)
+            self._ids[term] = term_id
+            self._size += 1
+        return term_id
+
+    def save(self) -> None:
+        if not self._unsaved:
+            return
+        with open(self.path, "ab") as f:
+            f.write(np.asarray(self._unsaved, dtype=np.uint64).tobytes())
+        self._unsaved = []
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index with one segment per document.
+
+    Terms are interned to integer ids. Segments can be added or dropped
+    without touching the others, and are persisted as .npy files that are
+    memory-mapped on load. A document normally has one segment; streamed
+    documents get one per appended batch.
+    """
+
+    META_FILE = "meta.json"
+    VOCAB_FILE = "vocab.u64"
+    DF_FILE = "df.i64"
+    SEGMENTS_LOG = "segments.jsonl"
+    SEGMENTS_DIR = "segments"
+
+    def __init__(self, index_dir: Optional[Path] = None, k1: float = Settings.BM25_K1, b: float = Settings.BM25_B):
+        self.index_dir = Path(index_dir) if index_dir else None
+        self.k1 = k1
+        self.b = b
+
+        self.vocab = _Vocabulary(self.index_dir / self.VOCAB_FILE if self.index_dir else None)
+        self.segments: Dict[str, List[_Segment]] = {}
+        self._df = np.zeros(0, dtype=np.int64)
+        self._n_docs = 0
+        self._total_len = 0
+        self._lock = threading.RLock()
+
+        if self.index_dir and (self.index_dir / self.META_FILE).exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return self._n_docs
+
+    def add_chunks(self, chunks: Iterable[Document]) -> None:
+        by_document: Dict[str, List[Document]] = {}
+        for chunk in chunks:
+            by_document.setdefault(str(chunk.metadata.get("document_id", "")), []).append(chunk)
+
+        for document_id, doc_chunks in by_document.items():
+            self.add_document(document_id, doc_chunks)
+
+    def add_document(self, document_id: str, chunks: List[Document]) -> None:
+        """Index `chunks` as the segment for `document_id`, replacing any previous one."""
+        with self._lock:
+            if document_id in self.segments:
+                self._remove_files(self._drop(document_id))
+
+            self._append(document_id, chunks)
+
+    def append_chunks(self, document_id: str, chunks: List[Document]) -> None:
+        """Add `chunks` as one more segment of `document_id`, keeping its earlier segments."""
+        with self._lock:
+            segment = self._append(document_id, chunks)
+            # Chunk texts are re-read from disk on demand, so a streamed
+            # document never holds all of its text in memory.
+            if segment.path is not None:
+                segment._chunks = None
+
+    def _append(self, document_id: str, chunks: List[Document]) -> _Segment:
+        segment = self._build_segment(document_id, chunks)
+        parts = self.segments.setdefault(document_id, [])
+        parts.append(segment)
+        self._df[segment.term_ids] += segment.doc_freqs
+        self._n_docs += len(segment.doc_lens)
+        self._total_len += int(segment.doc_lens.sum())
+
+        if self.index_dir:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            # Terms first, so a saved segment never refers to unknown ids.
+            self.vocab.save()
+            path = self._segment_path(document_id, len(parts) - 1)
+            segment.save(path)
+            self._save_df(segment.term_ids)
+            self._log_segments({"add": document_id, "name": path.name})
+            self._save_meta()
+
+        return segment
+
+    def delete_document(self, document_id: str) -> None:
+        with self._lock:
+            if document_id not in self.segments:
+                return
+
+            self._remove_files(self._drop(document_id))
+
+    def search(
+        self, query: str, k: int = 20, document_ids: Optional[Iterable[str]] = None
+    ) -> List[Tuple[Document, float]]:
+        with self._lock:
+            term_ids = sorted({i for i in map(self.vocab.get, tokenize(query)) if i is not None})
+            if not term_ids or not self._n_docs:
+                return []
+
+            if document_ids is None:
+                segments = [s for parts in self.segments.values() for s in parts]
+            else:
+                segments = [s for d in document_ids for s in self.segments.get(d, [])]
+
+            idf = self._idf(np.asarray(term_ids))
+            avgdl = self._total_len / self._n_docs
+
+            seg_refs, rows, scores = [], [], []
+            for seg_no, segment in enumerate(segments):
+                seg_scores = self._score_segment(segment, term_ids, idf, avgdl)
+                hits = np.flatnonzero(seg_scores)
+                if len(hits):
+                    seg_refs.append(np.full(len(hits), seg_no))
+                    rows.append(hits)
+                    scores.append(seg_scores[hits])
+
+        if not scores:
+            return []
+
+        seg_refs = np.concatenate(seg_refs)
+        rows = np.concatenate(rows)
+        scores = np.concatenate(scores)
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (segments[seg_refs[i]].chunks[rows[i]], float(scores[i]))
+            for i in top
+        ]
+
+    def _score_segment(
+        self, segment: _Segment, term_ids: List[int], idf: np.ndarray, avgdl: float
+    ) -> np.ndarray:
+        # Term-at-a-time accumulation over this segment's postings.
+        scores = np.zeros(len(segment.doc_lens), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * segment.doc_lens / avgdl)
+
+        for term_id, term_idf in zip(term_ids, idf):
+            postings = segment.postings(term_id)
+            if postings is None:
+                continue
+            docs, tfs = postings
+            scores[docs] += term_idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+
+        return scores
+
+    def _idf(self, term_ids: np.ndarray) -> np.ndarray:
+        df = self._df[term_ids]
+        return np.log((self._n_docs - df + 0.5) / (df + 0.5) + 1.0)
+
+    def _intern(self, tokens: List[str]) -> np.ndarray:
+        ids = [self.vocab.intern(token) for token in tokens]
+        if len(self.vocab) > len(self._df):
+            # Capacity doubles, so growing the vocabulary is amortized O(1) per term.
+            grown = np.zeros(max(len(self.vocab), 2 * len(self._df)), dtype=np.int64)
+            grown[: len(self._df)] = self._df
+            self._df = grown
+        return np.asarray(ids, dtype=np.int32)
+
+    def _build_segment(self, document_id: str, chunks: List[Document]) -> _Segment:
+        terms, docs, tfs, doc_lens = [], [], [], []
+
+        for row, chunk in enumerate(chunks):
+            token_ids = self._intern(tokenize(chunk.page_content))
+            unique, counts = np.unique(token_ids, return_counts=True)
+            terms.append(unique)
+            docs.append(np.full(len(unique), row, dtype=np.int32))
+            tfs.append(counts.astype(np.float32))
+            doc_lens.append(len(token_ids))
+
+        terms = np.concatenate(terms) if terms else np.zeros(0, dtype=np.int32)
+        docs = np.concatenate(docs) if docs else np.zeros(0, dtype=np.int32)
+        tfs = np.concatenate(tfs) if tfs else np.zeros(0, dtype=np.float32)
+
+        order = np.lexsort((docs, terms))
+        terms, docs, tfs = terms[order], docs[order], tfs[order]
+        term_ids, starts = np.unique(terms, return_index=True)
+
+        return _Segment(
+            document_id,
+            None,
+            chunks=list(chunks),
+            term_ids=term_ids.astype(np.int32),
+            offsets=np.append(starts, len(terms)).astype(np.int64),
+            docs=docs,
+            tfs=tfs,
+            doc_lens=np.asarray(doc_lens, dtype=np.float32),
+        )
+
+    def _drop(self, document_id: str) -> List[_Segment]:
+        parts = self.segments.pop(document_id)
+        for segment in parts:
+            self._df[segment.term_ids] -= segment.doc_freqs
+            self._n_docs -= len(segment.doc_lens)
+            self._total_len -= int(segment.doc_lens.sum())
+
+        if self.index_dir:
+            for segment in parts:
+                self._save_df(segment.term_ids)
+            self._log_segments({"drop": document_id})
+        return parts
+
+    @staticmethod
+    def _remove_files(segments: List[_Segment]) -> None:
+        for segment in segments:
+            if segment.path is not None:
+                shutil.rmtree(segment.path, ignore_errors=True)
+
+    def _segment_path(self, document_id: str, part: int = 0) -> Path:
+        name = hashlib.sha1(document_id.encode("utf-8")).hexdigest()[:16]
+        if part:
+            name = f"{name}-{part}"
+        return self.index_dir / self.SEGMENTS_DIR / name
+
+    def _save_meta(self) -> None:
+        # Parameters only; vocabulary, document frequencies and the segment
+        # list are written incrementally by `_save_df` and `_log_segments`.
+        if (self.index_dir / self.META_FILE).exists():
+            return
+        meta = {"k1": self.k1, "b": self.b}
+        tmp_path = self.index_dir / f"{self.META_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.index_dir / self.META_FILE)
+
+    def _save_df(self, term_ids: np.ndarray) -> None:
+        """Write the document frequencies of `term_ids` in place, growing the file to the vocabulary."""
+        if not len(self.vocab):
+            return
+
+        path = self.index_dir / self.DF_FILE
+        path.touch()
+        if path.stat().st_size < len(self.vocab) * 8:
+            os.truncate(path, len(self.vocab) * 8)
+
+        df = np.memmap(path, dtype=np.int64, mode="r+", shape=(len(self.vocab),))
+        df[term_ids] = self._df[term_ids]
+        df.flush()
+
+    def _log_segments(self, entry: Dict[str, str]) -> None:
+        with open(self.index_dir / self.SEGMENTS_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _load(self) -> None:
+        with open(self.index_dir / self.META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.k1 = meta["k1"]
+        self.b = meta["b"]
+
+        df_path = self.index_dir / self.DF_FILE
+        if df_path.exists() and df_path.stat().st_size:
+            # Copy-on-write: updates stay in RAM until `_save_df` writes them.
+            self._df = np.memmap(df_path, dtype=np.int64, mode="c")
+        if len(self._df) < len(self.vocab):
+            # Terms saved by a batch that did not get to write its frequencies.
+            self._df = np.concatenate([self._df, np.zeros(len(self.vocab) - len(self._df), dtype=np.int64)])
+
+        names: Dict[str, List[str]] = {}
+        log_path = self.index_dir / self.SEGMENTS_LOG
+        if log_path.exists():
+            with open(log_path, encoding="utf-8") as f:
+                for entry in map(json.loads, f):
+                    if "drop" in entry:
+                        names.pop(entry["drop"], None)
+                    else:
+                        names.setdefault(entry["add"], []).append(entry["name"])
+
+        segments_dir = self.index_dir / self.SEGMENTS_DIR
+        self.segments = {
+            doc_id: [_Segment.load(doc_id, segments_dir / name) for name in parts]
+            for doc_id, parts in names.items()
+        }
+
+        lens = [segment.doc_lens for parts in self.segments.values() for segment in parts]
+        self._n_docs = sum(len(doc_lens) for doc_lens in lens)
+        self._total_len = int(sum(doc_lens.sum() for doc_lens in lens))
+
+
+@lru_cache(maxsize=None)
+def get_bm25_index(index_dir: Path = None) -> BM25Index:
+    return BM25Index(index_dir or Settings.BM25_INDEX_DIR)
@@ -0,0 +1,106 @@
+# src.pyxon.retrieval.fusion
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+FUSION_METHODS = ("weighted", "rrf")
+
+
+def chunk_uid(doc: Document) -> str:
+    """Stable identity of a chunk across documents: `<document_id>:<chunk_index>`."""
+    meta = doc.metadata
+    return f"{meta.get('document_id', '')}:{meta.get('chunk_index', '')}"
+
+
+def min_max(scores: np.ndarray) -> np.ndarray:
+    if not len(scores):
+        return scores
+    low, high = scores.min(), scores.max()
+    if high == low:
+        return np.ones_like(scores)
+    return (scores - low) / (high - low)
+
+
+def fuse_scores(
+    ids_a: np.ndarray,
+    scores_a: np.ndarray,
+    ids_b: np.ndarray,
+    scores_b: np.ndarray,
+    method: str = "weighted",
+    alpha: float = 0.6,
+    rrf_k: int = 60,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fuse two ranked candidate lists over a shared id space.
+
+    `weighted` is alpha * minmax(a) + (1 - alpha) * minmax(b); `rrf` is
+    alpha / (rrf_k + rank_a) + (1 - alpha) / (rrf_k + rank_b). Ids missing
+    from one list contribute 0 for that side. Returns (ids, scores) sorted
+    by fused score, best first.
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unsupported fusion method: '{method}'. Supported: {list(FUSION_METHODS)}")
+
+    ids, inverse = np.unique(np.concatenate([ids_a, ids_b]), return_inverse=True)
+    pos_a, pos_b = inverse[: len(ids_a)], inverse[len(ids_a) :]
+
+    if method == "rrf":
+        contrib_a = alpha / (rrf_k + _ranks(scores_a))
+        contrib_b = (1 - alpha) / (rrf_k + _ranks(scores_b))
+    else:
+        contrib_a = alpha * min_max(np.asarray(scores_a, dtype=np.float64))
+        contrib_b = (1 - alpha) * min_max(np.asarray(scores_b, dtype=np.float64))
+
+    fused = np.zeros(len(ids), dtype=np.float64)
+    np.add.at(fused, pos_a, contrib_a)
+    np.add.at(fused, pos_b, contrib_b)
+
+    order = np.argsort(-fused, kind="stable")
+    return ids[order], fused[order]
+
+
+def fuse(
+    dense: Sequence[Tuple[Document, float]],
+    sparse: Sequence[Tuple[Document, float]],
+    k: int = 10,
+    method: str = "weighted",
+    alpha: float = 0.6,
+    rrf_k: int = 60,
+) -> List[Tuple[Document, float]]:
+    """Fuse dense (similarity) and sparse (BM25) results keyed by `chunk_uid`."""
+    # Uids are mapped to integer codes once, so `fuse_scores` never sorts
+    # or compares Python strings.
+    codes: Dict[str, int] = {}
+    docs: List[Document] = []
+
+    def encode(results: Sequence[Tuple[Document, float]]) -> np.ndarray:
+        encoded = np.empty(len(results), dtype=np.int64)
+        for i, (doc, _) in enumerate(results):
+            uid = chunk_uid(doc)
+            code = codes.get(uid)
+            if code is None:
+                code = codes[uid] = len(docs)
+                docs.append(doc)
+            encoded[i] = code
+        return encoded
+
+    ids, scores = fuse_scores(
+        encode(dense),
+        np.asarray([score for _, score in dense], dtype=np.float64),
+        encode(sparse),
+        np.asarray([score for _, score in sparse], dtype=np.float64),
+        method=method,
+        alpha=alpha,
+        rrf_k=rrf_k,
+    )
+
+    return [(docs[code], float(score)) for code, score in zip(ids[:k], scores[:k])]
+
+
+def _ranks(scores: np.ndarray) -> np.ndarray:
+    # 1-based rank of every entry, highest score first.
+    ranks = np.empty(len(scores), dtype=np.float64)
+    ranks[np.argsort(-np.asarray(scores), kind="stable")] = np.arange(1, len(scores) + 1)
+    return ranks
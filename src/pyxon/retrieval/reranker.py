@@ -1,14 +1,139 @@
 # src.pyxon.retrieval.reranker
 
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 from langchain_core.documents import Document
 from sentence_transformers import CrossEncoder
 
 from src.config import Settings
+from src.pyxon.embeddings.cache import text_hash
+from src.pyxon.metrics import REGISTRY
+from src.pyxon.retrieval.batching import RerankBatcher
+
+RERANKER_BACKENDS = ("torch", "onnx-int8")
+
+ScoreKey = Tuple[str, str, str]
+
+
+class ScoreCache:
+    """Bounded LRU of cross-encoder scores keyed by (model, query hash, chunk hash)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._scores: "OrderedDict[ScoreKey, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[ScoreKey]) -> List[Optional[float]]:
+        found = []
+        with self._lock:
+            for key in keys:
+                score = self._scores.get(key)
+                if score is not None:
+                    self._scores.move_to_end(key)
+                found.append(score)
+
+            hits = sum(score is not None for score in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        REGISTRY.inc("pyxon_rerank_cache_total", hits, result="hit")
+        REGISTRY.inc("pyxon_rerank_cache_total", len(keys) - hits, result="miss")
+
+        return found
+
+    def put_many(self, items: Dict[ScoreKey, float]) -> None:
+        with self._lock:
+            for key, score in items.items():
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._scores),
+        }
+
+
+def _load_onnx_int8() -> CrossEncoder:
+    try:
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+    except ImportError as e:
+        raise ImportError(
+            "The onnx-int8 reranker backend needs `pip install sentence-transformers[onnx]`"
+        ) from e
+
+    export_dir = Settings.RERANKER_ONNX_DIR
+    file_name = f"onnx/model_qint8_{Settings.RERANKER_QUANTIZATION}.onnx"
+
+    if not (export_dir / file_name).exists():
+        model = CrossEncoder(Settings.CROSS_ENCODER_MODEL_NAME, backend="onnx")
+        model.save_pretrained(str(export_dir))
+        export_dynamic_quantized_onnx_model(
+            model, Settings.RERANKER_QUANTIZATION, str(export_dir)
+        )
+
+    return CrossEncoder(str(export_dir), backend="onnx", model_kwargs={"file_name": file_name})
+
 
 class CrossEncoderReranker:    
-    def __init__(self):
-        self.model = CrossEncoder(Settings.CROSS_ENCODER_MODEL_NAME)
+    def __init__(self, backend: str = None):
+        self.backend = backend or Settings.RERANKER_BACKEND
+
+        if self.backend not in RERANKER_BACKENDS:
+            raise ValueError(
+                f"Unsupported reranker backend: '{self.backend}'. Supported: {list(RERANKER_BACKENDS)}"
+            )
+
+        if self.backend == "onnx-int8":
+            self.model = _load_onnx_int8()
+        else:
+            self.model = CrossEncoder(Settings.CROSS_ENCODER_MODEL_NAME)
+
+        self.model_key = f"{Settings.CROSS_ENCODER_MODEL_NAME}:{self.backend}"
+        self.cache = ScoreCache(Settings.RERANK_CACHE_SIZE)
+
+        self.batcher = None
+        if Settings.RERANK_BATCHING:
+            self.batcher = RerankBatcher(
+                self._predict,
+                max_batch_size=Settings.RERANK_MAX_BATCH_SIZE,
+                max_wait_ms=Settings.RERANK_MAX_WAIT_MS,
+            )
+
+    def _predict(self, pairs: List[List[str]]) -> np.ndarray:
+        REGISTRY.observe("pyxon_cross_encoder_pairs", len(pairs))
+        with REGISTRY.timer("pyxon_cross_encoder_seconds", backend=self.backend):
+            return self.model.predict(pairs, batch_size=Settings.RERANK_MAX_BATCH_SIZE)
+
+    def score(self, query: str, texts: List[str]) -> np.ndarray:
+        query_key = text_hash(query)
+        keys = [(self.model_key, query_key, text_hash(text)) for text in texts]
+
+        scores = self.cache.get_many(keys)
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        if missing:
+            pairs = [[query, texts[i]] for i in missing]
+            if self.batcher is not None:
+                fresh = self.batcher.submit(pairs).result()
+            else:
+                fresh = self._predict(pairs)
+            for i, score in zip(missing, fresh):
+                scores[i] = float(score)
+            self.cache.put_many({keys[i]: scores[i] for i in missing})
+
+        return np.asarray(scores, dtype=np.float32)
     
     def rerank(
         self, 
@@ -19,10 +144,13 @@ class CrossEncoderReranker:
         if not documents:
             return []
         
-        pairs = [[query, doc.page_content] for doc in documents]
-        scores = self.model.predict(pairs)
+        scores = self.score(query, [doc.page_content for doc in documents])
         
         doc_score_pairs = list(zip(documents, scores))
         doc_score_pairs.sort(key=lambda x: x[1], reverse=True)
         
-        return [doc for doc, _ in doc_score_pairs[:top_k]]
+        # Copies, since retrieved documents can be shared across queries (e.g. BM25 segments).
+        return [
+            doc.model_copy(update={"metadata": {**doc.metadata, "rerank_score": float(score)}})
+            for doc, score in doc_score_pairs[:top_k]
+        ]
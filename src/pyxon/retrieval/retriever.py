@@ -1,62 +1,95 @@
 # src.pyxon.retrieval.retriever
 
-from typing import List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
-from langchain_pinecone import PineconeVectorStore
-from rank_bm25 import BM25Okapi
-import numpy as np
+from langchain_core.vectorstores import VectorStore
+
+from src.config import Settings
+from src.pyxon.retrieval.bm25 import BM25Index
+from src.pyxon.retrieval.fusion import fuse
+
+# Shared by all retrievers so the dense and sparse legs of one query run side by side.
+_executor = ThreadPoolExecutor(max_workers=Settings.RETRIEVAL_WORKERS, thread_name_prefix="retrieval")
+
+
+def filter_document_ids(metadata_filter: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+    """Document ids selected by a `{"document_id": ...}` filter, or None when unrestricted."""
+    if not metadata_filter or "document_id" not in metadata_filter:
+        return None
+
+    wanted = metadata_filter["document_id"]
+    if isinstance(wanted, dict):
+        wanted = wanted.get("$in", wanted.get("$eq"))
+    if isinstance(wanted, str):
+        wanted = [wanted]
+    return list(wanted)
+
+
+def _timed(fn, *args) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
 
 
 class HybridRetriever(BaseRetriever):
-    vector_store: PineconeVectorStore  
-    bm25_index: BM25Okapi = None
-    all_chunks: List[Document] = []
+    vector_store: VectorStore
+    bm25_index: BM25Index = None
     alpha: float = 0.6
+    k: int = 20
+    top_n: int = 10
+    fusion_method: str = "weighted"
+    rrf_k: int = 60
     
     def _get_relevant_documents(self, query: str) -> List[Document]:
-        vector_results = self.vector_store.similarity_search_with_score(
-            query, k=20
-        )
-        
-        tokenized_query = query.lower().split()
-        bm25_scores = self.bm25_index.get_scores(tokenized_query)
-        
-        top_bm25_indices = np.argsort(bm25_scores)[::-1][:20]
-        bm25_results = [(self.all_chunks[i], bm25_scores[i]) for i in top_bm25_indices]
-        
-        combined_docs = {}
+        results, _ = self.retrieve(query)
+        return [doc for doc, _ in results]
+    
+    def retrieve(
+        self,
+        query: str,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None,
+    ) -> Tuple[List[Tuple[Document, float]], Dict[str, float]]:
+        """Run the dense and BM25 legs concurrently and fuse them. Returns (results, timings in ms)."""
+        dense_future = _executor.submit(_timed, self._dense, query, metadata_filter, score_threshold)
+        sparse_future = _executor.submit(_timed, self._sparse, query, metadata_filter)
         
-        max_vec_score = max(score for _, score in vector_results) if vector_results else 1
-        for doc, score in vector_results:
-            doc_id = doc.metadata.get('chunk_index', id(doc))
-            normalized = 1 - (score / max_vec_score)
-            combined_docs[doc_id] = {
-                'doc': doc,
-                'score': self.alpha * normalized
-            }
+        vector_results, dense_ms = dense_future.result()
+        bm25_results, sparse_ms = sparse_future.result()
         
-        max_bm25 = max(bm25_scores) if len(bm25_scores) > 0 else 1
-        for doc, score in bm25_results:
-            doc_id = doc.metadata.get('chunk_index', id(doc))
-            normalized = score / max_bm25
-            if doc_id in combined_docs:
-                combined_docs[doc_id]['score'] += (1 - self.alpha) * normalized
-            else:
-                combined_docs[doc_id] = {
-                    'doc': doc,
-                    'score': (1 - self.alpha) * normalized
-                }
+        fused, fusion_ms = _timed(self._fuse, vector_results, bm25_results)
         
-        sorted_docs = sorted(
-            combined_docs.values(),
-            key=lambda x: x['score'],
-            reverse=True
+        timings = {"dense_ms": dense_ms, "sparse_ms": sparse_ms, "fusion_ms": fusion_ms}
+        return fused, timings
+    
+    def _dense(self, query, metadata_filter, score_threshold) -> List[Tuple[Document, float]]:
+        kwargs = {"k": self.k}
+        if metadata_filter:
+            kwargs["filter"] = metadata_filter
+        if score_threshold is not None:
+            kwargs["score_threshold"] = score_threshold
+        return self.vector_store.similarity_search_with_relevance_scores(query, **kwargs)
+    
+    def _sparse(self, query, metadata_filter) -> List[Tuple[Document, float]]:
+        if self.bm25_index is None:
+            return []
+        return self.bm25_index.search(
+            query, k=self.k, document_ids=filter_document_ids(metadata_filter)
+        )
+    
+    def _fuse(self, vector_results, bm25_results) -> List[Tuple[Document, float]]:
+        return fuse(
+            vector_results,
+            bm25_results,
+            k=self.top_n,
+            method=self.fusion_method,
+            alpha=self.alpha,
+            rrf_k=self.rrf_k,
         )
-        
-        return [item['doc'] for item in sorted_docs[:10]]
     
     def build_bm25_index(self, chunks: List[Document]):
-        self.all_chunks = chunks
-        tokenized_corpus = [doc.page_content.lower().split() for doc in chunks]
-        self.bm25_index = BM25Okapi(tokenized_corpus)
\ No newline at end of file
+        self.bm25_index = BM25Index()
+        self.bm25_index.add_chunks(chunks)
\ No newline at end of file
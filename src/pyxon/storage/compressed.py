@@ -0,0 +1,191 @@
+# src.pyxon.storage.compressed
+
+import json
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import faiss
+import numpy as np
+
+QUANTIZATIONS = ("int8", "binary")
+
+
+def truncate(vectors: np.ndarray, dims: int) -> np.ndarray:
+    """Matryoshka shortening: keep the leading `dims` dimensions and re-normalize."""
+    short = np.ascontiguousarray(vectors[:, :dims], dtype=np.float32)
+    faiss.normalize_L2(short)
+    return short
+
+
+class TwoTierIndex:
+    """
+    Two-tier search over normalized vectors. A coarse pass runs over the
+    first `coarse_dims` dimensions quantized to int8 (scalar quantizer,
+    inner product) or to one bit per dimension (Hamming). The shortlist of
+    `k * rescore` ids is then rescored exactly against the full float32
+    vectors, which stay on disk and are memory-mapped. Only the coarse
+    codes are held in RAM.
+
+    Ids are the row numbers in the vector file, as handed out by
+    `FaissVectorStore`.
+    """
+
+    COARSE_FILE = "coarse.faiss"
+    VECTORS_FILE = "vectors.f32"
+    META_FILE = "two_tier.json"
+
+    def __init__(self, index_dir: Path, quantization: str, coarse_dims: int, rescore: int):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(
+                f"Unsupported quantization: '{quantization}'. Supported: {list(QUANTIZATIONS)}"
+            )
+        if quantization == "binary" and coarse_dims % 8:
+            raise ValueError(f"Binary codes need coarse_dims divisible by 8, got {coarse_dims}")
+
+        self.index_dir = Path(index_dir)
+        self.quantization = quantization
+        self.coarse_dims = coarse_dims
+        self.rescore = rescore
+        self.dims: Optional[int] = None
+
+        self._coarse = None
+        self._full: Optional[np.memmap] = None
+
+    @property
+    def ntotal(self) -> int:
+        return self._coarse.ntotal if self._coarse is not None else 0
+
+    @classmethod
+    def exists(cls, index_dir: Path) -> bool:
+        return (Path(index_dir) / cls.META_FILE).exists()
+
+    @classmethod
+    def load(cls, index_dir: Path, quantization: str, rescore: int) -> "TwoTierIndex":
+        index_dir = Path(index_dir)
+        with open(index_dir / cls.META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta["quantization"] != quantization:
+            raise ValueError(
+                f"Two-tier index at {index_dir} uses '{meta['quantization']}' codes, not "
+                f"'{quantization}'. Rebuild it or use another INDEX."
+            )
+
+        index = cls(index_dir, meta["quantization"], meta["coarse_dims"], rescore)
+        index.dims = meta["dims"]
+
+        coarse_path = index_dir / cls.COARSE_FILE
+        if coarse_path.exists():
+            if index.quantization == "binary":
+                index._coarse = faiss.read_index_binary(str(coarse_path))
+            else:
+                index._coarse = faiss.read_index(str(coarse_path))
+
+        return index
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        if self._coarse is None:
+            self.dims = vectors.shape[1]
+            self.coarse_dims = min(self.coarse_dims, self.dims)
+            self._coarse = self._create_coarse()
+            self._write_meta()
+
+        self._write_full(vectors, ids)
+        self._coarse.add_with_ids(self._encode(vectors), ids)
+
+    def remove_ids(self, ids: np.ndarray) -> None:
+        # Rows stay in the vector file; nothing points at them any more.
+        if self._coarse is not None:
+            self._coarse.remove_ids(ids)
+
+    def search(
+        self, query: np.ndarray, k: int, candidate_ids: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Same output shape as a FAISS search for one query: (scores, ids),
+        each (1, k), padded with -1 ids. With `candidate_ids` (a metadata
+        filter) the candidates are scored exactly and the coarse pass is skipped.
+        """
+        if candidate_ids is None:
+            shortlist = min(self.ntotal, k * self.rescore)
+            _, coarse_ids = self._coarse.search(self._encode(query), shortlist)
+            candidate_ids = coarse_ids[0][coarse_ids[0] >= 0]
+
+        # Sorted ids read the memory-mapped file front to back.
+        candidate_ids = np.sort(np.asarray(candidate_ids, dtype=np.int64))
+        exact = self._full_vectors()[candidate_ids] @ query[0]
+        top = np.argsort(-exact)[:k]
+
+        scores = np.full((1, k), -np.inf, dtype=np.float32)
+        ids = np.full((1, k), -1, dtype=np.int64)
+        scores[0, : len(top)] = exact[top]
+        ids[0, : len(top)] = candidate_ids[top]
+        return scores, ids
+
+    def save(self) -> None:
+        if self._coarse is None:
+            return
+
+        path = self.index_dir / self.COARSE_FILE
+        tmp_path = path.with_suffix(".tmp")
+        if self.quantization == "binary":
+            faiss.write_index_binary(self._coarse, str(tmp_path))
+        else:
+            faiss.write_index(self._coarse, str(tmp_path))
+        os.replace(tmp_path, path)
+
+    def memory_bytes(self) -> int:
+        """Size of the in-RAM coarse index (codes plus id map)."""
+        if self._coarse is None:
+            return 0
+        if self.quantization == "binary":
+            return faiss.serialize_index_binary(self._coarse).nbytes
+        return faiss.serialize_index(self._coarse).nbytes
+
+    def _create_coarse(self):
+        if self.quantization == "binary":
+            return faiss.IndexBinaryIDMap2(faiss.IndexBinaryFlat(self.coarse_dims))
+
+        sq = faiss.IndexScalarQuantizer(
+            self.coarse_dims, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+        # Truncated vectors are unit-normalized, so every component lies in
+        # [-1, 1]. Fixed ranges keep the codes independent of whichever
+        # batch happens to arrive first (possibly a single chunk).
+        sq.sq.rangestat = faiss.ScalarQuantizer.RS_minmax
+        sq.sq.rangestat_arg = 0.0
+        bounds = np.stack([-np.ones(self.coarse_dims), np.ones(self.coarse_dims)]).astype(np.float32)
+        sq.train(bounds)
+        return faiss.IndexIDMap2(sq)
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        short = truncate(vectors, self.coarse_dims)
+        if self.quantization == "binary":
+            return np.packbits(short > 0, axis=1)
+        return short
+
+    def _write_full(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        path = self.index_dir / self.VECTORS_FILE
+        row_bytes = self.dims * 4
+
+        # Ids are handed out contiguously, so each batch is one run of rows.
+        with open(path, "r+b" if path.exists() else "wb") as f:
+            f.seek(int(ids[0]) * row_bytes)
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+        self._full = None
+
+    def _full_vectors(self) -> np.memmap:
+        if self._full is None:
+            path = self.index_dir / self.VECTORS_FILE
+            rows = path.stat().st_size // (self.dims * 4)
+            self._full = np.memmap(path, dtype=np.float32, mode="r", shape=(rows, self.dims))
+        return self._full
+
+    def _write_meta(self) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        meta = {"quantization": self.quantization, "coarse_dims": self.coarse_dims, "dims": self.dims}
+        with open(self.index_dir / self.META_FILE, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
@@ -1,7 +1,7 @@
 import uuid
 
-from sqlalchemy import (Column, DateTime, ForeignKey, Integer, String, Text,
-                        func)
+from sqlalchemy import (BigInteger, Column, DateTime, Float, ForeignKey, Index,
+                        Integer, String, Text, func)
 from sqlalchemy.orm import relationship
 
 from src.pyxon.storage.database.database import Base
@@ -15,15 +15,19 @@ class Document(Base):
     source_path = Column(String(500), nullable=False)
     doc_type = Column(String(50), nullable=False)
     total_chunks = Column(Integer, default=0)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # SHA-256 of the uploaded bytes; identical uploads reuse the stored document.
+    fingerprint = Column(String(64), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
+    # Chunks are only loaded when asked for, e.g. via joinedload in the repository.
     chunks = relationship(
-        "Chunk", back_populates="document", cascade="all, delete-orphan", lazy="joined"
+        "Chunk", back_populates="document", cascade="all, delete-orphan", lazy="select"
     )
 
 
 class Chunk(Base):
     __tablename__ = "chunks"
+    __table_args__ = (Index("ix_chunks_doc_id_chunk_index", "doc_id", "chunk_index"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     doc_id = Column(
@@ -36,3 +40,19 @@ class Chunk(Base):
     chunk_text = Column(Text, nullable=False)
 
     document = relationship("Document", back_populates="chunks")
+
+
+class IngestionFile(Base):
+    """Per-file progress of bulk ingestion, so interrupted runs can resume."""
+
+    __tablename__ = "ingestion_files"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source_path = Column(String(500), nullable=False, unique=True)
+    size = Column(BigInteger, nullable=False)
+    mtime = Column(Float, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    doc_id = Column(String(36), nullable=True)
+    chunks = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
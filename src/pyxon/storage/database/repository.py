@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+from sqlalchemy import and_, func, insert, or_, select
 from sqlalchemy.orm import Session, joinedload
 
 from src.pyxon.storage.database import models, schemas
@@ -25,6 +26,57 @@ class DocumentRepository:
             .first()
         )
 
+    def list_documents(
+        self, limit: int, after: Optional[schemas.DocumentSummary] = None
+    ) -> List[schemas.DocumentSummary]:
+        """Newest-first document summaries, keyset-paginated on (created_at, id)."""
+        Document = models.Document
+        query = self.db.query(
+            Document.id,
+            Document.filename,
+            Document.source_path,
+            Document.doc_type,
+            Document.total_chunks,
+            Document.created_at,
+        )
+
+        if after is not None:
+            # Compare against the cursor row's stored timestamp rather than a
+            # bound datetime: SQLite stores `func.now()` as text without
+            # microseconds, which a bound value would not compare equal to.
+            after_created_at = func.coalesce(
+                select(Document.created_at).where(Document.id == after.id).scalar_subquery(),
+                after.created_at,
+            )
+            query = query.filter(
+                or_(
+                    Document.created_at < after_created_at,
+                    and_(Document.created_at == after_created_at, Document.id < after.id),
+                )
+            )
+
+        rows = query.order_by(Document.created_at.desc(), Document.id.desc()).limit(limit).all()
+        return [schemas.DocumentSummary.model_validate(row) for row in rows]
+
+    def find_by_fingerprint(self, fingerprint: str) -> Optional[schemas.DocumentSummary]:
+        """Newest fully stored document with these exact bytes, if any."""
+        Document = models.Document
+        row = (
+            self.db.query(
+                Document.id,
+                Document.filename,
+                Document.source_path,
+                Document.doc_type,
+                Document.total_chunks,
+                Document.created_at,
+            )
+            # Documents without chunks were interrupted mid-upload.
+            .filter(Document.fingerprint == fingerprint, Document.total_chunks > 0)
+            .order_by(Document.created_at.desc())
+            .first()
+        )
+        return schemas.DocumentSummary.model_validate(row) if row else None
+
     def add_chunks(
         self, doc_id: str, chunks: List[schemas.ChunkCreate]
     ) -> List[models.Chunk]:
@@ -49,6 +101,110 @@ class DocumentRepository:
             self.db.refresh(chunk)
         return db_chunks
 
+    def bulk_add_chunks(self, doc_id: str, chunks: List[schemas.ChunkCreate]) -> List[int]:
+        """Insert all chunks in one executemany and return their ids in input order."""
+        if not chunks:
+            return []
+
+        ids = self._insert_chunks(doc_id, chunks)
+        self.db.query(models.Document).filter(models.Document.id == doc_id).update(
+            {models.Document.total_chunks: len(chunks)}
+        )
+
+        self.db.commit()
+        return ids
+
+    def _insert_chunks(self, doc_id: str, chunks: List[schemas.ChunkCreate]) -> List[int]:
+        ids = self.db.scalars(
+            insert(models.Chunk).returning(models.Chunk.id, sort_by_parameter_order=True),
+            [
+                {
+                    "doc_id": doc_id,
+                    "chunk_index": chunk_data.chunk_index,
+                    "chunk_text": chunk_data.chunk_text,
+                }
+                for chunk_data in chunks
+            ],
+        ).all()
+        return list(ids)
+
+    def get_ingestion_files(self, source_paths: List[str]) -> Dict[str, models.IngestionFile]:
+        rows = {}
+        # Sliced to stay under SQLite's bound-parameter limit.
+        for start in range(0, len(source_paths), 500):
+            batch = source_paths[start : start + 500]
+            for row in (
+                self.db.query(models.IngestionFile)
+                .filter(models.IngestionFile.source_path.in_(batch))
+                .all()
+            ):
+                rows[row.source_path] = row
+        return rows
+
+    def upsert_ingestion_file(self, progress: schemas.IngestionFile, commit: bool = True) -> None:
+        row = (
+            self.db.query(models.IngestionFile)
+            .filter(models.IngestionFile.source_path == progress.source_path)
+            .first()
+        )
+        if row is None:
+            self.db.add(models.IngestionFile(**progress.model_dump()))
+        else:
+            for key, value in progress.model_dump().items():
+                setattr(row, key, value)
+
+        if commit:
+            self.db.commit()
+
+    def complete_ingestion(
+        self,
+        doc_id: str,
+        doc: schemas.DocumentCreate,
+        chunks: List[schemas.ChunkCreate],
+        progress: schemas.IngestionFile,
+    ) -> None:
+        """Write a document, its chunks and its finished progress row in one transaction."""
+        self._replace_document(doc_id, doc, total_chunks=len(chunks))
+        if chunks:
+            self._insert_chunks(doc_id, chunks)
+        self.upsert_ingestion_file(progress, commit=False)
+        self.db.commit()
+
+    def start_streamed_document(self, doc_id: str, doc: schemas.DocumentCreate) -> None:
+        """Create an empty document whose chunks arrive through `append_chunks`."""
+        self._replace_document(doc_id, doc, total_chunks=0)
+        self.db.commit()
+
+    def append_chunks(self, doc_id: str, chunks: List[schemas.ChunkCreate]) -> None:
+        if chunks:
+            self._insert_chunks(doc_id, chunks)
+            self.db.commit()
+
+    def finish_streamed_document(
+        self, doc_id: str, total_chunks: int, progress: schemas.IngestionFile
+    ) -> None:
+        self.db.query(models.Document).filter(models.Document.id == doc_id).update(
+            {models.Document.total_chunks: total_chunks}
+        )
+        self.upsert_ingestion_file(progress, commit=False)
+        self.db.commit()
+
+    def delete_document(self, doc_id: str) -> None:
+        existing = self.db.get(models.Document, doc_id)
+        if existing is not None:
+            self.db.delete(existing)
+            self.db.commit()
+
+    def _replace_document(self, doc_id: str, doc: schemas.DocumentCreate, total_chunks: int) -> None:
+        # A previous, interrupted attempt may have left the document behind.
+        existing = self.db.get(models.Document, doc_id)
+        if existing is not None:
+            self.db.delete(existing)
+            self.db.flush()
+
+        self.db.add(models.Document(id=doc_id, total_chunks=total_chunks, **doc.model_dump()))
+        self.db.flush()
+
 
 class SQLStore:
     def save_document(self, doc: schemas.DocumentCreate) -> str:
@@ -64,7 +220,90 @@ class SQLStore:
         session = SessionLocal()
         try:
             repo = DocumentRepository(session)
-            repo.add_chunks(doc_id, chunks)
+            repo.bulk_add_chunks(doc_id, chunks)
+        finally:
+            session.close()
+
+    def list_documents(
+        self, limit: int = 50, after: Optional[schemas.DocumentSummary] = None
+    ) -> List[schemas.DocumentSummary]:
+        session = SessionLocal()
+        try:
+            repo = DocumentRepository(session)
+            return repo.list_documents(limit, after)
+        finally:
+            session.close()
+
+    def find_document_by_fingerprint(self, fingerprint: str) -> Optional[schemas.DocumentSummary]:
+        session = SessionLocal()
+        try:
+            repo = DocumentRepository(session)
+            return repo.find_by_fingerprint(fingerprint)
+        finally:
+            session.close()
+
+    def get_ingestion_files(self, source_paths: List[str]) -> Dict[str, schemas.IngestionFile]:
+        session = SessionLocal()
+        try:
+            repo = DocumentRepository(session)
+            rows = repo.get_ingestion_files(source_paths)
+            return {path: schemas.IngestionFile.model_validate(row) for path, row in rows.items()}
+        finally:
+            session.close()
+
+    def save_ingestion_file(self, progress: schemas.IngestionFile) -> None:
+        session = SessionLocal()
+        try:
+            repo = DocumentRepository(session)
+            repo.upsert_ingestion_file(progress)
+        finally:
+            session.close()
+
+    def complete_ingestion(
+        self,
+        doc_id: str,
+        doc: schemas.DocumentCreate,
+        chunks: List[schemas.ChunkCreate],
+        progress: schemas.IngestionFile,
+    ) -> None:
+        session = SessionLocal()
+        try:
+            repo = DocumentRepository(session)
+            repo.complete_ingestion(doc_id, doc, chunks, progress)
+        finally:
+            session.close()
+
+    def start_streamed_document(self, doc_id: str, doc: schemas.DocumentCreate) -> None:
+        session = SessionLocal()
+        try:
+            repo = DocumentRepository(session)
+            repo.start_streamed_document(doc_id, doc)
+        finally:
+            session.close()
+
+    def append_chunks(self, doc_id: str, chunks: List[schemas.ChunkCreate]) -> None:
+        session = SessionLocal()
+        try:
+            repo = DocumentRepository(session)
+            repo.append_chunks(doc_id, chunks)
+        finally:
+            session.close()
+
+    def finish_streamed_document(
+        self, doc_id: str, total_chunks: int, progress: schemas.IngestionFile
+    ) -> None:
+        session = SessionLocal()
+        try:
+            repo = DocumentRepository(session)
+            repo.finish_streamed_document(doc_id, total_chunks, progress)
+        finally:
+            session.close()
+
+    def delete_document(self, doc_id: str) -> None:
+        session = SessionLocal()
+        try:
+            repo = DocumentRepository(session)
+            repo.delete_document(doc_id)
         finally:
             session.close()
 
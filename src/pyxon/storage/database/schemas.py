@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -28,12 +28,22 @@ class DocumentBase(BaseModel):
 
 
 class DocumentCreate(DocumentBase):
-    pass
+    fingerprint: Optional[str] = None
+
+
+class DocumentSummary(DocumentBase):
+    id: str
+    total_chunks: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
 
 
 class Document(DocumentBase):
     id: str
     total_chunks: int
+    fingerprint: Optional[str] = None
     created_at: datetime
     chunks: List[Chunk] = []
 
@@ -43,3 +53,16 @@ class Document(DocumentBase):
 
 class DocumentWithChunks(Document):
     chunks: List[Chunk]
+
+
+class IngestionFile(BaseModel):
+    source_path: str
+    size: int
+    mtime: float
+    status: str
+    doc_id: Optional[str] = None
+    chunks: int = 0
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,413 @@
+# src.pyxon.storage.faiss_store
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore as LCVectorStore
+
+from src.config import Settings
+from src.pyxon.storage.compressed import TwoTierIndex
+
+
+class FaissVectorStore(LCVectorStore):
+    """
+    Local FAISS-backed vector store persisted under `index_dir`.
+
+    Vectors are L2-normalized and searched by inner product, so scores are
+    cosine similarities. The index file is opened memory-mapped and only
+    copied into RAM the first time new vectors are added. The "int8" and
+    "binary" index types keep only compressed, truncated codes in RAM and
+    rescore on full vectors from disk (see `TwoTierIndex`). When
+    `embedding_id` is given, it is recorded in a manifest and an index
+    built from other embeddings refuses to open.
+    """
+
+    INDEX_FILE = "index.faiss"
+    DOCSTORE_FILE = "docstore.jsonl"
+    MANIFEST_FILE = "embedding.json"
+    INDEX_TYPES = ("flat", "ivf", "hnsw", "int8", "binary")
+    TWO_TIER_TYPES = ("int8", "binary")
+    IVF_POINTS_PER_LIST = 39
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        index_dir: Path,
+        index_type: str = "flat",
+        embedding_id: Optional[str] = None,
+    ):
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(
+                f"Unsupported FAISS index type: '{index_type}'. Supported: {list(self.INDEX_TYPES)}"
+            )
+
+        self.embedding_func = embedding
+        self.index_dir = Path(index_dir)
+        self.index_type = index_type
+        self.embedding_id = embedding_id
+
+        self._index: Optional[faiss.Index] = None
+        self._mmapped = False
+        self._docstore: Dict[int, Dict[str, Any]] = {}
+        self._doc_ids: Dict[str, List[int]] = {}
+        self._next_id = 0
+        # Deleted ids still inside an HNSW graph, which cannot remove them.
+        self._dead = 0
+        self._lock = threading.RLock()
+
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_func
+
+    @property
+    def ntotal(self) -> int:
+        return self._index.ntotal if self._index is not None else 0
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        index_dir: Path = Settings.FAISS_INDEX_DIR,
+        **kwargs: Any,
+    ) -> "FaissVectorStore":
+        store = cls(embedding, index_dir=index_dir, **kwargs)
+        store.add_texts(texts, metadatas)
+        return store
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        embeddings = self.embedding_func.embed_documents(texts)
+        return self.add_embeddings(zip(texts, embeddings), metadatas)
+
+    def add_embeddings(
+        self,
+        text_embeddings: Iterable[Tuple[str, List[float]]],
+        metadatas: Optional[List[dict]] = None,
+        persist: bool = True,
+        **kwargs: Any,
+    ) -> List[str]:
+        text_embeddings = list(text_embeddings)
+        if not text_embeddings:
+            return []
+
+        texts = [text for text, _ in text_embeddings]
+        vectors = self._as_matrix([vector for _, vector in text_embeddings])
+        metadatas = metadatas or [{} for _ in texts]
+
+        with self._lock:
+            if self._index is None:
+                self._write_manifest()
+                self._index = self._create_index(vectors)
+            self._ensure_writable()
+
+            ids = np.arange(self._next_id, self._next_id + len(texts), dtype=np.int64)
+            self._index.add_with_ids(vectors, ids)
+            self._next_id += len(texts)
+            if self.index_type == "ivf":
+                self._maybe_train_ivf()
+
+            records = []
+            for int_id, text, metadata in zip(ids.tolist(), texts, metadatas):
+                record = {"id": int_id, "text": text, "metadata": metadata}
+                self._remember(record)
+                records.append(record)
+
+            self._append_docstore(records)
+            if persist:
+                self.save()
+
+        return [str(i) for i in ids.tolist()]
+
+    def delete_document(self, document_id: str) -> None:
+        """
+        Drop every vector of a document, so re-ingesting it replaces rather
+        than duplicates. The deletion is logged as a tombstone line in the
+        docstore; HNSW graphs keep the ids, which searches then skip.
+        """
+        with self._lock:
+            ids = self._forget(str(document_id))
+            if not ids:
+                return
+
+            self._append_docstore([{"deleted": str(document_id)}])
+            if self.index_type == "hnsw":
+                self._dead += len(ids)
+            elif self._index is not None:
+                self._ensure_writable()
+                self._index.remove_ids(np.asarray(ids, dtype=np.int64))
+                self.save()
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        vector = self.embedding_func.embed_query(query)
+        return self.similarity_search_with_score_by_vector(vector, k=k, filter=filter)
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[Document, float]]:
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return []
+
+            candidate_ids = self._candidate_ids(filter)
+            if candidate_ids is not None and len(candidate_ids) == 0:
+                return []
+
+            query = self._as_matrix([embedding])
+            if isinstance(self._index, TwoTierIndex):
+                scores, ids = self._index.search(query, k, candidate_ids)
+            else:
+                params = self._search_params(self._selector(candidate_ids))
+                # Over-fetch past deleted HNSW entries, dropped below.
+                fetch = min(k + self._dead, self._index.ntotal)
+                scores, ids = self._index.search(query, fetch, params=params)
+
+            results = []
+            for int_id, score in zip(ids[0].tolist(), scores[0].tolist()):
+                if int_id == -1:
+                    continue
+
+                record = self._docstore.get(int_id)
+                if record is None or not self._matches(record["metadata"], filter):
+                    continue
+
+                results.append(
+                    (Document(page_content=record["text"], metadata=dict(record["metadata"])), score)
+                )
+
+        return results[:k]
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Inner product over normalized vectors is already a cosine similarity.
+        return lambda score: score
+
+    def _create_index(self, vectors: np.ndarray) -> faiss.Index:
+        dims = vectors.shape[1]
+
+        if self.index_type in self.TWO_TIER_TYPES:
+            return TwoTierIndex(
+                self.index_dir,
+                quantization=self.index_type,
+                coarse_dims=Settings.FAISS_COARSE_DIMS,
+                rescore=Settings.FAISS_RESCORE_CANDIDATES,
+            )
+        if self.index_type == "hnsw":
+            base = faiss.IndexHNSWFlat(dims, Settings.FAISS_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        else:
+            # Also the buffer an "ivf" index starts from, see `_maybe_train_ivf`.
+            base = faiss.IndexFlatIP(dims)
+
+        return faiss.IndexIDMap2(base)
+
+    def _maybe_train_ivf(self) -> None:
+        """
+        IVF indexes start as a flat buffer, searched exactly, and are trained
+        once they hold enough vectors for stable centroids (faiss wants 39
+        per list). The buffered vectors are then moved into the IVF lists.
+        """
+        if isinstance(self._index, faiss.IndexIVF):
+            return
+        if self._index.ntotal < self.IVF_POINTS_PER_LIST * Settings.FAISS_NLIST:
+            return
+
+        buffer = faiss.downcast_index(self._index.index)
+        vectors = buffer.reconstruct_n(0, buffer.ntotal)
+        ids = faiss.vector_to_array(self._index.id_map).astype(np.int64)
+
+        quantizer = faiss.IndexFlatIP(vectors.shape[1])
+        index = faiss.IndexIVFFlat(quantizer, vectors.shape[1], Settings.FAISS_NLIST, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        # IVF lists store ids natively. An IDMap2 wrapper would break on
+        # `remove_ids`: it compacts its id map as if rows shifted down,
+        # which IVF lists do not do.
+        index.add_with_ids(vectors, ids)
+        self._index = index
+
+    def _search_params(self, selector: Optional[faiss.IDSelector]) -> Optional[faiss.SearchParameters]:
+        if self.index_type == "hnsw":
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=Settings.FAISS_HNSW_EF_SEARCH)
+        if isinstance(self._index, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=Settings.FAISS_NPROBE)
+        if selector is not None:
+            return faiss.SearchParameters(sel=selector)
+        return None
+
+    def _candidate_ids(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not filter or "document_id" not in filter:
+            return None
+
+        wanted = filter["document_id"]
+        if isinstance(wanted, dict):
+            wanted = wanted.get("$in", wanted.get("$eq"))
+        if isinstance(wanted, str):
+            wanted = [wanted]
+
+        ids = [int_id for doc_id in wanted for int_id in self._doc_ids.get(doc_id, [])]
+        return np.asarray(ids, dtype=np.int64)
+
+    @staticmethod
+    def _selector(candidate_ids: Optional[np.ndarray]) -> Optional[faiss.IDSelector]:
+        if candidate_ids is None:
+            return None
+        return faiss.IDSelectorBatch(candidate_ids)
+
+    @staticmethod
+    def _matches(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+        if not filter:
+            return True
+
+        for key, value in filter.items():
+            if key == "document_id":
+                continue
+            if isinstance(value, dict):
+                value = value.get("$eq")
+            if metadata.get(key) != value:
+                return False
+
+        return True
+
+    @staticmethod
+    def _as_matrix(vectors: List[List[float]]) -> np.ndarray:
+        matrix = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32))
+        faiss.normalize_L2(matrix)
+        return matrix
+
+    def _remember(self, record: Dict[str, Any]) -> None:
+        self._docstore[record["id"]] = record
+        doc_id = record["metadata"].get("document_id")
+        if doc_id is not None:
+            self._doc_ids.setdefault(str(doc_id), []).append(record["id"])
+
+    def _forget(self, document_id: str) -> List[int]:
+        ids = self._doc_ids.pop(document_id, [])
+        for int_id in ids:
+            self._docstore.pop(int_id, None)
+        return ids
+
+    def _ensure_writable(self) -> None:
+        # Memory-mapped indexes are read-only, copy into RAM before mutating.
+        if self._mmapped:
+            self._index = faiss.read_index(str(self.index_dir / self.INDEX_FILE))
+            self._mmapped = False
+
+    def save(self) -> None:
+        with self._lock:
+            if self._index is None or self._mmapped:
+                return
+
+            if isinstance(self._index, TwoTierIndex):
+                self._index.save()
+                return
+
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+
+            index_path = self.index_dir / self.INDEX_FILE
+            tmp_path = index_path.with_suffix(".tmp")
+            faiss.write_index(self._index, str(tmp_path))
+            os.replace(tmp_path, index_path)
+
+    def _append_docstore(self, records: List[Dict[str, Any]]) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+
+        with open(self.index_dir / self.DOCSTORE_FILE, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _write_manifest(self) -> None:
+        if self.embedding_id is None:
+            return
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_dir / self.MANIFEST_FILE, "w", encoding="utf-8") as f:
+            json.dump({"embedding": self.embedding_id}, f)
+
+    def _check_manifest(self) -> None:
+        manifest_path = self.index_dir / self.MANIFEST_FILE
+        if self.embedding_id is None:
+            return
+        if not manifest_path.exists():
+            if (self.index_dir / self.DOCSTORE_FILE).exists():
+                raise ValueError(
+                    f"FAISS index at {self.index_dir} does not record which embeddings it holds. "
+                    f"Rebuild it, or use another INDEX or FAISS_INDEX_DIR."
+                )
+            return
+
+        with open(manifest_path, encoding="utf-8") as f:
+            stored = json.load(f)["embedding"]
+        if stored != self.embedding_id:
+            raise ValueError(
+                f"FAISS index at {self.index_dir} holds '{stored}' embeddings, not "
+                f"'{self.embedding_id}'. Use another INDEX or FAISS_INDEX_DIR for this backend."
+            )
+
+    def _load(self) -> None:
+        index_path = self.index_dir / self.INDEX_FILE
+        docstore_path = self.index_dir / self.DOCSTORE_FILE
+
+        self._check_manifest()
+
+        two_tier = self.index_type in self.TWO_TIER_TYPES
+        built = TwoTierIndex.exists(self.index_dir) if two_tier else index_path.exists()
+        if not built:
+            if TwoTierIndex.exists(self.index_dir) or index_path.exists():
+                raise ValueError(
+                    f"FAISS index at {self.index_dir} was built with another index type than "
+                    f"'{self.index_type}'. Rebuild it or use another INDEX."
+                )
+            return
+
+        if two_tier:
+            self._index = TwoTierIndex.load(
+                self.index_dir, quantization=self.index_type, rescore=Settings.FAISS_RESCORE_CANDIDATES
+            )
+        else:
+            self._index = faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP)
+            self._mmapped = True
+
+        # Ids of deleted documents are never handed out again, since an HNSW
+        # graph or the two-tier vector file may still hold them.
+        last_id = -1
+        if docstore_path.exists():
+            with open(docstore_path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if "deleted" in record:
+                        removed = self._forget(record["deleted"])
+                        if self.index_type == "hnsw":
+                            self._dead += len(removed)
+                    else:
+                        self._remember(record)
+                        last_id = max(last_id, record["id"])
+
+        self._next_id = last_id + 1
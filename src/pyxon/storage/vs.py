@@ -1,38 +1,144 @@
 # src.pyxon.storage.vs
 
-from typing import List
+from functools import lru_cache
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 from langchain_core.documents import Document
 from langchain_experimental.text_splitter import SemanticChunker
-from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pinecone import Pinecone
 from langchain_core.vectorstores import  VectorStoreRetriever
 
 from src.config import Settings
+from src.pyxon.embeddings.backends import embedding_dimensions, embedding_identity, get_embeddings
+from src.pyxon.embeddings.cache import CachedEmbeddings, get_embedding_cache
+from src.pyxon.ingestion.chunking import StructureChunker
+from src.pyxon.ingestion.pipeline import EmbeddingPipeline, IngestionStats
+from src.pyxon.parsers.base import BaseParser
+from src.pyxon.retrieval.fusion import chunk_uid
+from src.pyxon.storage.faiss_store import FaissVectorStore
+
+
+def _pinecone_backend(embedding_func, embedding_id: str):
+    pc = Pinecone(api_key=Settings.PINECONE_API_KEY)
+    # OpenAI vectors stay in the default namespace, where existing indexes
+    # hold them; every other embedding space gets a namespace of its own.
+    namespace = None if embedding_id == embedding_identity("openai") else embedding_id
+    return PineconeVectorStore(
+        index=pc.Index(Settings.INDEX), embedding=embedding_func, namespace=namespace
+    )
+
+
+@lru_cache(maxsize=None)
+def _pinecone_index_dimensions(index_name: str) -> int:
+    # An index's dimension is fixed at creation, so one lookup per process is enough.
+    return Pinecone(api_key=Settings.PINECONE_API_KEY).describe_index(index_name).dimension
+
+
+def _check_pinecone_dimensions(embedding_backend: str = None) -> None:
+    # A Pinecone index has one fixed dimension, shared by all namespaces.
+    embedding_backend = embedding_backend or Settings.EMBEDDING_BACKEND
+    dimensions = embedding_dimensions(embedding_backend)
+    index_dimensions = _pinecone_index_dimensions(Settings.INDEX)
+    if index_dimensions != dimensions:
+        raise ValueError(
+            f"Pinecone index '{Settings.INDEX}' holds {index_dimensions}-dimensional vectors, but the "
+            f"'{embedding_backend}' embedding backend produces {dimensions}. Point INDEX at an "
+            f"index of matching dimension, or use VECTOR_STORE_BACKEND=faiss."
+        )
+
+
+def _faiss_backend(embedding_func, embedding_id: str):
+    return FaissVectorStore(
+        embedding_func,
+        index_dir=Settings.FAISS_INDEX_DIR / Settings.INDEX,
+        index_type=Settings.FAISS_INDEX_TYPE,
+        embedding_id=embedding_id,
+    )
+
+
+_BACKENDS = {
+    "pinecone": _pinecone_backend,
+    "faiss": _faiss_backend,
+}
+
+
+def _split_stream(splitter, segments: Iterable[str], window_chars: int) -> Iterator[str]:
+    # Splits a sliding window of segments; the last piece of each window may
+    # be cut short, so it is carried into the next window and re-split.
+    parts: List[str] = []
+    size = 0
+
+    for segment in segments:
+        parts.append(segment)
+        size += len(segment) + 1
+        if size < window_chars:
+            continue
+
+        pieces = splitter.split_text("\n".join(parts))
+        if len(pieces) > 1:
+            yield from pieces[:-1]
+            parts, size = [pieces[-1]], len(pieces[-1])
+        elif size >= 4 * window_chars:
+            # Nothing to split on, flush rather than grow without bound.
+            yield from pieces
+            parts, size = [], 0
+
+    if parts:
+        yield from splitter.split_text("\n".join(parts))
 
 
 class VectorStore:
-    def __init__(self):
+    def __init__(self, backend: str = None, embedding_backend: str = None):
         self.index_name = Settings.INDEX
+        self.backend = backend or Settings.VECTOR_STORE_BACKEND
+        self.embedding_id = embedding_identity(embedding_backend)
+
+        if self.backend not in _BACKENDS:
+            raise ValueError(
+                f"Unsupported vector store backend: '{self.backend}'. Supported: {list(_BACKENDS.keys())}"
+            )
 
-        self.embedding_func = OpenAIEmbeddings(
-            model=Settings.EMBEDDING_MODEL_NAME,
-            api_key=Settings.OPENAI_API_KEY,
-            dimensions=Settings.DIMENSIONS,
+        self.embedding_func = CachedEmbeddings(
+            get_embeddings(embedding_backend),
+            cache=get_embedding_cache(),
+            namespace=self.embedding_id,
         )
 
-        self.pc = Pinecone(api_key=Settings.PINECONE_API_KEY)
+        if self.backend == "pinecone":
+            _check_pinecone_dimensions(embedding_backend)
 
-        self._vs = PineconeVectorStore(
-            index=self.pc.Index(self.index_name),
-            embedding=self.embedding_func,
-        )
+        self._vs = _BACKENDS[self.backend](self.embedding_func, self.embedding_id)
 
     def chunk_document(self, doc: Document) -> List[Document]:
         chunker = self._get_chunker(doc)
-        return chunker.split_documents([doc])
+        chunks = chunker.split_documents([doc])
+        for chunk in chunks:
+            chunk.metadata.setdefault("chunk_strategy", "fixed")
+        return chunks
+
+    def chunk_stream(self, parser: BaseParser) -> Iterator[Document]:
+        """
+        Chunk a parser's segment stream without materializing the document.
+        The chunker is picked from the segment stats of the first
+        CHUNKER_WARMUP_CHARS characters, then applied window by window.
+        """
+        segments = parser.stream()
+        warmup = []
+        for segment in segments:
+            warmup.append(segment)
+            if parser.stats.chars >= Settings.CHUNKER_WARMUP_CHARS:
+                break
+
+        metadata = {**parser.base_metadata(), **parser.stats.chunker_metadata()}
+        splitter = self._get_chunker(Document(page_content="", metadata=metadata))
+
+        for text in _split_stream(splitter, chain(warmup, segments), Settings.CHUNK_STREAM_WINDOW_CHARS):
+            chunk = Document(page_content=text, metadata=dict(metadata))
+            chunk.metadata.setdefault("chunk_strategy", "fixed")
+            yield chunk
 
     def _get_chunker(self, doc: Document):
         if doc.metadata.get("chunking_strategy") == "FIXED":
@@ -41,21 +147,83 @@ class VectorStore:
                 chunk_overlap=doc.metadata.get("chunk_overlap"),
             )
 
-        return SemanticChunker(
-            self.embedding_func, breakpoint_threshold_amount=Settings.PERCENTILE_THRESH
+        # Semantic breakpoints cost an embedding call per sentence, so they
+        # are only used inside sections too long to keep whole.
+        return StructureChunker(
+            SemanticChunker(self.embedding_func, breakpoint_threshold_amount=Settings.PERCENTILE_THRESH)
         )
 
-    def add_documents(self, chunks: List[Document], document_id: str):
-        for i, chunk in enumerate(chunks):
-            chunk.metadata.update(
-                {
-                    "document_id": document_id,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                }
-            )
+    def add_documents(self, chunks: List[Document], document_id: str) -> IngestionStats:
+        return self.add_many({document_id: chunks})
+
+    def add_many(self, chunks_by_document: Dict[str, List[Document]]) -> IngestionStats:
+        """Embed and upsert the chunks of several documents through one batched pipeline."""
+        for document_id, chunks in chunks_by_document.items():
+            for i, chunk in enumerate(chunks):
+                chunk.metadata.update(
+                    {
+                        "document_id": document_id,
+                        "chunk_index": i,
+                        "total_chunks": len(chunks),
+                    }
+                )
+
+        stats = EmbeddingPipeline(self.embedding_func, self._upsert).run(
+            chain.from_iterable(chunks_by_document.values())
+        )
+
+        if hasattr(self._vs, "save"):
+            self._vs.save()
+
+        return stats
+
+    def delete_document(self, document_id: str) -> None:
+        """Drop every vector of a document, so a re-ingest replaces rather than adds to it."""
+        if hasattr(self._vs, "delete_document"):
+            self._vs.delete_document(document_id)
+        else:
+            self._vs.delete(filter={"document_id": document_id})
+
+    def add_stream(
+        self,
+        chunks: Iterable[Document],
+        document_id: str,
+        on_batch: Optional[Callable[[List[Document]], None]] = None,
+    ) -> IngestionStats:
+        """
+        `add_documents` for a lazy chunk stream. `total_chunks` is not known
+        up front, so it is left out of the chunk metadata. `on_batch` is
+        called with each batch once it is upserted.
+        """
+
+        def tagged():
+            for i, chunk in enumerate(chunks):
+                chunk.metadata.update({"document_id": document_id, "chunk_index": i})
+                yield chunk
+
+        def upsert(batch: List[Document], vectors: List[List[float]]):
+            self._upsert(batch, vectors)
+            if on_batch is not None:
+                on_batch(batch)
+
+        stats = EmbeddingPipeline(self.embedding_func, upsert).run(tagged())
+
+        if hasattr(self._vs, "save"):
+            self._vs.save()
+
+        return stats
+
+    def _upsert(self, chunks: List[Document], vectors: List[List[float]]):
+        texts = [chunk.page_content for chunk in chunks]
+        metadatas = [chunk.metadata for chunk in chunks]
 
-        self._vs.add_documents(chunks)
+        if hasattr(self._vs, "add_embeddings"):
+            self._vs.add_embeddings(zip(texts, vectors), metadatas, persist=False)
+        else:
+            # No precomputed-vector path (e.g. Pinecone): the backend re-embeds,
+            # which is served from the embedding cache filled by the pipeline.
+            # Ids are derived from the chunk so a retried upsert overwrites.
+            self._vs.add_texts(texts, metadatas, ids=[chunk_uid(chunk) for chunk in chunks])
 
     def get_retriever(self) -> VectorStoreRetriever:
         return self._vs.as_retriever()
@@ -0,0 +1,115 @@
+# tests.benchmarks.bench_async_load
+#
+# Load test for the sync graph (`app`, one worker thread per in-flight
+# query) versus the async graph (`async_app`, all queries on one event
+# loop). For each concurrency level it fires that many queries at once
+# and reports throughput, latency percentiles and peak thread count.
+#
+#   python -m tests.benchmarks.bench_async_load --document-id <uuid> --levels 1 8 32 128
+
+import argparse
+import asyncio
+import csv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from langchain_core.messages import HumanMessage
+
+from src.config import Settings
+from src.pyxon.rag.graph import app, async_app
+
+
+def _initial_state(question: str, document_id: str | None) -> dict:
+    return {
+        "messages": [HumanMessage(content=question)],
+        "queries": [question],
+        "critiques": [],
+        "iteration": 0,
+        "should_continue": True,
+        "retrieved_docs": [],
+        "reranked_docs": [],
+        "top_k": Settings.TOP_K,
+        "metadata_filter": {"document_id": document_id} if document_id else None,
+        "retrieval_timings": {},
+        "reflection_skipped": False,
+        "generation_failed": False,
+        "answer": "",
+    }
+
+
+class _ThreadSampler:
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _timed_sync(state: dict) -> float:
+    start = time.perf_counter()
+    app.invoke(state)
+    return time.perf_counter() - start
+
+
+async def _timed_async(state: dict) -> float:
+    start = time.perf_counter()
+    await async_app.ainvoke(state)
+    return time.perf_counter() - start
+
+
+def _run_sync(states: list[dict], max_threads: int):
+    with ThreadPoolExecutor(max_workers=min(len(states), max_threads)) as pool:
+        return list(pool.map(_timed_sync, states))
+
+
+async def _run_async(states: list[dict]):
+    return await asyncio.gather(*(_timed_async(state) for state in states))
+
+
+def _report(label: str, n: int, wall: float, latencies, peak_threads: int):
+    latencies = np.asarray(latencies)
+    print(
+        f"{label:>6} x{n:<4} {n / wall:7.2f} q/s | p50 {np.percentile(latencies, 50):6.2f}s"
+        f" | p95 {np.percentile(latencies, 95):6.2f}s | peak threads {peak_threads}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--document-id", default=None)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--max-threads", type=int, default=32)
+    args = parser.parse_args()
+
+    with open(Settings.TESTSET, encoding="utf-8") as f:
+        questions = [row["user_input"] for row in csv.DictReader(f)]
+
+    for n in args.levels:
+        batch = [questions[i % len(questions)] for i in range(n)]
+
+        with _ThreadSampler() as sampler:
+            start = time.perf_counter()
+            latencies = _run_sync([_initial_state(q, args.document_id) for q in batch], args.max_threads)
+            _report("sync", n, time.perf_counter() - start, latencies, sampler.peak)
+
+        with _ThreadSampler() as sampler:
+            start = time.perf_counter()
+            latencies = asyncio.run(_run_async([_initial_state(q, args.document_id) for q in batch]))
+            _report("async", n, time.perf_counter() - start, latencies, sampler.peak)
+
+
+if __name__ == "__main__":
+    main()
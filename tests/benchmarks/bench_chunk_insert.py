@@ -0,0 +1,64 @@
+# tests.benchmarks.bench_chunk_insert
+#
+# Compares DocumentRepository.add_chunks (per-row add + refresh) against
+# bulk_add_chunks (single executemany with RETURNING) on a throwaway SQLite db.
+#
+#   python -m tests.benchmarks.bench_chunk_insert --sizes 1000 10000 100000
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.pyxon.storage.database.database import Base
+from src.pyxon.storage.database.repository import DocumentRepository
+from src.pyxon.storage.database.schemas import ChunkCreate, DocumentCreate
+
+
+def _make_chunks(n: int) -> list[ChunkCreate]:
+    return [ChunkCreate(chunk_index=i, chunk_text=f"chunk {i} " * 40) for i in range(n)]
+
+
+def _run(session_factory, n: int, bulk: bool) -> float:
+    session = session_factory()
+    try:
+        repo = DocumentRepository(session)
+        doc = repo.create_document(
+            DocumentCreate(filename="bench.txt", source_path="bench.txt", doc_type="txt")
+        )
+        chunks = _make_chunks(n)
+
+        start = time.perf_counter()
+        if bulk:
+            repo.bulk_add_chunks(doc.id, chunks)
+        else:
+            repo.add_chunks(doc.id, chunks)
+        return time.perf_counter() - start
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        print(f"{'chunks':>8} {'add_chunks (s)':>15} {'bulk (s)':>10} {'speedup':>8}")
+        for n in args.sizes:
+            legacy = _run(session_factory, n, bulk=False)
+            bulk = _run(session_factory, n, bulk=True)
+            print(f"{n:>8} {legacy:>15.3f} {bulk:>10.3f} {legacy / bulk:>7.1f}x")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# tests.benchmarks.bench_compressed
+#
+# Memory per chunk and recall@k of the two-tier (int8 / binary) FAISS
+# index types against the exact flat index the store uses today. Vectors
+# come from --vectors (an .npy matrix, e.g. real text-embedding-3-large
+# output) or are synthesized with Matryoshka-like structure: clustered,
+# with energy concentrated in the leading dimensions.
+#
+#   python -m tests.benchmarks.bench_compressed --chunks 200000 --coarse-dims 128 256 512 --rescore 4 10
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from src.config import Settings
+from src.pyxon.storage.compressed import QUANTIZATIONS, TwoTierIndex
+
+
+def synthetic_vectors(n: int, dims: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # Leading dimensions carry most of the variance, as in Matryoshka-trained models.
+    scale = (1.0 / np.sqrt(np.arange(1, dims + 1))).astype(np.float32)
+    centers = rng.standard_normal((clusters, dims), dtype=np.float32) * scale
+    vectors = centers[rng.integers(0, clusters, n)]
+    vectors += 0.5 * rng.standard_normal((n, dims), dtype=np.float32) * scale
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _queries(vectors: np.ndarray, n: int, seed: int) -> np.ndarray:
+    # Perturbed corpus vectors, so each query has real near neighbours.
+    rng = np.random.default_rng(seed + 1)
+    picked = vectors[rng.integers(0, len(vectors), n)].copy()
+    picked += 0.02 * rng.standard_normal(picked.shape, dtype=np.float32)
+    faiss.normalize_L2(picked)
+    return picked
+
+
+def _recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=Path, default=None, help=".npy matrix of embeddings")
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dims", type=int, default=Settings.DIMENSIONS)
+    parser.add_argument("--clusters", type=int, default=1_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=Settings.RETRIEVAL_CANDIDATES)
+    parser.add_argument("--coarse-dims", type=int, nargs="+", default=[Settings.FAISS_COARSE_DIMS])
+    parser.add_argument("--rescore", type=int, nargs="+", default=[Settings.FAISS_RESCORE_CANDIDATES])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.vectors:
+        vectors = np.ascontiguousarray(np.load(args.vectors), dtype=np.float32)
+        faiss.normalize_L2(vectors)
+    else:
+        vectors = synthetic_vectors(args.chunks, args.dims, args.clusters, args.seed)
+    queries = _queries(vectors, args.queries, args.seed)
+    n, dims = vectors.shape
+    ids = np.arange(n, dtype=np.int64)
+
+    flat = faiss.IndexIDMap2(faiss.IndexFlatIP(dims))
+    flat.add_with_ids(vectors, ids)
+    start = time.perf_counter()
+    _, truth = flat.search(queries, args.k)
+    flat_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    flat_bytes = faiss.serialize_index(flat).nbytes / n
+
+    print(f"{n} chunks x {dims} dims, {len(queries)} queries, recall@{args.k} against exact flat search")
+    print(f"{'mode':<24} {'RAM B/chunk':>12} {'disk B/chunk':>13} {'recall':>8} {'ms/query':>9}")
+    print(f"{'flat (current)':<24} {flat_bytes:12.0f} {flat_bytes:13.0f} {1.0:8.3f} {flat_ms:9.2f}")
+
+    for quantization in QUANTIZATIONS:
+        for coarse_dims in args.coarse_dims:
+            for rescore in args.rescore:
+                with tempfile.TemporaryDirectory() as tmp:
+                    index = TwoTierIndex(Path(tmp), quantization, coarse_dims, rescore)
+                    index.add_with_ids(vectors, ids)
+
+                    start = time.perf_counter()
+                    found = np.vstack([index.search(query[None, :], args.k)[1] for query in queries])
+                    ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+                    ram = index.memory_bytes() / n
+                    disk = ram + dims * 4
+                    label = f"{quantization} {coarse_dims}d x{rescore}"
+                    print(f"{label:<24} {ram:12.0f} {disk:13.0f} {_recall(found, truth):8.3f} {ms:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
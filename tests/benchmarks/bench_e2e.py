@@ -0,0 +1,214 @@
+# tests.benchmarks.bench_e2e
+#
+# Offline end-to-end benchmark: parse_document -> chunk_document ->
+# add_documents -> app.invoke over data/tests plus a synthetic corpus,
+# with every external service replaced by the fakes in
+# tests.benchmarks.fakes. Writes a JSON baseline with ingestion
+# throughput, query latency percentiles and peak RSS.
+#
+#   python -m tests.benchmarks.bench_e2e --synthetic-docs 50 --queries 200 --output baseline.json
+
+import argparse
+import csv
+import json
+import platform
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_core.messages import HumanMessage
+
+from src.config import Settings
+from tests.benchmarks import fakes
+
+_WORDS = (
+    "mansaf jameed lamb rice shrak bread yogurt almonds pine nuts onion salt "
+    "pepper cardamom turmeric bay leaf broth simmer serve platter guests recipe "
+    "traditional jordan bedouin feast cook minutes heat pot stir garnish"
+).split()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _write_synthetic_corpus(out_dir: Path, n_docs: int, paragraphs: int, seed: int) -> list[Path]:
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for i in range(n_docs):
+        text = "\n".join(
+            " ".join(rng.choice(_WORDS) for _ in range(rng.randint(20, 120))) + "."
+            for _ in range(paragraphs)
+        )
+        path = out_dir / f"synthetic_{i:04d}.txt"
+        path.write_text(text, encoding="utf-8")
+        paths.append(path)
+
+    return paths
+
+
+def _initial_state(question: str) -> dict:
+    return {
+        "messages": [HumanMessage(content=question)],
+        "queries": [question],
+        "critiques": [],
+        "iteration": 0,
+        "should_continue": True,
+        "retrieved_docs": [],
+        "reranked_docs": [],
+        "top_k": Settings.TOP_K,
+        "metadata_filter": None,
+        "retrieval_timings": {},
+        "reflection_skipped": False,
+        "generation_failed": False,
+        "answer": "",
+    }
+
+
+def _percentiles(values) -> dict:
+    values = np.asarray(values, dtype=np.float64) * 1000
+    if not len(values):
+        return {}
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_ms": float(values.mean()),
+        "max_ms": float(values.max()),
+    }
+
+
+def _ingest(paths: list[Path], store) -> dict:
+    from src.pyxon.parsers import parse_document
+    from src.pyxon.retrieval.bm25 import get_bm25_index
+
+    stage_seconds = {"parse": 0.0, "chunk": 0.0, "embed_upsert": 0.0, "bm25": 0.0}
+    total_chunks = 0
+    total_bytes = 0
+
+    start = time.perf_counter()
+    for i, path in enumerate(paths):
+        t0 = time.perf_counter()
+        doc = parse_document(path, advanced=False)
+        t1 = time.perf_counter()
+        chunks = store.chunk_document(doc)
+        t2 = time.perf_counter()
+        document_id = f"bench-{i:05d}"
+        store.add_documents(chunks, document_id)
+        t3 = time.perf_counter()
+        get_bm25_index().add_document(document_id, chunks)
+        t4 = time.perf_counter()
+
+        stage_seconds["parse"] += t1 - t0
+        stage_seconds["chunk"] += t2 - t1
+        stage_seconds["embed_upsert"] += t3 - t2
+        stage_seconds["bm25"] += t4 - t3
+        total_chunks += len(chunks)
+        total_bytes += path.stat().st_size
+    wall = time.perf_counter() - start
+
+    return {
+        "files": len(paths),
+        "chunks": total_chunks,
+        "bytes": total_bytes,
+        "seconds": wall,
+        "files_per_sec": len(paths) / wall if wall else 0.0,
+        "chunks_per_sec": total_chunks / wall if wall else 0.0,
+        "mb_per_sec": total_bytes / (1024 * 1024) / wall if wall else 0.0,
+        "stage_seconds": stage_seconds,
+    }
+
+
+def _query(questions: list[str]) -> dict:
+    from src.pyxon.rag.graph import app
+
+    latencies, iterations, skipped = [], [], 0
+    for question in questions:
+        start = time.perf_counter()
+        result = app.invoke(_initial_state(question))
+        latencies.append(time.perf_counter() - start)
+        iterations.append(result["iteration"])
+        skipped += bool(result.get("reflection_skipped"))
+
+    return {
+        "queries": len(questions),
+        "latency": _percentiles(latencies),
+        "mean_iterations": float(np.mean(iterations)) if iterations else 0.0,
+        "reflection_skipped": skipped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic-docs", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per scripted LLM call")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds per streamed token")
+    parser.add_argument("--reflection-rounds", type=int, default=0)
+    parser.add_argument("--retrieval-mode", choices=["dense", "hybrid"], default=Settings.RETRIEVAL_MODE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON baseline here instead of stdout")
+    args = parser.parse_args()
+
+    work_dir = fakes.install(
+        llm_latency=args.llm_latency,
+        token_latency=args.token_latency,
+        reflection_rounds=args.reflection_rounds,
+    )
+    Settings.RETRIEVAL_MODE = args.retrieval_mode
+
+    from src.pyxon.storage.vs import VectorStore
+
+    # The memory backend is shared, so this is the index the graph nodes query.
+    store = VectorStore()
+
+    paths = sorted(Settings.TESTS.glob("*.txt"))
+    paths += _write_synthetic_corpus(work_dir / "corpus", args.synthetic_docs, args.paragraphs, args.seed)
+
+    ingestion = _ingest(paths, store)
+    rss_after_ingest = _peak_rss_mb()
+
+    with open(Settings.TESTSET, encoding="utf-8") as f:
+        questions = [row["user_input"] for row in csv.DictReader(f)]
+    rng = random.Random(args.seed)
+    questions += [" ".join(rng.choice(_WORDS) for _ in range(8)) + "?" for _ in range(args.queries)]
+    questions = questions[: args.queries]
+
+    querying = _query(questions)
+
+    baseline = {
+        "config": {
+            "synthetic_docs": args.synthetic_docs,
+            "paragraphs": args.paragraphs,
+            "llm_latency": args.llm_latency,
+            "token_latency": args.token_latency,
+            "reflection_rounds": args.reflection_rounds,
+            "retrieval_mode": Settings.RETRIEVAL_MODE,
+            "retrieval_candidates": Settings.RETRIEVAL_CANDIDATES,
+            "top_k": Settings.TOP_K,
+            "dimensions": Settings.DIMENSIONS,
+            "seed": args.seed,
+        },
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "ingestion": ingestion,
+        "query": querying,
+        "memory": {"peak_rss_mb_after_ingest": rss_after_ingest, "peak_rss_mb": _peak_rss_mb()},
+    }
+
+    text = json.dumps(baseline, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
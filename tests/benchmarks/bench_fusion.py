@@ -0,0 +1,92 @@
+# tests.benchmarks.bench_fusion
+#
+# Microbenchmark for src.pyxon.retrieval.fusion.fuse_scores against the
+# previous dict-based fusion loop, on synthetic candidate lists. The string
+# columns time the path retrieval actually takes: `fuse` over documents keyed
+# by `chunk_uid`, and `fuse_scores` fed those uids directly as object arrays.
+#
+#   python -m tests.benchmarks.bench_fusion --sizes 10000 1000000
+
+import argparse
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.pyxon.retrieval.fusion import chunk_uid, fuse, fuse_scores
+
+
+def _dict_fusion(ids_a, scores_a, ids_b, scores_b, alpha=0.6):
+    combined = {}
+    max_a = max(scores_a)
+    for uid, score in zip(ids_a, scores_a):
+        combined[uid] = alpha * score / max_a
+
+    max_b = max(scores_b)
+    for uid, score in zip(ids_b, scores_b):
+        combined[uid] = combined.get(uid, 0.0) + (1 - alpha) * score / max_b
+
+    return sorted(combined.items(), key=lambda x: x[1], reverse=True)
+
+
+def _documents(ids: np.ndarray, scores: np.ndarray):
+    # Ids spread over documents of 100 chunks, like `chunk_uid` sees them.
+    return [
+        (Document(page_content="", metadata={"document_id": f"doc-{i // 100}", "chunk_index": i % 100}), score)
+        for i, score in zip(ids.tolist(), scores.tolist())
+    ]
+
+
+def _best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print(
+        f"{'candidates':>10} {'dict loop (ms)':>15} {'weighted (ms)':>14} {'rrf (ms)':>9}"
+        f" {'str ids (ms)':>13} {'fuse (ms)':>10}"
+    )
+    for n in args.sizes:
+        # Half of each list overlaps with the other, like dense and sparse legs usually do.
+        ids_a = rng.choice(n * 2, size=n, replace=False).astype(np.int64)
+        ids_b = np.concatenate([ids_a[: n // 2], rng.choice(n * 2, size=n - n // 2) + n * 2])
+        scores_a = rng.random(n)
+        scores_b = rng.random(n) * 20
+
+        legacy = _best_of(
+            lambda: _dict_fusion(ids_a.tolist(), scores_a.tolist(), ids_b.tolist(), scores_b.tolist()),
+            args.repeats,
+        )
+        weighted = _best_of(
+            lambda: fuse_scores(ids_a, scores_a, ids_b, scores_b, method="weighted"), args.repeats
+        )
+        rrf = _best_of(lambda: fuse_scores(ids_a, scores_a, ids_b, scores_b, method="rrf"), args.repeats)
+
+        dense, sparse = _documents(ids_a, scores_a), _documents(ids_b, scores_b)
+        uids_a = np.asarray([chunk_uid(doc) for doc, _ in dense], dtype=object)
+        uids_b = np.asarray([chunk_uid(doc) for doc, _ in sparse], dtype=object)
+        strings = _best_of(
+            lambda: fuse_scores(uids_a, scores_a, uids_b, scores_b, method="weighted"), args.repeats
+        )
+        fused = _best_of(lambda: fuse(dense, sparse, k=10, method="weighted"), args.repeats)
+
+        print(
+            f"{n:>10} {legacy * 1e3:>15.1f} {weighted * 1e3:>14.1f} {rrf * 1e3:>9.1f}"
+            f" {strings * 1e3:>13.1f} {fused * 1e3:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# tests.benchmarks.bench_llama_batch
+#
+# Files per minute through LlamaCloud parsing: one `parse()` per file (a
+# new event loop and client each time) against `PyxonLlamaParser.parse_many`
+# (one loop, one client, bounded concurrency). The service is replaced by
+# `StubLlamaCloud`, with optional 503s to exercise retries.
+#
+#   python -m tests.benchmarks.bench_llama_batch --files 40 --concurrency 1 4 8 16 --failure-rate 0.05
+
+import argparse
+import itertools
+import tempfile
+import time
+from pathlib import Path
+
+from src.config import Settings
+from src.pyxon.parsers import llama
+from src.pyxon.parsers.llama import PyxonLlamaParser
+from tests.benchmarks.fakes import StubLlamaCloud
+
+
+def _install_stub(args) -> list:
+    clients = []
+    seeds = itertools.count()
+
+    def factory(**kwargs):
+        client = StubLlamaCloud(
+            upload_latency=args.upload_latency,
+            parse_latency=args.parse_latency,
+            failure_rate=args.failure_rate,
+            seed=next(seeds),
+        )
+        clients.append(client)
+        return client
+
+    llama.AsyncLlamaCloud = factory
+    return clients
+
+
+def _sequential(paths) -> tuple[float, int]:
+    start = time.perf_counter()
+    failed = 0
+    for path in paths:
+        try:
+            PyxonLlamaParser(path).parse()
+        except RuntimeError:
+            failed += 1
+    return time.perf_counter() - start, failed
+
+
+def _batched(paths, concurrency: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    results = PyxonLlamaParser.parse_many([PyxonLlamaParser(path) for path in paths], concurrency)
+    return time.perf_counter() - start, sum(isinstance(result, Exception) for result in results)
+
+
+def _report(label: str, n_files: int, seconds: float, failed: int, calls: int, baseline: float) -> None:
+    print(
+        f"{label:<16} {seconds:7.2f}s | {n_files / seconds * 60:7.1f} files/min"
+        f" | x{baseline / seconds:5.2f} | {calls:4d} calls | {failed} failed"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--upload-latency", type=float, default=0.3)
+    parser.add_argument("--parse-latency", type=float, default=2.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    clients = _install_stub(args)
+    Settings.LLAMA_RETRY_BASE_S = 0.1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.files):
+            path = Path(tmp) / f"doc_{i:04d}.pdf"
+            path.write_bytes(b"%PDF-1.4\n")
+            paths.append(path)
+
+        baseline = None
+        if not args.skip_sequential:
+            seconds, failed = _sequential(paths)
+            baseline = seconds
+            _report("sequential", args.files, seconds, failed, sum(c.calls for c in clients), baseline)
+
+        for concurrency in args.concurrency:
+            clients.clear()
+            seconds, failed = _batched(paths, concurrency)
+            baseline = baseline or seconds
+            _report(f"batch x{concurrency}", args.files, seconds, failed, sum(c.calls for c in clients), baseline)
+
+
+if __name__ == "__main__":
+    main()
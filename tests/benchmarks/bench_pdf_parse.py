@@ -0,0 +1,91 @@
+# tests.benchmarks.bench_pdf_parse
+#
+# Sequential versus process-pool page extraction in PyxonPDFParser on a
+# synthetic text PDF (written by hand, no extra dependencies). Checks the
+# parallel output matches the sequential one page for page.
+#
+#   python -m tests.benchmarks.bench_pdf_parse --pages 1000 --workers 1 2 4 8
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src.pyxon.parsers.pdf import PyxonPDFParser
+
+_WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+
+
+def write_synthetic_pdf(path: Path, n_pages: int, lines_per_page: int = 45, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    page_refs = []
+    for page_no in range(n_pages):
+        lines = [f"Page {page_no + 1}"] + [
+            " ".join(rng.choice(_WORDS) for _ in range(12)) for _ in range(lines_per_page)
+        ]
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"] + [f"({line}) Tj T*" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1")
+
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+
+    kids = b" ".join(b"%d 0 R" % ref for ref in page_refs)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, n_pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%EOF\n" % (len(objects) + 1, xref)
+
+    path.write_bytes(bytes(out))
+
+
+def _parse(path: Path, workers: int) -> tuple[float, str]:
+    start = time.perf_counter()
+    doc = PyxonPDFParser(path, workers=workers).parse()
+    return time.perf_counter() - start, doc.page_content
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic.pdf"
+        write_synthetic_pdf(path, args.pages)
+        print(f"{args.pages} pages, {path.stat().st_size / 1024 / 1024:.1f} MiB")
+
+        baseline, reference = None, None
+        for workers in args.workers:
+            seconds, content = _parse(path, workers)
+            if reference is None:
+                baseline, reference = seconds, content
+            match = "ok" if content == reference else "MISMATCH"
+            print(
+                f"workers {workers:>2}: {seconds:6.2f}s | {args.pages / seconds:7.1f} pages/s"
+                f" | x{baseline / seconds:4.2f} | {match}"
+            )
+
+
+if __name__ == "__main__":
+    main()
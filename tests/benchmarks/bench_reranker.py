@@ -0,0 +1,81 @@
+# tests.benchmarks.bench_reranker
+#
+# Latency and ranking agreement of the int8 ONNX reranker against the
+# full-precision PyTorch one, plus the effect of the score cache on a
+# repeated pass. Queries come from testset.csv; every query is scored
+# against the pool of all reference and previously retrieved contexts.
+#
+#   python -m tests.benchmarks.bench_reranker --top-k 5
+
+import argparse
+import csv
+import json
+import time
+from ast import literal_eval
+
+import numpy as np
+
+from src.config import Settings
+from src.pyxon.retrieval.reranker import CrossEncoderReranker
+
+
+def _load_queries_and_pool() -> tuple[list[str], list[str]]:
+    with open(Settings.TESTSET, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    with open(Settings.TESTS / "relevent_doc.json", encoding="utf-8") as f:
+        retrieved = json.load(f)
+
+    pool = {ctx for row in rows for ctx in literal_eval(row["reference_contexts"])}
+    pool |= {ctx for item in retrieved for ctx in item["retrieved_context"]}
+
+    return [row["user_input"] for row in rows], sorted(pool)
+
+
+def _timed_pass(reranker: CrossEncoderReranker, queries, pool) -> tuple[list[np.ndarray], np.ndarray]:
+    all_scores, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        all_scores.append(reranker.score(query, pool))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return all_scores, np.asarray(latencies)
+
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> float:
+    rank_a = np.argsort(np.argsort(-a))
+    rank_b = np.argsort(np.argsort(-b))
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", type=int, default=Settings.TOP_K)
+    args = parser.parse_args()
+
+    queries, pool = _load_queries_and_pool()
+    print(f"{len(queries)} queries x {len(pool)} candidates")
+
+    results = {}
+    for backend in ("torch", "onnx-int8"):
+        reranker = CrossEncoderReranker(backend=backend)
+        scores, cold = _timed_pass(reranker, queries, pool)
+        _, warm = _timed_pass(reranker, queries, pool)
+        results[backend] = scores
+
+        print(
+            f"{backend:>10}: p50 {np.percentile(cold, 50):7.1f} ms | p95 {np.percentile(cold, 95):7.1f} ms"
+            f" | cached p50 {np.percentile(warm, 50):5.2f} ms"
+        )
+
+    overlaps, correlations = [], []
+    for ref, quant in zip(results["torch"], results["onnx-int8"]):
+        top_ref = set(np.argsort(-ref)[: args.top_k])
+        top_quant = set(np.argsort(-quant)[: args.top_k])
+        overlaps.append(len(top_ref & top_quant) / args.top_k)
+        correlations.append(_spearman(ref, quant))
+
+    print(f"top-{args.top_k} overlap: {np.mean(overlaps):.3f} | spearman: {np.mean(correlations):.3f}")
+
+
+if __name__ == "__main__":
+    main()
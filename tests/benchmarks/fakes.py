@@ -0,0 +1,285 @@
+# tests.benchmarks.fakes
+#
+# Deterministic local stand-ins for the external services the RAG graph
+# builds at import time (Pinecone, Groq, the LangSmith prompt hub and the
+# HF cross-encoder); embeddings use the built-in hashing backend.
+# `install()` must run before any `src.pyxon.rag` module is imported.
+
+import asyncio
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
+from langchain_core.vectorstores import VectorStore as LCVectorStore
+
+from src.config import Settings
+from src.pyxon.retrieval.bm25 import tokenize
+
+
+class InMemoryVectorIndex(LCVectorStore):
+    """Brute-force cosine search over a numpy matrix; filters on `document_id`."""
+
+    def __init__(self, embedding: Embeddings):
+        self.embedding_func = embedding
+        self._matrix = np.zeros((0, Settings.DIMENSIONS), dtype=np.float32)
+        self._docs: List[Document] = []
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_func
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, **kwargs) -> "InMemoryVectorIndex":
+        store = cls(embedding)
+        store.add_texts(texts, metadatas)
+        return store
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs) -> List[str]:
+        texts = list(texts)
+        return self.add_embeddings(zip(texts, self.embedding_func.embed_documents(texts)), metadatas)
+
+    def add_embeddings(
+        self,
+        text_embeddings: Iterable[Tuple[str, List[float]]],
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        text_embeddings = list(text_embeddings)
+        metadatas = metadatas or [{} for _ in text_embeddings]
+        start = len(self._docs)
+
+        vectors = np.asarray([vector for _, vector in text_embeddings], dtype=np.float32)
+        if len(vectors):
+            self._matrix = np.vstack([self._matrix, vectors])
+        self._docs.extend(
+            Document(page_content=text, metadata=dict(metadata))
+            for (text, _), metadata in zip(text_embeddings, metadatas)
+        )
+        return [str(i) for i in range(start, len(self._docs))]
+
+    def delete_document(self, document_id: str) -> None:
+        keep = [i for i, doc in enumerate(self._docs) if doc.metadata.get("document_id") != document_id]
+        self._docs = [self._docs[i] for i in keep]
+        self._matrix = self._matrix[keep]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        if not self._docs:
+            return []
+
+        query_vector = np.asarray(self.embedding_func.embed_query(query), dtype=np.float32)
+        scores = self._matrix @ query_vector
+
+        wanted = (filter or {}).get("document_id")
+        if isinstance(wanted, dict):
+            wanted = wanted.get("$in", wanted.get("$eq"))
+        if isinstance(wanted, str):
+            wanted = [wanted]
+        if wanted is not None:
+            mask = np.asarray([doc.metadata.get("document_id") in wanted for doc in self._docs])
+            scores = np.where(mask, scores, -np.inf)
+
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(self._docs[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return lambda score: score
+
+
+_shared_index: Dict[str, InMemoryVectorIndex] = {}
+
+
+def _memory_backend(embedding_func: Embeddings, embedding_id: str = None) -> InMemoryVectorIndex:
+    # One index per process, so a `VectorStore()` built by the benchmark
+    # ingests into the same store the graph nodes search.
+    return _shared_index.setdefault("index", InMemoryVectorIndex(embedding_func))
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model that sleeps for `latency` seconds per call (plus
+    `token_latency` per streamed token) and returns canned output.
+    Reflection asks for `reflection_rounds` extra retrievals before
+    accepting the documents.
+    """
+
+    latency: float = 0.2
+    token_latency: float = 0.0
+    answer: str = "This is a scripted answer produced by the offline benchmark model."
+    reflection_rounds: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _reply(self, messages) -> str:
+        text = str(messages[-1].content) if messages else ""
+        if "Now rewrite this query" in text:
+            return "rewritten benchmark query"
+        return self.answer
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._reply(messages)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        for token in self._reply(messages).split(" "):
+            time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def with_structured_output(self, schema, **kwargs):
+        def decide(prompt_value) -> Any:
+            time.sleep(self.latency)
+            text = prompt_value.to_string() if hasattr(prompt_value, "to_string") else str(prompt_value)
+            # The reflection prompt carries the iteration count; stop once past the scripted rounds.
+            match = re.search(r"iteration: (\d+)", text)
+            iteration = int(match.group(1)) if match else 1
+            return schema(
+                critique="Scripted critique.",
+                should_continue=iteration <= self.reflection_rounds,
+                top_k=Settings.TOP_K,
+            )
+
+        return RunnableLambda(decide)
+
+
+class LexicalCrossEncoder:
+    """Scores (query, passage) pairs by token overlap, scaled to the ms-marco logit range."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        pass
+
+    def predict(self, pairs, batch_size: int = 32, **kwargs: Any) -> np.ndarray:
+        scores = []
+        for query, passage in pairs:
+            query_terms = set(tokenize(query))
+            overlap = len(query_terms & set(tokenize(passage))) / max(len(query_terms), 1)
+            scores.append(20.0 * overlap - 10.0)
+        return np.asarray(scores, dtype=np.float32)
+
+
+class _OfflinePromptClient:
+    def __init__(self, *args: Any, **kwargs: Any):
+        pass
+
+    def pull_prompt(self, name: str, **kwargs: Any) -> ChatPromptTemplate:
+        return ChatPromptTemplate.from_messages(
+            [
+                ("system", "Answer any user questions based solely on the context below:\n\n<context>\n{context}\n</context>"),
+                ("human", "{input}"),
+            ]
+        )
+
+
+class StubAPIError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"stub error {status_code}")
+        self.status_code = status_code
+
+
+class StubLlamaCloud:
+    """
+    In-process stand-in for `AsyncLlamaCloud`: uploads and parse jobs sleep
+    for their latency, and a `failure_rate` share of calls fail with a 503
+    so retries are exercised. Parsed pages echo the uploaded file name.
+    """
+
+    def __init__(
+        self,
+        upload_latency: float = 0.3,
+        parse_latency: float = 2.0,
+        failure_rate: float = 0.0,
+        pages: int = 3,
+        seed: int = 0,
+        **kwargs: Any,
+    ):
+        self.upload_latency = upload_latency
+        self.parse_latency = parse_latency
+        self.failure_rate = failure_rate
+        self.pages = pages
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._files: Dict[str, str] = {}
+        self.files = SimpleNamespace(create=self._create)
+        self.parsing = SimpleNamespace(parse=self._parse)
+
+    async def _call(self, latency: float) -> None:
+        self.calls += 1
+        await asyncio.sleep(latency * self._rng.uniform(0.8, 1.2))
+        if self._rng.random() < self.failure_rate:
+            raise StubAPIError(503)
+
+    async def _create(self, file: str, purpose: str, **kwargs: Any) -> SimpleNamespace:
+        await self._call(self.upload_latency)
+        file_id = f"file-{len(self._files)}"
+        self._files[file_id] = Path(file).name
+        return SimpleNamespace(id=file_id)
+
+    async def _parse(self, file_id: str, **kwargs: Any) -> SimpleNamespace:
+        if file_id not in self._files:
+            raise StubAPIError(404)
+        await self._call(self.parse_latency)
+        name = self._files[file_id]
+        pages = [
+            SimpleNamespace(markdown=f"# {name}\n\nBody of page {i} of {name}.")
+            for i in range(1, self.pages + 1)
+        ]
+        return SimpleNamespace(markdown=SimpleNamespace(pages=pages))
+
+
+def install(
+    llm_latency: float = 0.2,
+    token_latency: float = 0.0,
+    reflection_rounds: int = 0,
+    work_dir: Optional[Path] = None,
+) -> Path:
+    """
+    Route every external dependency of the graph to the fakes above and
+    point the on-disk embedding cache and BM25 index at
+    `work_dir`, a fresh temp dir by default. Returns the work dir.
+    """
+    import langchain_groq
+    import langsmith
+    import sentence_transformers
+
+    work_dir = Path(work_dir or tempfile.mkdtemp(prefix="pyxon-bench-"))
+
+    Settings.VECTOR_STORE_BACKEND = "memory"
+    # Its own embedding namespace keeps hashed vectors out of any real cache entries.
+    Settings.EMBEDDING_BACKEND = "hashing"
+    Settings.EMBEDDING_CACHE_PATH = work_dir / "embedding_cache.sqlite3"
+    Settings.BM25_INDEX_DIR = work_dir / "bm25"
+    Settings.PARSE_CACHE_DIR = work_dir / "parse_cache"
+    Settings.RERANKER_BACKEND = "torch"
+
+    langsmith.Client = _OfflinePromptClient
+    langchain_groq.ChatGroq = lambda **kwargs: ScriptedChatModel(
+        latency=llm_latency, token_latency=token_latency, reflection_rounds=reflection_rounds
+    )
+    sentence_transformers.CrossEncoder = LexicalCrossEncoder
+
+    from src.pyxon.storage import vs
+
+    vs._BACKENDS["memory"] = _memory_backend
+
+    return work_dir
@@ -0,0 +1,262 @@
+# tests.rageval
+#
+# Non-LLM retrieval evaluation over the ragas testset (the scripted
+# counterpart of rageval.ipynb). Reports hit rate@k, MRR, precision@k and
+# non-LLM context precision/recall, where a retrieved chunk counts as
+# relevant when its Levenshtein similarity to a reference context clears
+# --similarity (the ragas NonLLMStringSimilarity default is 0.5).
+#
+# Query embeddings go through the shared on-disk embedding cache, and the
+# candidate and reranked lists are pickled per stage under a hash of the
+# settings that produce them, so a rerun after a reranker change only
+# reranks and a rerun after a fusion change only re-queries.
+#
+#   python -m tests.rageval --mode hybrid --fusion rrf --top-k 4 --output eval.json
+
+import argparse
+import ast
+import csv
+import hashlib
+import json
+import logging
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from rapidfuzz.distance import Levenshtein
+from rapidfuzz.process import cdist
+
+from src.config import Settings
+from src.pyxon.embeddings.cache import text_hash
+
+logger = logging.getLogger(__name__)
+
+# (text, metadata, score) triples, kept free of langchain types so cached
+# stages stay loadable across library upgrades.
+Ranked = List[Tuple[str, dict, float]]
+
+
+class StageCache:
+    """Per-question results of one pipeline stage, pickled under the hash of its config."""
+
+    def __init__(self, cache_dir: Path, stage: str, config: dict, refresh: bool = False):
+        digest = hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        self.key = digest
+        self.path = Path(cache_dir) / f"{stage}-{digest}.pkl"
+        self.results: Dict[str, Ranked] = {}
+
+        if self.path.exists() and not refresh:
+            with open(self.path, "rb") as f:
+                self.results = pickle.load(f)
+
+    def missing(self, questions: List[str]) -> List[str]:
+        return [q for q in dict.fromkeys(questions) if text_hash(q) not in self.results]
+
+    def update(self, fresh: Dict[str, Ranked]) -> None:
+        if not fresh:
+            return
+        self.results.update({text_hash(q): ranked for q, ranked in fresh.items()})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self.results, f)
+        tmp_path.replace(self.path)
+
+    def __getitem__(self, question: str) -> Ranked:
+        return self.results[text_hash(question)]
+
+
+def load_testset(path: Path) -> Tuple[List[str], List[List[str]]]:
+    questions, references = [], []
+    with open(path, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            questions.append(row["user_input"])
+            references.append(ast.literal_eval(row["reference_contexts"]))
+    return questions, references
+
+
+def relevance_matrix(
+    retrieved: List[List[str]], references: List[List[str]], k: int, threshold: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (rel, recall): `rel[i, j]` is True when the j-th retrieved
+    context of query i matches some reference, padded with False to k;
+    `recall[i]` is the share of query i's references matched by any of
+    its top-k contexts.
+    """
+    rel = np.zeros((len(retrieved), k), dtype=bool)
+    recall = np.zeros(len(retrieved), dtype=np.float64)
+
+    for i, (contexts, refs) in enumerate(zip(retrieved, references)):
+        contexts = contexts[:k]
+        if not contexts or not refs:
+            continue
+        sim = cdist(contexts, refs, scorer=Levenshtein.normalized_similarity, workers=-1)
+        matched = sim >= threshold
+        rel[i, : len(contexts)] = matched.any(axis=1)
+        recall[i] = matched.any(axis=0).mean()
+
+    return rel, recall
+
+
+def score(rel: np.ndarray, recall: np.ndarray) -> Dict[str, np.ndarray]:
+    k = rel.shape[1]
+    hits = rel.any(axis=1)
+    first = rel.argmax(axis=1)
+
+    # Average precision over the relevant positions, as in ragas' context precision.
+    precision_at = np.cumsum(rel, axis=1) / np.arange(1, k + 1)
+    n_relevant = rel.sum(axis=1)
+    context_precision = np.where(n_relevant > 0, (precision_at * rel).sum(axis=1) / np.maximum(n_relevant, 1), 0.0)
+
+    return {
+        f"hit_rate@{k}": hits.astype(np.float64),
+        "mrr": np.where(hits, 1.0 / (first + 1), 0.0),
+        f"precision@{k}": n_relevant / k,
+        "non_llm_context_precision": context_precision,
+        "non_llm_context_recall": recall,
+    }
+
+
+def _run_stage(
+    name: str, cache: StageCache, questions: List[str], fn: Callable[[str], Ranked], workers: int
+) -> float:
+    todo = cache.missing(questions)
+    start = time.perf_counter()
+    if todo:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"rageval-{name}") as pool:
+            cache.update(dict(zip(todo, pool.map(fn, todo))))
+    seconds = time.perf_counter() - start
+    logger.info(f"[RagEval] {name}: {len(todo)} computed, {len(set(questions)) - len(todo)} cached ({seconds:.2f}s)")
+    return seconds
+
+
+def _as_ranked(results) -> Ranked:
+    return [(doc.page_content, dict(doc.metadata), float(score)) for doc, score in results]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--testset", type=Path, default=Settings.TESTSET)
+    parser.add_argument("--mode", choices=["dense", "hybrid"], default=Settings.RETRIEVAL_MODE)
+    parser.add_argument("--fusion", choices=["weighted", "rrf"], default=Settings.FUSION_METHOD)
+    parser.add_argument("--alpha", type=float, default=Settings.FUSION_ALPHA)
+    parser.add_argument("--candidates", type=int, default=Settings.RETRIEVAL_CANDIDATES)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--threshold", type=float, default=Settings.SIMILARITY_THRESHOLD, help="Dense score threshold")
+    parser.add_argument("--document-id", default=None)
+    parser.add_argument("--no-rerank", action="store_true")
+    parser.add_argument("--similarity", type=float, default=0.5, help="Context match threshold")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--cache-dir", type=Path, default=Settings.RAGEVAL_CACHE_DIR)
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached stages, e.g. after re-ingesting")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    from src.pyxon.retrieval.bm25 import get_bm25_index
+    from src.pyxon.retrieval.retriever import HybridRetriever
+    from src.pyxon.storage.vs import VectorStore
+
+    questions, references = load_testset(args.testset)
+    store = VectorStore()
+    metadata_filter = {"document_id": args.document_id} if args.document_id else None
+    timings = {}
+
+    # Embeddings: one batched call fills the shared cache that the dense leg reads from.
+    start = time.perf_counter()
+    store.embedding_func.embed_documents(list(dict.fromkeys(questions)))
+    timings["embed_seconds"] = time.perf_counter() - start
+
+    retrieval_config = {
+        "backend": store.backend,
+        "index": store.index_name,
+        "embedding": store.embedding_func.namespace,
+        "mode": args.mode,
+        "candidates": args.candidates,
+        "threshold": args.threshold,
+        "filter": metadata_filter,
+    }
+    if args.mode == "hybrid":
+        bm25 = get_bm25_index()
+        retrieval_config.update(fusion=args.fusion, alpha=args.alpha, bm25_chunks=len(bm25))
+        hybrid = HybridRetriever(
+            vector_store=store._vs,
+            bm25_index=bm25,
+            k=args.candidates,
+            top_n=args.candidates,
+            fusion_method=args.fusion,
+            alpha=args.alpha,
+        )
+
+        def retrieve(question: str) -> Ranked:
+            results, _ = hybrid.retrieve(question, metadata_filter, args.threshold)
+            return _as_ranked(results)
+    else:
+
+        def retrieve(question: str) -> Ranked:
+            kwargs = {"k": args.candidates, "score_threshold": args.threshold}
+            if metadata_filter:
+                kwargs["filter"] = metadata_filter
+            return _as_ranked(store._vs.similarity_search_with_relevance_scores(question, **kwargs))
+
+    candidates = StageCache(args.cache_dir, "candidates", retrieval_config, args.refresh)
+    timings["retrieve_seconds"] = _run_stage("candidates", candidates, questions, retrieve, args.workers)
+    final = candidates
+
+    if not args.no_rerank:
+        from langchain_core.documents import Document
+        from src.pyxon.retrieval.reranker import CrossEncoderReranker
+
+        rerank_config = {
+            "candidates": candidates.key,
+            "model": Settings.CROSS_ENCODER_MODEL_NAME,
+            "backend": Settings.RERANKER_BACKEND,
+            "top_k": args.top_k,
+        }
+        reranked = StageCache(args.cache_dir, "rerank", rerank_config, args.refresh)
+        reranker = None
+
+        def rerank(question: str) -> Ranked:
+            docs = [Document(page_content=text, metadata=meta) for text, meta, _ in candidates[question]]
+            return [
+                (doc.page_content, doc.metadata, doc.metadata["rerank_score"])
+                for doc in reranker.rerank(question, docs, top_k=args.top_k)
+            ]
+
+        if reranked.missing(questions):
+            # The cross-encoder is only loaded when some question is not cached yet.
+            reranker = CrossEncoderReranker()
+        timings["rerank_seconds"] = _run_stage("rerank", reranked, questions, rerank, args.workers)
+        final = reranked
+
+    start = time.perf_counter()
+    retrieved = [[text for text, _, _ in final[q]] for q in questions]
+    rel, recall = relevance_matrix(retrieved, references, args.top_k, args.similarity)
+    per_query = score(rel, recall)
+    timings["score_seconds"] = time.perf_counter() - start
+
+    summary = {name: float(values.mean()) for name, values in per_query.items()}
+    for name, value in summary.items():
+        print(f"{name:>28}: {value:.3f}")
+    print(" | ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+
+    if args.output:
+        report = {
+            "config": {**retrieval_config, "top_k": args.top_k, "rerank": not args.no_rerank, "similarity": args.similarity},
+            "summary": summary,
+            "timings": timings,
+            "per_query": [
+                {"user_input": q, **{name: float(values[i]) for name, values in per_query.items()}}
+                for i, q in enumerate(questions)
+            ],
+        }
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
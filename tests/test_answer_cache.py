@@ -0,0 +1,86 @@
+# tests.test_answer_cache
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.pyxon.embeddings.backends import HashingEmbeddings
+from src.pyxon.rag import cache as cache_module
+from src.pyxon.rag.cache import AnswerCache
+
+QUESTION = "What is the refund policy for damaged orders"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def _cache(**kwargs) -> AnswerCache:
+    options = {"similarity_threshold": 0.9, "ttl_seconds": 60, "max_entries": 100}
+    return AnswerCache(HashingEmbeddings(1024).embed_query, **{**options, **kwargs})
+
+
+def test_exact_hit_ignores_case_and_punctuation(clock):
+    cache = _cache()
+    cache.put("doc-1", QUESTION, "30 days")
+
+    assert cache.get("doc-1", "what is the REFUND policy for damaged orders?") == "30 days"
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_semantic_hit_on_a_close_rewording(clock):
+    cache = _cache()
+    cache.put("doc-1", QUESTION, "30 days")
+
+    assert cache.get("doc-1", QUESTION + " please") == "30 days"
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_miss_on_another_question_or_document(clock):
+    cache = _cache()
+    cache.put("doc-1", QUESTION, "30 days")
+
+    assert cache.get("doc-1", "Who founded the company") is None
+    assert cache.get("doc-2", QUESTION) is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_invalidate_drops_only_that_document(clock):
+    cache = _cache()
+    cache.put("doc-1", QUESTION, "30 days")
+    cache.put("doc-2", QUESTION, "14 days")
+
+    cache.invalidate("doc-1")
+
+    assert cache.get("doc-1", QUESTION) is None
+    assert cache.get("doc-2", QUESTION) == "14 days"
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = _cache(ttl_seconds=60)
+    cache.put("doc-1", QUESTION, "30 days")
+
+    clock[0] += 59
+    assert cache.get("doc-1", QUESTION) == "30 days"
+
+    clock[0] += 2
+    assert cache.get("doc-1", QUESTION) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_dropped(clock):
+    cache = _cache(max_entries=2)
+    cache.put("doc-1", "first question", "a")
+    cache.put("doc-1", "second question", "b")
+
+    # Touching the first entry makes the second one the oldest.
+    assert cache.get("doc-1", "first question") == "a"
+    cache.put("doc-1", "third question", "c")
+
+    assert cache.get("doc-1", "first question") == "a"
+    assert cache.get("doc-1", "third question") == "c"
+    assert cache.stats()["entries"] == 2
+    assert ("doc-1", "second question") not in cache._entries
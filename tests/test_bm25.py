@@ -0,0 +1,109 @@
+# tests.test_bm25
+
+from langchain_core.documents import Document
+
+from src.pyxon.retrieval.bm25 import BM25Index, tokenize
+
+TEXTS = {
+    "doc-1": ["the cat sat on the mat", "dogs chase cats in the garden"],
+    "doc-2": ["stock markets fell sharply today", "the central bank raised interest rates"],
+    "doc-3": ["a recipe for lemon cake", "bake the cake for forty minutes"],
+}
+
+
+def _chunks(document_id: str, texts=None):
+    return [
+        Document(page_content=text, metadata={"document_id": document_id, "chunk_index": i})
+        for i, text in enumerate(texts or TEXTS[document_id])
+    ]
+
+
+def _index(index_dir=None) -> BM25Index:
+    index = BM25Index(index_dir)
+    for document_id in TEXTS:
+        index.add_document(document_id, _chunks(document_id))
+    return index
+
+
+def _top(index: BM25Index, query: str, **kwargs):
+    return [(doc.metadata["document_id"], doc.page_content) for doc, _ in index.search(query, **kwargs)]
+
+
+def test_tokenize_drops_arabic_diacritics():
+    assert tokenize("Hello, WORLD") == ["hello", "world"]
+    assert tokenize("كَتَبَ") == tokenize("كتب")
+
+
+def test_search_ranks_matching_chunks():
+    index = _index()
+
+    assert len(index) == 6
+    assert _top(index, "lemon cake")[0] == ("doc-3", "a recipe for lemon cake")
+    assert _top(index, "interest rates", k=1) == [("doc-2", "the central bank raised interest rates")]
+    assert index.search("unknown words only") == []
+
+
+def test_search_is_restricted_to_document_ids():
+    index = _index()
+
+    assert {doc_id for doc_id, _ in _top(index, "the", document_ids=["doc-1"])} == {"doc-1"}
+    assert _top(index, "cake", document_ids=["doc-2"]) == []
+
+
+def test_delete_document_removes_its_chunks():
+    index = _index()
+    index.delete_document("doc-3")
+
+    assert len(index) == 4
+    assert _top(index, "cake") == []
+    assert _top(index, "cat")[0][0] == "doc-1"
+    index.delete_document("doc-3")
+
+
+def test_add_document_replaces_previous_chunks():
+    index = _index()
+    index.add_document("doc-3", _chunks("doc-3", ["grilled fish with rice"]))
+
+    assert len(index) == 5
+    assert _top(index, "cake") == []
+    assert _top(index, "fish") == [("doc-3", "grilled fish with rice")]
+
+
+def test_append_chunks_keeps_earlier_segments(tmp_path):
+    index = BM25Index(tmp_path)
+    index.append_chunks("doc-1", _chunks("doc-1", ["first batch about cats"]))
+    index.append_chunks("doc-1", _chunks("doc-1", ["second batch about dogs"]))
+
+    assert len(index) == 2
+    assert _top(index, "cats") == [("doc-1", "first batch about cats")]
+    assert _top(index, "dogs") == [("doc-1", "second batch about dogs")]
+
+
+def test_index_survives_reload(tmp_path):
+    # A directory that does not exist yet, like a fresh BM25_INDEX_DIR.
+    index_dir = tmp_path / "bm25"
+    index = _index(index_dir)
+    index.delete_document("doc-2")
+    index.add_document("doc-4", _chunks("doc-4", ["lemon tart with fresh cream"]))
+    index.append_chunks("doc-1", _chunks("doc-1", ["a parrot on the fence"]))
+
+    reopened = BM25Index(index_dir)
+
+    assert len(reopened) == len(index) == 6
+    assert _top(reopened, "interest rates") == []
+    for query in ("lemon", "cake", "parrot", "garden"):
+        assert reopened.search(query) == index.search(query) != []
+
+
+def test_reloaded_index_keeps_growing(tmp_path):
+    _index(tmp_path)
+
+    reopened = BM25Index(tmp_path)
+    reopened.add_document("doc-4", _chunks("doc-4", ["volcanoes erupt molten lava"]))
+    reopened.delete_document("doc-1")
+
+    again = BM25Index(tmp_path)
+    assert len(again) == 5
+    assert _top(again, "lava") == [("doc-4", "volcanoes erupt molten lava")]
+    assert _top(again, "cat") == []
+    assert _top(again, "cake")[0][0] == "doc-3"
@@ -0,0 +1,145 @@
+# tests.test_faiss_store
+
+import faiss
+import numpy as np
+import pytest
+
+from src.config import Settings
+from src.pyxon.embeddings.backends import HashingEmbeddings
+from src.pyxon.storage.faiss_store import FaissVectorStore
+
+DIMS = 32
+CHUNKS_PER_DOC = 50
+
+
+@pytest.fixture(autouse=True)
+def small_index(monkeypatch):
+    # Few lists, all probed, so IVF search is exact; coarse codes fit DIMS.
+    monkeypatch.setattr(Settings, "FAISS_NLIST", 4)
+    monkeypatch.setattr(Settings, "FAISS_NPROBE", 4)
+    monkeypatch.setattr(Settings, "FAISS_COARSE_DIMS", 16)
+
+
+def _vectors(n: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((n, DIMS)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _open(index_dir, index_type: str) -> FaissVectorStore:
+    return FaissVectorStore(HashingEmbeddings(DIMS), index_dir=index_dir, index_type=index_type)
+
+
+def _add(store: FaissVectorStore, doc_id: str, vectors: np.ndarray) -> None:
+    store.add_embeddings(
+        [(f"{doc_id}-{i}", vector.tolist()) for i, vector in enumerate(vectors)],
+        [{"document_id": doc_id, "chunk_index": i} for i in range(len(vectors))],
+    )
+
+
+def _top(store: FaissVectorStore, vector: np.ndarray, k: int = 1, filter=None):
+    return store.similarity_search_with_score_by_vector(vector.tolist(), k=k, filter=filter)
+
+
+def _assert_finds_own_chunks(store: FaissVectorStore, docs: dict) -> None:
+    for doc_id, vectors in docs.items():
+        for i in range(0, CHUNKS_PER_DOC, 7):
+            results = _top(store, vectors[i])
+            assert results, f"{doc_id}-{i} not found"
+            assert results[0][0].page_content == f"{doc_id}-{i}"
+
+
+@pytest.mark.parametrize("index_type", FaissVectorStore.INDEX_TYPES)
+def test_add_and_search(tmp_path, index_type):
+    store = _open(tmp_path, index_type)
+    docs = {f"doc-{d}": _vectors(CHUNKS_PER_DOC, d) for d in range(4)}
+    for doc_id, vectors in docs.items():
+        _add(store, doc_id, vectors)
+
+    assert store.ntotal == 4 * CHUNKS_PER_DOC
+    _assert_finds_own_chunks(store, docs)
+
+
+@pytest.mark.parametrize("index_type", FaissVectorStore.INDEX_TYPES)
+def test_search_after_delete(tmp_path, index_type):
+    store = _open(tmp_path, index_type)
+    docs = {f"doc-{d}": _vectors(CHUNKS_PER_DOC, d) for d in range(4)}
+    for doc_id, vectors in docs.items():
+        _add(store, doc_id, vectors)
+
+    store.delete_document("doc-1")
+    deleted = docs.pop("doc-1")
+
+    # Chunks added before and after the deleted document still map to their own text.
+    _assert_finds_own_chunks(store, docs)
+    for doc, _ in _top(store, deleted[0], k=10):
+        assert doc.metadata["document_id"] != "doc-1"
+    assert _top(store, deleted[0], k=10, filter={"document_id": "doc-1"}) == []
+
+
+@pytest.mark.parametrize("index_type", FaissVectorStore.INDEX_TYPES)
+def test_delete_survives_reload(tmp_path, index_type):
+    store = _open(tmp_path, index_type)
+    docs = {f"doc-{d}": _vectors(CHUNKS_PER_DOC, d) for d in range(4)}
+    for doc_id, vectors in docs.items():
+        _add(store, doc_id, vectors)
+    store.delete_document("doc-2")
+    deleted = docs.pop("doc-2")
+
+    reopened = _open(tmp_path, index_type)
+    _assert_finds_own_chunks(reopened, docs)
+    for doc, _ in _top(reopened, deleted[0], k=10):
+        assert doc.metadata["document_id"] != "doc-2"
+
+    # New ids never collide with the deleted ones.
+    docs["doc-4"] = _vectors(CHUNKS_PER_DOC, 4)
+    _add(reopened, "doc-4", docs["doc-4"])
+    _assert_finds_own_chunks(reopened, docs)
+
+
+@pytest.mark.parametrize("index_type", FaissVectorStore.INDEX_TYPES)
+def test_document_filter(tmp_path, index_type):
+    store = _open(tmp_path, index_type)
+    docs = {f"doc-{d}": _vectors(CHUNKS_PER_DOC, d) for d in range(4)}
+    for doc_id, vectors in docs.items():
+        _add(store, doc_id, vectors)
+
+    results = _top(store, docs["doc-0"][0], k=5, filter={"document_id": "doc-3"})
+    assert len(results) == 5
+    assert all(doc.metadata["document_id"] == "doc-3" for doc, _ in results)
+
+
+def test_ivf_trains_once_enough_vectors_are_buffered(tmp_path):
+    store = _open(tmp_path, "ivf")
+    docs = {f"doc-{d}": _vectors(CHUNKS_PER_DOC, d) for d in range(3)}
+    for doc_id, vectors in docs.items():
+        _add(store, doc_id, vectors)
+
+    # 150 vectors, below 39 per list for 4 lists: still an exact flat buffer.
+    assert not isinstance(store._index, faiss.IndexIVF)
+    store.delete_document("doc-0")
+    docs.pop("doc-0")
+
+    docs["doc-3"] = _vectors(CHUNKS_PER_DOC, 3)
+    docs["doc-4"] = _vectors(CHUNKS_PER_DOC, 4)
+    _add(store, "doc-3", docs["doc-3"])
+    _add(store, "doc-4", docs["doc-4"])
+
+    assert isinstance(store._index, faiss.IndexIVF)
+    assert store._index.nlist == Settings.FAISS_NLIST
+    _assert_finds_own_chunks(store, docs)
+    _assert_finds_own_chunks(_open(tmp_path, "ivf"), docs)
+
+
+def test_rejects_another_embedding_space(tmp_path):
+    store = FaissVectorStore(HashingEmbeddings(DIMS), index_dir=tmp_path, embedding_id="hashing:32")
+    _add(store, "doc-0", _vectors(5, 0))
+
+    with pytest.raises(ValueError):
+        FaissVectorStore(HashingEmbeddings(DIMS), index_dir=tmp_path, embedding_id="hashing:64")
+
+
+def test_rejects_an_index_without_manifest(tmp_path):
+    _add(_open(tmp_path, "flat"), "doc-0", _vectors(5, 0))
+
+    with pytest.raises(ValueError):
+        FaissVectorStore(HashingEmbeddings(DIMS), index_dir=tmp_path, embedding_id="hashing:32")
@@ -0,0 +1,73 @@
+# tests.test_fusion
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from src.pyxon.retrieval.fusion import chunk_uid, fuse, fuse_scores
+
+
+def _doc(document_id: str, chunk_index: int) -> Document:
+    return Document(
+        page_content=f"{document_id}-{chunk_index}",
+        metadata={"document_id": document_id, "chunk_index": chunk_index},
+    )
+
+
+A, B, C = _doc("doc-1", 0), _doc("doc-1", 1), _doc("doc-2", 0)
+DENSE = [(A, 0.9), (B, 0.4)]
+SPARSE = [(B, 12.0), (C, 3.0)]
+
+# The same lists as integer ids: 1, 2, 3 stand for A, B, C.
+IDS_A, SCORES_A = np.array([1, 2]), np.array([0.9, 0.4])
+IDS_B, SCORES_B = np.array([2, 3]), np.array([12.0, 3.0])
+
+
+def test_weighted_min_max_normalizes_each_side():
+    ids, scores = fuse_scores(IDS_A, SCORES_A, IDS_B, SCORES_B, alpha=0.6)
+
+    assert ids.tolist() == [1, 2, 3]
+    assert scores == pytest.approx([0.6, 0.4, 0.0])
+
+
+def test_rrf_rewards_agreement():
+    ids, scores = fuse_scores(IDS_A, SCORES_A, IDS_B, SCORES_B, method="rrf", alpha=0.6)
+
+    assert ids.tolist() == [2, 1, 3]
+    assert scores == pytest.approx([0.6 / 62 + 0.4 / 61, 0.6 / 61, 0.4 / 62])
+
+
+def test_string_ids_fuse_like_integer_ids():
+    _, int_scores = fuse_scores(IDS_A, SCORES_A, IDS_B, SCORES_B)
+    str_ids, str_scores = fuse_scores(
+        np.array(["a", "b"], dtype=object), SCORES_A, np.array(["b", "c"], dtype=object), SCORES_B
+    )
+
+    assert str_ids.tolist() == ["a", "b", "c"]
+    assert str_scores == pytest.approx(int_scores)
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        fuse_scores(np.array([1]), np.array([1.0]), np.array([1]), np.array([1.0]), method="max")
+
+
+@pytest.mark.parametrize("method, expected", [("weighted", [A, B, C]), ("rrf", [B, A, C])])
+def test_fuse_returns_documents_by_chunk_uid(method, expected):
+    results = fuse(DENSE, SPARSE, k=10, method=method, alpha=0.6)
+
+    assert [chunk_uid(doc) for doc, _ in results] == [chunk_uid(doc) for doc in expected]
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+def test_fuse_merges_copies_of_the_same_chunk():
+    # Dense and sparse legs return distinct objects for the same chunk.
+    results = fuse([(_doc("doc-1", 1), 0.5)], [(_doc("doc-1", 1), 2.0)], k=10)
+
+    assert len(results) == 1
+    assert results[0][1] == pytest.approx(1.0)
+
+
+def test_fuse_keeps_top_k():
+    assert len(fuse(DENSE, SPARSE, k=2)) == 2
+    assert fuse([], [], k=5) == []
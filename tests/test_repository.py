@@ -0,0 +1,62 @@
+# tests.test_repository
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.pyxon.storage.database import schemas
+from src.pyxon.storage.database.database import Base
+from src.pyxon.storage.database.repository import DocumentRepository
+
+
+@pytest.fixture
+def repo(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pyxon.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield DocumentRepository(session)
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _create(repo: DocumentRepository, count: int) -> set:
+    return {
+        repo.create_document(
+            schemas.DocumentCreate(filename=f"doc-{i}.txt", source_path=f"/tmp/doc-{i}.txt", doc_type="txt")
+        ).id
+        for i in range(count)
+    }
+
+
+def test_list_documents_pages_past_the_first_page(repo):
+    # Created within the same second, so most rows tie on created_at.
+    created = _create(repo, 25)
+
+    pages = []
+    page = repo.list_documents(10)
+    while page:
+        pages.append(page)
+        page = repo.list_documents(10, after=page[-1])
+
+    assert [len(p) for p in pages] == [10, 10, 5]
+    seen = [doc.id for p in pages for doc in p]
+    assert len(seen) == len(set(seen))
+    assert set(seen) == created
+
+
+def test_list_documents_is_newest_first(repo):
+    _create(repo, 5)
+
+    docs = repo.list_documents(10)
+    keys = [(doc.created_at, doc.id) for doc in docs]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_list_documents_after_last_page_is_empty(repo):
+    _create(repo, 3)
+
+    page = repo.list_documents(3)
+    assert len(page) == 3
+    assert repo.list_documents(3, after=page[-1]) == []